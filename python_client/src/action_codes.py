@@ -0,0 +1,50 @@
+"""
+Compact integer encoding of PlayerAction (24 bits);
+Bits 16-23: header (bit 7: DROP, bit 6: player two, bits 0-2: kind index); bits 8-15: source tile; bits 0-7: target tile.
+Tiles are row * BOARD_COLS + col; NO_SQUARE marks the missing source of a drop.
+"""
+from project_types import PieceKind, ActionType, Location, PlayerNumber, PlayerAction, BOARD_COLS
+from movement_tables import get_tables
+
+NO_SQUARE = 0xFF
+DROP_BIT = 0x80
+PLAYER_TWO_BIT = 0x40
+KIND_MASK = 0x07
+
+KINDS: list[PieceKind] = list(PieceKind)
+KIND_INDEX: dict[PieceKind, int] = {kind: index for index, kind in enumerate(KINDS)}
+
+
+def make_code(action_type: ActionType, player: PlayerNumber, kind: PieceKind, source: int, target: int) -> int:
+    """Code from raw fields; source is NO_SQUARE for drops"""
+    header = KIND_INDEX[kind]
+    if action_type == ActionType.DROP:
+        header |= DROP_BIT
+    if player == PlayerNumber.TWO:
+        header |= PLAYER_TWO_BIT
+
+    return header << 16 | source << 8 | target
+
+def encode_action(action: PlayerAction) -> int:
+    source = action.source_location
+    target = action.target_location
+
+    return make_code(
+        action.action_type,
+        action.player,
+        action.kind,
+        source.row * BOARD_COLS + source.col if source is not None else NO_SQUARE,
+        target.row * BOARD_COLS + target.col,
+        )
+
+def decode_action(code: int) -> PlayerAction:
+    header, source, target = code >> 16, code >> 8 & 0xFF, code & 0xFF
+    locations: list[Location] = get_tables().locations
+
+    return PlayerAction(
+        ActionType.DROP if header & DROP_BIT else ActionType.MOVE,
+        PlayerNumber.TWO if header & PLAYER_TWO_BIT else PlayerNumber.ONE,
+        None if source == NO_SQUARE else locations[source],
+        locations[target],
+        KINDS[header & KIND_MASK],
+        )
@@ -0,0 +1,378 @@
+"""
+Computer opponent: negamax alpha-beta search with iterative deepening under a per-action time budget.
+Every action is one ply; the side to move only changes every third ply, so scores are negated only on a change of player.
+"""
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Protocol
+
+from project_types import GameStatus, PieceKind, PlayerNumber, GameState, PlayerAction
+from model import GameModel, GameBoard
+from movement_tables import get_tables
+from action_codes import DROP_BIT, decode_action
+from transposition import Bound, TranspositionTable
+
+WIN_SCORE = 1_000_000
+"""Score of a won position, minus the plies needed to reach it"""
+INFINITY = WIN_SCORE + 1
+
+PIECE_VALUES: dict[PieceKind, int] = {
+    PieceKind.EEVEE: 100,
+    PieceKind.EEVEE_SHINY: 100,
+    PieceKind.PIKACHU: 320,
+    PieceKind.TURTWIG: 330,
+    PieceKind.LATIAS: 0,
+    PieceKind.LATIOS: 0,
+}
+HAND_BONUS = 10
+"""Captured pieces can be dropped almost anywhere"""
+PROTECTED_FREEDOM = 15
+"""Per empty tile a Latias/Latios can move to (a player with no such tiles loses)"""
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    action: PlayerAction | None
+    score: int
+    depth: int
+    nodes: int
+    elapsed: float
+    unit: str = 'nodes'
+    """What nodes counts (e.g. 'playouts' for MCTS)"""
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return (f"depth {self.depth}, score {self.score}, {self.nodes:,} {self.unit} in {self.elapsed * 1e3:.0f} ms "
+                f"({self.nodes_per_second:,.0f} {self.unit}/s)")
+
+class SearchEngine(Protocol):
+    def search(self, model: GameModel, budget_ms: int) -> SearchResult:
+        ...
+
+class SearchTimeout(Exception):
+    pass
+
+
+def evaluate(model: GameModel) -> int:
+    """Static score of the position for the active player"""
+    player = model.active_player
+    tables = get_tables()
+
+    material = 0
+    occupied: set[tuple[int, int]] = set()
+    protected: list[tuple[PlayerNumber, PieceKind, int]] = []
+
+    for owner, kind, location in model.board.iter_pieces():
+        sign = 1 if owner == player else -1
+
+        if location is None:
+            material += sign * (PIECE_VALUES[kind] + HAND_BONUS)
+            continue
+
+        material += sign * PIECE_VALUES[kind]
+        occupied.add((location.row, location.col))
+        if kind in (PieceKind.LATIAS, PieceKind.LATIOS):
+            protected.append((owner, kind, location.row * tables.width + location.col))
+
+    freedom = 0
+    for owner, kind, square in protected:
+        free = sum(1 for key, _ in tables.steps[kind][square] if key not in occupied)
+        freedom += free if owner == player else -free
+
+    return material + PROTECTED_FREEDOM * freedom
+
+def terminal_score(model: GameModel, ply: int) -> int:
+    """Score of a finished game for the active player; quicker wins score higher"""
+    winner = PlayerNumber.ONE if model.game_status == GameStatus.PLAYER_WIN else PlayerNumber.TWO
+    score = WIN_SCORE - ply
+
+    return score if winner == model.active_player else -score
+
+
+class AlphaBetaSearch:
+    def __init__(self, max_depth: int = 32, check_interval: int = 32, table: TranspositionTable | None = None):
+        self._max_depth = max_depth
+        self._check_interval = check_interval
+        self._table = table
+        self._deadline = float('inf')
+        self._nodes = 0
+        self._root_history = 0
+
+    @property
+    def table(self) -> TranspositionTable | None:
+        return self._table
+
+    @property
+    def nodes(self) -> int:
+        """Nodes searched by the last search, search_depth or search_action call"""
+        return self._nodes
+
+    def search(self, model: GameModel, budget_ms: int) -> SearchResult:
+        """Iterative deepening until budget_ms runs out; returns the best action of the deepest completed iteration"""
+        start = time.perf_counter()
+        self._deadline = start + budget_ms / 1000
+        self._nodes = 0
+        if self._table is not None:
+            self._table.new_search()
+
+        codes = self.order_actions(model, list(model.legal_action_codes()))
+        result = SearchResult(decode_action(codes[0]) if codes else None, 0, 0, 0, 0.0)
+        self._root_history = len(model.history)
+
+        try:
+            for depth in range(1, self._max_depth + 1):
+                code, score = self.search_root(model, codes, depth, -INFINITY, INFINITY)
+                result = SearchResult(decode_action(code) if code is not None else None, score, depth, self._nodes, time.perf_counter() - start)
+
+                # Search the best action first in the next iteration
+                if code is not None:
+                    codes.remove(code)
+                    codes.insert(0, code)
+
+                if abs(score) >= WIN_SCORE - self._max_depth:
+                    break
+
+        except SearchTimeout:
+            # The model is left mid-search; unwind it to the root
+            while len(model.history) > self._root_history:
+                model.pop()
+
+        return SearchResult(result.action, result.score, result.depth, self._nodes, time.perf_counter() - start)
+
+    def search_depth(self, model: GameModel, depth: int, alpha: int = -INFINITY, beta: int = INFINITY) -> SearchResult:
+        """Fixed-depth search without deadline (for benchmarks and parallel root search)"""
+        start = time.perf_counter()
+        self._deadline = float('inf')
+        self._nodes = 0
+
+        code, score = self.search_root(model, self.order_actions(model, list(model.legal_action_codes())), depth, alpha, beta)
+        return SearchResult(decode_action(code) if code is not None else None, score, depth, self._nodes, time.perf_counter() - start)
+
+    def search_action(self, model: GameModel, code: int, depth: int, alpha: int, beta: int, deadline: float) -> int | None:
+        """
+        Score of one root action (action_codes) searched to depth within (alpha, beta), for parallel root search;
+        None if deadline (time.perf_counter) passed first, with model unwound to the root
+        """
+        self._deadline = deadline
+        self._nodes = 0
+        self._root_history = len(model.history)
+
+        try:
+            return self.score_action(model, code, model.active_player, depth, alpha, beta, 1)
+
+        except SearchTimeout:
+            while len(model.history) > self._root_history:
+                model.pop()
+
+            return None
+
+    def search_root(self, model: GameModel, codes: list[int], depth: int, alpha: int, beta: int) -> tuple[int | None, int]:
+        """Best of the given root actions (action_codes) and its score"""
+        self._root_history = len(model.history)
+        player = model.active_player
+        best_code: int | None = None
+        best_score = -INFINITY
+
+        for code in codes:
+            score = self.score_action(model, code, player, depth, alpha, beta, 1)
+
+            if score > best_score:
+                best_code, best_score = code, score
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        return best_code, best_score
+
+    def score_action(self, model: GameModel, code: int, player: PlayerNumber, depth: int, alpha: int, beta: int, ply: int) -> int:
+        """Score of making action (action_codes) for player, searched depth - 1 plies deeper"""
+        model.push(decode_action(code))
+
+        if model.active_player == player:
+            score = self._negamax(model, depth - 1, alpha, beta, ply)
+        else:
+            score = -self._negamax(model, depth - 1, -beta, -alpha, ply)
+
+        model.pop()
+        return score
+
+    def _negamax(self, model: GameModel, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self._nodes += 1
+        if self._nodes % self._check_interval == 0 and time.perf_counter() > self._deadline:
+            raise SearchTimeout
+
+        if model.game_status != GameStatus.ONGOING:
+            return terminal_score(model, ply)
+
+        if depth == 0:
+            return evaluate(model)
+
+        table = self._table
+        key = model.zobrist_key
+        table_code: int | None = None
+        original_alpha = alpha
+
+        if table is not None and (entry := table.probe(key)) is not None:
+            table_code = entry.action_code
+
+            if entry.depth >= depth:
+                score = _score_from_table(entry.score, ply)
+
+                if entry.bound == Bound.EXACT:
+                    return score
+                elif entry.bound == Bound.LOWER:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+
+                if alpha >= beta:
+                    return score
+
+        codes = self.order_actions(model, list(model.legal_action_codes()), table_code)
+        player = model.active_player
+        best_code: int | None = None
+        best_score = -INFINITY
+
+        for code in codes:
+            score = self.score_action(model, code, player, depth, alpha, beta, ply + 1)
+
+            if score > best_score:
+                best_code, best_score = code, score
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        # No legal action: nothing changes but the position, so score it as it stands
+        if best_code is None:
+            return evaluate(model)
+
+        if table is not None:
+            if best_score <= original_alpha:
+                bound = Bound.UPPER
+            elif best_score >= beta:
+                bound = Bound.LOWER
+            else:
+                bound = Bound.EXACT
+
+            table.store(key, _score_to_table(best_score, ply), depth, bound, best_code)
+
+        return best_score
+
+    def order_actions(self, model: GameModel, codes: list[int], first: int | None = None) -> list[int]:
+        """The table's best action first, then captures (most valuable victim first), then moves, then drops"""
+        board = model.board
+        locations = get_tables().locations
+
+        if first is not None:
+            if first in codes:
+                codes.remove(first)
+            else:
+                assert self._table is not None
+                self._table.stats.bad_actions += 1
+                first = None
+
+        def key(code: int) -> int:
+            if code >> 16 & DROP_BIT:
+                return 1
+
+            target = locations[code & 0xFF]
+            if board.can_capture(target):
+                victim = board.get_live_piece(target)
+                return -PIECE_VALUES[victim.kind] if victim is not None else 0
+
+            return 0
+
+        codes.sort(key=key)
+        if first is not None:
+            codes.insert(0, first)
+
+        return codes
+
+
+def _score_to_table(score: int, ply: int) -> int:
+    """Win scores are stored relative to the position, not the root"""
+    if score > WIN_SCORE - 1000:
+        return score + ply
+    if score < -(WIN_SCORE - 1000):
+        return score - ply
+
+    return score
+
+def _score_from_table(score: int, ply: int) -> int:
+    if score > WIN_SCORE - 1000:
+        return score - ply
+    if score < -(WIN_SCORE - 1000):
+        return score + ply
+
+    return score
+
+
+class ComputerPlayer:
+    """
+    Plays one side of a GameController game (see TurnProvider);
+    Searches a copy of the model in a worker thread, so the view's render loop is never blocked;
+    verbose: print a summary of every search
+    """
+    def __init__(self, model: GameModel, player: PlayerNumber, engine: SearchEngine, budget_ms: int, verbose: bool = False):
+        self._model = model
+        self._player = player
+        self._engine = engine
+        self._budget_ms = budget_ms
+        self._verbose = verbose
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"search-{player.value}")
+        self._future: Future[SearchResult] | None = None
+        self._root_key: int | None = None
+        self._last_result: SearchResult | None = None
+
+    @property
+    def player(self) -> PlayerNumber:
+        return self._player
+
+    @property
+    def is_thinking(self) -> bool:
+        return self._future is not None
+
+    @property
+    def last_result(self) -> SearchResult | None:
+        return self._last_result
+
+    def on_state_change(self, state: GameState):
+        """Start searching whenever it becomes this player's turn"""
+        if state.game_status != GameStatus.ONGOING or state.active_player != self._player:
+            return
+
+        key = self._model.zobrist_key
+        if self._future is not None and self._root_key == key:
+            return
+
+        self._root_key = key
+        self._future = self._executor.submit(self._search, self._model.to_compact(), type(self._model.board))
+
+    def _search(self, position: bytes, board_type: type[GameBoard]) -> SearchResult:
+        """In the worker thread; only the compact position is taken on the render thread, the model is rebuilt here"""
+        return self._engine.search(GameModel.from_compact(position, board_type), self._budget_ms)
+
+    def poll_turn(self) -> PlayerAction | None:
+        """Finished search's action, if it is still for the current position; called from the render loop"""
+        future = self._future
+        if future is None or not future.done():
+            return None
+
+        self._future = None
+        result = future.result()
+        self._last_result = result
+
+        if self._verbose:
+            print(f"P{'1' if self._player == PlayerNumber.ONE else '2'} search: {result.summary()}")
+
+        if self._root_key != self._model.zobrist_key:
+            # Position changed meanwhile (e.g. new game); search again if it is still this player's turn
+            self.on_state_change(self._model.state)
+            return None
+
+        return result.action
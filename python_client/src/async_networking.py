@@ -0,0 +1,309 @@
+"""
+asyncio websocket client for the project server, running its own event loop in a daemon thread;
+Same surface as CS150241ProjectNetworking (connect, player_id, send, recv), so OnlineView can use either,
+plus a wake-up callback per received batch, outbound batching, ping and echo round-trip statistics, and automatic reconnect.
+The server broadcasts every message to all clients including its sender, so a message's round trip ends when it comes back
+(or, with server.py, when it is rejected).
+Every connection starts with a Joined in recv(): the server replays the room from its start (or a fresh room) after it,
+so a client must reset its game on each one; payloads made against the previous connection are dropped, not resent.
+"""
+import asyncio
+import contextlib
+import queue
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from websockets.asyncio.client import ClientConnection, connect
+from websockets.exceptions import ConnectionClosed, InvalidHandshake
+
+CONNECT_TIMEOUT_S = 5.0
+PING_INTERVAL_S = 2.0
+RECONNECT_DELAY_S = 0.25
+MAX_RECONNECT_DELAY_S = 8.0
+LATENCY_SAMPLES = 100
+
+
+@dataclass(frozen=True)
+class Message:
+    source_id: int
+    payload: str
+
+
+@dataclass(frozen=True)
+class Joined:
+    """Queued before the messages of each connection, once the server assigned player_id"""
+    player_id: int
+    connection: int
+    """1 for the first connection, counting reconnects"""
+
+
+class LatencyStats:
+    """Most recent LATENCY_SAMPLES round trips, in seconds; written by the network thread, read by the view"""
+    def __init__(self, max_samples: int = LATENCY_SAMPLES):
+        self._samples: deque[float] = deque(maxlen=max_samples)
+        self.count = 0
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+        self.count += 1
+
+    @property
+    def last(self) -> float | None:
+        return self._samples[-1] if self._samples else None
+
+    @property
+    def mean(self) -> float | None:
+        samples = list(self._samples)
+        return sum(samples) / len(samples) if samples else None
+
+    def percentile(self, fraction: float) -> float | None:
+        samples = sorted(self._samples)
+        return samples[min(len(samples) - 1, int(len(samples) * fraction))] if samples else None
+
+    def summary(self) -> str:
+        mean, p99 = self.mean, self.percentile(0.99)
+        if mean is None or p99 is None:
+            return "no samples"
+
+        return f"mean {mean * 1e3:.1f} ms, p99 {p99 * 1e3:.1f} ms over {len(self._samples)} of {self.count:,}"
+
+
+PayloadMerger = Callable[[list[str]], list[str]]
+"""Combines payloads queued at the same time into fewer messages (e.g. wire_codec.merge_text)"""
+
+
+class AsyncNetworking:
+    def __init__(self, host: str, port: int, merge: PayloadMerger | None = None,
+                 batch_window: float = 0.0, ping_interval: float = PING_INTERVAL_S):
+        """batch_window: how long to wait for more payloads after the first before sending (0: only those already queued)"""
+        self._uri = f"ws://{host}:{port}"
+        self._merge = merge
+        self._batch_window = batch_window
+        self._ping_interval = ping_interval
+
+        self._inbound: queue.SimpleQueue[Message | Joined] = queue.SimpleQueue()
+        self._on_message: Callable[[], None] | None = None
+        self._player_id: int | None = None
+        self._connected = threading.Event()
+        self._closed = False
+
+        self.rtt = LatencyStats()
+        """Own messages, from send until the server's broadcast comes back"""
+        self.ping = LatencyStats()
+        """Websocket ping/pong"""
+        self.reconnects = 0
+        self.connection = 0
+        """Number of the current (or last) connection, as in Joined"""
+        self.sent_payloads = 0
+        self.sent_messages = 0
+        self.dropped_payloads = 0
+        """Made against a previous connection's position, so never sent"""
+
+        self._loop = asyncio.new_event_loop()
+        self._outbound: asyncio.Queue[tuple[str, float]] = asyncio.Queue()
+        self._pending: deque[tuple[str, float]] = deque()
+        """Sent messages awaiting their echo, oldest first"""
+        self._unsent: list[tuple[str, float]] = []
+        """Merged messages a lost connection failed to send; dropped on reconnecting"""
+        self._stop: asyncio.Event | None = None
+        self._thread = threading.Thread(target=self._loop.run_until_complete, args=(self._main(),), name="async-networking", daemon=True)
+
+    @classmethod
+    def connect(cls, host: str, port: int, merge: PayloadMerger | None = None, batch_window: float = 0.0,
+                ping_interval: float = PING_INTERVAL_S, timeout: float = CONNECT_TIMEOUT_S) -> 'AsyncNetworking':
+        """Start the network thread and wait until the server assigned a player id"""
+        networking = cls(host, port, merge, batch_window, ping_interval)
+        networking.start()
+
+        if not networking.wait_connected(timeout):
+            networking.close()
+            raise ConnectionError(f"No player id from {networking._uri} within {timeout:.1f}s")
+
+        return networking
+
+    @property
+    def player_id(self) -> int:
+        """Assigned by the server on every (re)connect"""
+        assert self._player_id is not None, "not connected yet"
+        return self._player_id
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected.is_set()
+
+    def start(self):
+        self._thread.start()
+
+    def wait_connected(self, timeout: float) -> bool:
+        return self._connected.wait(timeout)
+
+    def set_message_callback(self, callback: Callable[[], None] | None):
+        """Called from the network thread after each batch of received messages (e.g. to post a pygame event)"""
+        self._on_message = callback
+
+    def send(self, payload: str, connection: int | None = None):
+        """
+        Thread-safe; payloads still unsent when the connection is lost are dropped, as the server replays the game afresh on reconnect;
+        connection: that of the last Joined the payload's sender handled, to also drop it if a newer connection was joined since
+        """
+        self._loop.call_soon_threadsafe(self._queue, payload, time.perf_counter(), connection)
+
+    def _queue(self, payload: str, queued_at: float, connection: int | None):
+        if connection is not None and connection != self.connection:
+            self.dropped_payloads += 1
+            return
+
+        self._outbound.put_nowait((payload, queued_at))
+
+    def recv(self) -> list[Message | Joined]:
+        """Messages received since the last call, oldest first, each connection's preceded by a Joined; never blocks"""
+        messages: list[Message | Joined] = []
+
+        while True:
+            try:
+                messages.append(self._inbound.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def close(self):
+        """Close the connection and stop the network thread"""
+        self._closed = True
+
+        if self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._request_stop)
+            self._thread.join(timeout=CONNECT_TIMEOUT_S)
+
+    def _request_stop(self):
+        if self._stop is not None:
+            self._stop.set()
+
+    async def _main(self):
+        self._stop = asyncio.Event()
+        if self._closed:
+            return
+
+        run = asyncio.create_task(self._run())
+        await self._stop.wait()
+
+        run.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await run
+
+    async def _run(self):
+        """Stay connected until closed, reconnecting with exponential backoff"""
+        delay = RECONNECT_DELAY_S
+
+        while not self._closed:
+            try:
+                async with connect(self._uri, ping_interval=None, open_timeout=CONNECT_TIMEOUT_S) as connection:
+                    delay = RECONNECT_DELAY_S
+                    await self._serve(connection)
+
+            except (OSError, ConnectionClosed, InvalidHandshake, TimeoutError):
+                pass
+
+            self._connected.clear()
+            if self._closed:
+                return
+
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY_S)
+
+    async def _serve(self, connection: ClientConnection):
+        joined = asyncio.Event()
+        tasks = [
+            asyncio.create_task(self._receive(connection, joined)),
+            asyncio.create_task(self._send(connection, joined)),
+            asyncio.create_task(self._ping(connection)),
+        ]
+
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            # Echoes of messages sent on this connection will never arrive
+            self._pending.clear()
+
+    async def _receive(self, connection: ClientConnection, joined: asyncio.Event):
+        async for raw in connection:
+            now = time.perf_counter()
+            text = raw if isinstance(raw, str) else raw.decode()
+            source, _, payload = text.partition(' ')
+
+            if not joined.is_set():
+                # First message of a connection: the server announcing our id, with an empty payload
+                self._player_id = int(source)
+                self._join()
+                self._inbound.put(Joined(self._player_id, self.connection))
+
+                joined.set()
+                self._connected.set()
+                if self._on_message is not None:
+                    self._on_message()
+                continue
+
+            message = Message(int(source), payload)
+
+            # Servers answer every message of ours exactly once, in order: the broadcast, or a rejection (see server.py)
+            if message.source_id == self._player_id and self._pending:
+                self.rtt.add(now - self._pending.popleft()[1])
+
+            self._inbound.put(message)
+
+            if self._on_message is not None:
+                self._on_message()
+
+    def _join(self):
+        """Start a new connection, dropping whatever was queued against the previous one"""
+        self.connection += 1
+        self.dropped_payloads += len(self._unsent) + self._outbound.qsize()
+        self._unsent = []
+
+        while not self._outbound.empty():
+            self._outbound.get_nowait()
+
+    async def _send(self, connection: ClientConnection, joined: asyncio.Event):
+        """Sends everything queued at once, merged if possible; nothing before the server assigned an id"""
+        await joined.wait()
+
+        while True:
+            if self._unsent:
+                merged, self._unsent = self._unsent, []
+
+            else:
+                batch = [await self._outbound.get()]
+
+                if self._batch_window > 0:
+                    await asyncio.sleep(self._batch_window)
+                while not self._outbound.empty():
+                    batch.append(self._outbound.get_nowait())
+
+                payloads = [payload for payload, _ in batch]
+                merged = [(payload, batch[0][1]) for payload in (self._merge(payloads) if self._merge is not None else payloads)]
+                self.sent_payloads += len(payloads)
+
+            for index, (payload, queued_at) in enumerate(merged):
+                # Before sending, since the reply may be received while send is still draining
+                self._pending.append((payload, queued_at))
+
+                try:
+                    await connection.send(payload)
+                except ConnectionClosed:
+                    self._unsent = merged[index:]
+                    raise
+
+                self.sent_messages += 1
+
+    async def _ping(self, connection: ClientConnection):
+        while True:
+            await asyncio.sleep(self._ping_interval)
+            pong = await connection.ping()
+            self.ping.add(await pong)
@@ -0,0 +1,303 @@
+"""
+Vectorized rules engine: K positions held as NumPy arrays, for simulating many games at once (e.g. random playouts).
+Requires numpy >= 2.0, which the game itself does not (`poetry install --extras batch`, or `pip install 'numpy>=2.0'`).
+
+The kind and owner planes are bit-packed: one uint64 per board and kind / player (bit row * 8 + col, as in bitboard.BitBoard);
+kind_planes and owner_planes unpack them to K x 8 x 8. Captured counts are K x 2 x kinds, then active player (0 or 1),
+remaining actions and status (GameModel.to_compact order).
+Actions index ACTION_COUNT slots in GROUPS groups of 64 tiles: moves by (direction, distance - 1) and source tile,
+then drops by kind index and target tile. Legal actions are computed per group as one uint64 for all boards at once.
+"""
+import numpy as np
+import numpy.typing as npt
+
+if not hasattr(np, 'bitwise_count'):
+    raise ImportError(f"batch_engine needs numpy >= 2.0 (for np.bitwise_count), found {np.__version__}")
+
+from project_types import PieceKind, ActionType, PlayerNumber, MovePossibilities, BOARD_ROWS, BOARD_COLS
+from model import COMPACT_SIZE, COMPACT_PLAYER_TWO
+from movement_tables import KIND_DIRECTIONS, SLIDING_KINDS
+from action_codes import KINDS, KIND_INDEX, NO_SQUARE, make_code
+
+Bits = npt.NDArray[np.uint64]
+Ints = npt.NDArray[np.int64]
+
+SQUARES = BOARD_ROWS * BOARD_COLS
+DIRECTIONS: list[tuple[int, int]] = MovePossibilities.ORTHOGONALS.value + MovePossibilities.DIAGONALS.value
+MAX_DISTANCE = max(BOARD_ROWS, BOARD_COLS) - 1
+
+MOVE_GROUPS = len(DIRECTIONS) * MAX_DISTANCE
+GROUPS = MOVE_GROUPS + len(KINDS)
+MOVE_ACTIONS = MOVE_GROUPS * SQUARES
+ACTION_COUNT = GROUPS * SQUARES
+
+ONGOING, PLAYER_ONE_WON, PLAYER_TWO_WON = 0, 1, 2
+"""Status values (same order as GameStatus)"""
+
+PROTECTED_KINDS = (PieceKind.LATIAS, PieceKind.LATIOS)
+REGULAR_STEP_KINDS = (PieceKind.EEVEE, PieceKind.EEVEE_SHINY)
+
+_SWITCHED = np.array([
+    KIND_INDEX[PieceKind.EEVEE_SHINY if kind == PieceKind.EEVEE else PieceKind.EEVEE if kind == PieceKind.EEVEE_SHINY else kind]
+    for kind in KINDS
+])
+"""Kind index -> kind index once captured (see Piece.switch_ownership)"""
+
+_STEP_OFFSETS = np.array([dr * BOARD_COLS + dc for dr, dc in DIRECTIONS])
+_ZERO = np.uint64(0)
+_ONE = np.uint64(1)
+
+
+def _column_mask(dc: int) -> np.uint64:
+    """Tiles whose column stays on the board after moving dc columns"""
+    return np.uint64(sum(
+        1 << (row * BOARD_COLS + col)
+        for row in range(BOARD_ROWS)
+        for col in range(BOARD_COLS)
+        if 0 <= col + dc < BOARD_COLS
+    ))
+
+_COLUMN_MASKS = {dc: _column_mask(dc) for dc in range(-MAX_DISTANCE, MAX_DISTANCE + 1)}
+
+
+def _shift(bits: Bits, dr: int, dc: int) -> Bits:
+    """Move every tile by (dr, dc), dropping tiles that leave the board"""
+    offset = dr * BOARD_COLS + dc
+    masked = bits & _COLUMN_MASKS[dc]
+
+    return masked << np.uint64(offset) if offset >= 0 else masked >> np.uint64(-offset)
+
+def _kinds_with(direction: tuple[int, int], kinds: tuple[PieceKind, ...]) -> list[int]:
+    return [KIND_INDEX[kind] for kind in kinds if direction in KIND_DIRECTIONS[kind]]
+
+_REGULAR_STEPPERS = [_kinds_with(direction, REGULAR_STEP_KINDS) for direction in DIRECTIONS]
+_PROTECTED_STEPPERS = [_kinds_with(direction, PROTECTED_KINDS) for direction in DIRECTIONS]
+_SLIDERS = [_kinds_with(direction, SLIDING_KINDS) for direction in DIRECTIONS]
+_PROTECTED_INDICES = [KIND_INDEX[kind] for kind in PROTECTED_KINDS]
+
+
+class BatchEngine:
+    def __init__(self, count: int):
+        self.pieces = np.zeros((len(KINDS), count), dtype=np.uint64)
+        """Per kind index: tiles holding that kind"""
+        self.players = np.zeros((2, count), dtype=np.uint64)
+        """Per player (0: one, 1: two): tiles holding their pieces"""
+        self.hands = np.zeros((count, 2, len(KINDS)), dtype=np.int16)
+        self.active = np.zeros(count, dtype=np.int8)
+        self.action_count = np.full(count, 3, dtype=np.int8)
+        self.status = np.zeros(count, dtype=np.int8)
+
+    @classmethod
+    def from_compact(cls, positions: list[bytes]) -> 'BatchEngine':
+        """Boards from GameModel.to_compact encodings"""
+        engine = cls(len(positions))
+        data = np.frombuffer(b''.join(positions), dtype=np.uint8).reshape(len(positions), COMPACT_SIZE)
+        tiles = data[:, :SQUARES]
+        weights = _ONE << np.arange(SQUARES, dtype=np.uint64)
+
+        def pack(plane: npt.NDArray[np.bool_]) -> Bits:
+            return (plane * weights).sum(axis=1, dtype=np.uint64)
+
+        for index in range(len(KINDS)):
+            engine.pieces[index] = pack((tiles & (0xFF ^ COMPACT_PLAYER_TWO)) == index + 1)
+
+        engine.players[0] = pack((tiles != 0) & (tiles & COMPACT_PLAYER_TWO == 0))
+        engine.players[1] = pack(tiles & COMPACT_PLAYER_TWO != 0)
+        engine.hands[:] = data[:, SQUARES:SQUARES + 2 * len(KINDS)].reshape(-1, 2, len(KINDS))
+        engine.active[:] = data[:, -3]
+        engine.action_count[:] = data[:, -2]
+        engine.status[:] = data[:, -1]
+
+        return engine
+
+    def __len__(self) -> int:
+        return len(self.active)
+
+    def kind_planes(self) -> npt.NDArray[np.int8]:
+        """K x 8 x 8: 0 if empty, else 1 + kind index"""
+        planes = np.zeros((len(self), SQUARES), dtype=np.int8)
+        for index in range(len(KINDS)):
+            planes[_unpack(self.pieces[index])] = index + 1
+
+        return planes.reshape(-1, BOARD_ROWS, BOARD_COLS)
+
+    def owner_planes(self) -> npt.NDArray[np.int8]:
+        """K x 8 x 8: 0 if empty, 1 or 2 for the owning player"""
+        planes = np.zeros((len(self), SQUARES), dtype=np.int8)
+        planes[_unpack(self.players[0])] = 1
+        planes[_unpack(self.players[1])] = 2
+
+        return planes.reshape(-1, BOARD_ROWS, BOARD_COLS)
+
+    def compact(self, board: int) -> bytes:
+        """Board as a GameModel.to_compact encoding (see GameModel.from_compact)"""
+        kinds = self.kind_planes()[board].ravel().astype(np.uint8)
+        tiles = np.where(self.owner_planes()[board].ravel() == 2, kinds | COMPACT_PLAYER_TWO, kinds)
+
+        return (tiles.astype(np.uint8).tobytes() + self.hands[board].ravel().astype(np.uint8).tobytes()
+                + bytes([self.active[board], self.action_count[board], self.status[board]]))
+
+    def legal_groups(self) -> Bits:
+        """(GROUPS, K) legal action tiles of each board's active player; none once a game is over"""
+        pieces = self.pieces
+        player_two = self.active.astype(np.bool_)
+
+        own = np.where(player_two, self.players[1], self.players[0])
+        occupied = self.players[0] | self.players[1]
+        empty = ~occupied
+        protected = pieces[_PROTECTED_INDICES[0]] | pieces[_PROTECTED_INDICES[1]]
+        # Regular pieces move to empty tiles or capture unprotected enemy pieces
+        open_tiles = ~own & ~protected
+
+        groups = np.zeros((GROUPS, len(self)), dtype=np.uint64)
+
+        for index, (dr, dc) in enumerate(DIRECTIONS):
+            steppers = _union(pieces, _REGULAR_STEPPERS[index]) & own
+            sliders = _union(pieces, _SLIDERS[index]) & own
+            protected_steppers = _union(pieces, _PROTECTED_STEPPERS[index]) & own
+            group = index * MAX_DISTANCE
+
+            # Source-indexed: a source is legal if the tile distance steps away is a legal target
+            groups[group] = (steppers | sliders) & _shift(open_tiles, -dr, -dc) | protected_steppers & _shift(empty, -dr, -dc)
+
+            clear = sliders
+            for distance in range(2, MAX_DISTANCE + 1):
+                clear = clear & _shift(empty, -(distance - 1) * dr, -(distance - 1) * dc)
+                if not clear.any():
+                    break
+
+                groups[group + distance - 1] = clear & _shift(open_tiles, -distance * dr, -distance * dc)
+
+        # Drops: empty tiles out of every Latias/Latios movement range, for kinds in hand
+        forbidden = np.zeros(len(self), dtype=np.uint64)
+        for index, (dr, dc) in enumerate(DIRECTIONS):
+            forbidden |= _shift(_union(pieces, _PROTECTED_STEPPERS[index]), dr, dc)
+
+        droppable = empty & ~forbidden
+        in_hand = self.hands[np.arange(len(self)), self.active] > 0
+        groups[MOVE_GROUPS:] = np.where(in_hand.T, droppable, _ZERO)
+
+        groups[:, self.status != ONGOING] = 0
+        return groups
+
+    def legal_mask(self) -> npt.NDArray[np.bool_]:
+        """(K, ACTION_COUNT) legal actions as booleans (see legal_groups)"""
+        return _unpack(self.legal_groups().T.copy()).reshape(len(self), ACTION_COUNT)
+
+    def apply(self, actions: Ints):
+        """Make one action per board (-1 to skip a board), then update statuses and turns like GameModel.push"""
+        pieces, players = self.pieces, self.players
+        active = self.active.astype(np.int64)
+
+        made = actions >= 0
+        is_drop = actions >= MOVE_ACTIONS
+
+        boards = np.nonzero(made & ~is_drop)[0]
+        if len(boards):
+            chosen = actions[boards]
+            source = chosen % SQUARES
+            target = source + (chosen // SQUARES % MAX_DISTANCE + 1) * _STEP_OFFSETS[chosen // (MAX_DISTANCE * SQUARES)]
+            source_bits = _ONE << source.astype(np.uint64)
+            target_bits = _ONE << target.astype(np.uint64)
+            mover = active[boards]
+
+            kind = _kind_at(pieces[:, boards], source_bits)
+            captured = _kind_at(pieces[:, boards], target_bits)
+            capturing = captured >= 0
+
+            hit = boards[capturing]
+            self.hands[hit, mover[capturing], _SWITCHED[captured[capturing]]] += 1
+            pieces[captured[capturing], hit] &= ~target_bits[capturing]
+            players[1 - mover[capturing], hit] &= ~target_bits[capturing]
+
+            pieces[kind, boards] ^= source_bits | target_bits
+            players[mover, boards] ^= source_bits | target_bits
+
+        boards = np.nonzero(made & is_drop)[0]
+        if len(boards):
+            chosen = actions[boards] - MOVE_ACTIONS
+            kind = chosen // SQUARES
+            target_bits = _ONE << (chosen % SQUARES).astype(np.uint64)
+            dropper = active[boards]
+
+            pieces[kind, boards] |= target_bits
+            players[dropper, boards] |= target_bits
+            self.hands[boards, dropper, kind] -= 1
+
+        self.action_count[made] -= 1
+
+        # The active player wins once every opponent Latias/Latios is immobile (see Board.opponent_immobile)
+        empty = ~(players[0] | players[1])
+        opponent = np.where(self.active.astype(np.bool_), players[0], players[1])
+        mobile = np.zeros(len(self), dtype=np.uint64)
+        for index, (dr, dc) in enumerate(DIRECTIONS):
+            mobile |= _union(pieces, _PROTECTED_STEPPERS[index]) & opponent & _shift(empty, -dr, -dc)
+
+        won = made & (mobile == 0)
+        self.status[won] = self.active[won] + 1
+
+        switch = made & (self.action_count == 0)
+        self.active[switch] ^= 1
+        self.action_count[switch] = 3
+
+    def action_code(self, board: int, action: int) -> int:
+        """action_codes encoding of one board's action index (for checks against GameModel)"""
+        player = PlayerNumber.TWO if self.active[board] else PlayerNumber.ONE
+        group, tile = divmod(action, SQUARES)
+
+        if group >= MOVE_GROUPS:
+            return make_code(ActionType.DROP, player, KINDS[group - MOVE_GROUPS], NO_SQUARE, tile)
+
+        direction, distance = divmod(group, MAX_DISTANCE)
+        target = tile + (distance + 1) * int(_STEP_OFFSETS[direction])
+        kind = int(self.kind_planes()[board].ravel()[tile]) - 1
+
+        return make_code(ActionType.MOVE, player, KINDS[kind], tile, target)
+
+
+def random_actions(groups: Bits, rng: np.random.Generator) -> Ints:
+    """One uniformly random legal action per board from legal_groups, -1 for boards without any"""
+    counts = np.bitwise_count(groups).astype(np.int32)
+    # Row-by-row running totals are much faster than np.cumsum along the short axis
+    totals = np.empty_like(counts)
+    totals[0] = counts[0]
+    for group in range(1, len(counts)):
+        np.add(totals[group - 1], counts[group], out=totals[group])
+    total = totals[-1]
+
+    pick = (rng.random(groups.shape[1]) * total).astype(np.int32)
+    group = (totals <= pick).sum(axis=0)
+    group = np.minimum(group, len(counts) - 1)
+    columns = np.arange(groups.shape[1])
+    within = pick - (totals[group, columns] - counts[group, columns])
+
+    # Position of the within-th set bit, by binary search over popcounts of the low half
+    bits = groups[group, columns]
+    position = np.zeros(groups.shape[1], dtype=np.int64)
+    for width in (32, 16, 8, 4, 2, 1):
+        low = np.bitwise_count((bits >> position.astype(np.uint64)) & np.uint64((1 << width) - 1)).astype(np.int32)
+        upper = within >= low
+        within = np.where(upper, within - low, within)
+        position = np.where(upper, position + width, position)
+
+    return np.where(total > 0, group * SQUARES + position, -1)
+
+
+def _union(pieces: Bits, indices: list[int]) -> Bits:
+    if not indices:
+        return np.zeros(pieces.shape[1], dtype=np.uint64)
+
+    union = pieces[indices[0]]
+    for index in indices[1:]:
+        union = union | pieces[index]
+
+    return union
+
+def _unpack(bits: Bits) -> npt.NDArray[np.bool_]:
+    """(..., 64) booleans, tile index order"""
+    return np.unpackbits(bits[..., None].view(np.uint8), axis=-1, bitorder='little').astype(np.bool_)
+
+def _kind_at(pieces: Bits, bits: Bits) -> Ints:
+    """Kind index on each (board's) tile bit, -1 if empty"""
+    present = (pieces & bits) != 0
+    return np.where(present.any(axis=0), np.argmax(present, axis=0), -1)
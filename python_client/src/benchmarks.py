@@ -0,0 +1,1155 @@
+"""
+Headless benchmarks for the rules engine and client (timings only; correctness checks are the pytest tests in python_client/tests);
+Run from python_client, e.g. `poetry run python src/benchmarks.py engines`.
+"""
+import argparse
+import os
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Callable
+
+from project_types import (
+    BOARD_ROWS, BOARD_COLS,
+    GameStatus, PieceKind, ActionType, Location, PlayerNumber, MovePossibilities,
+    GameState, PlayerAction,
+    )
+from model import GameModel, Board, BoardSetter, DefaultPositions, PieceFactory, Piece, ProtectedPiece
+from bitboard import BOARD_ENGINES
+from action_codes import decode_action
+from ai import AlphaBetaSearch
+from transposition import TranspositionTable
+from parallel_search import ParallelSearch
+from mcts import MCTSSearch, PLAYOUT_POLICIES
+import wire_codec
+import state_diff
+import notation
+from random_games import state_actions, random_game, random_search_game, late_game_model
+
+if TYPE_CHECKING:
+    import pygame
+    from websockets.asyncio.server import ServerConnection
+    from view import Tile
+
+
+def bench_engines(games: int, max_actions: int, seed: int):
+    """Random games per board engine, through GameState and through push and legal_action_codes"""
+    for label, play in (("through GameState (as the view)", random_game), ("through push and legal_action_codes (as searches)", random_search_game)):
+        print(label)
+
+        for name, engine in BOARD_ENGINES.items():
+            made = 0
+            start = time.perf_counter()
+
+            for game in range(games):
+                made += play(GameModel.default(engine), random.Random(seed + game), max_actions)
+
+            elapsed = time.perf_counter() - start
+            print(f"{name:>10}: {made} actions in {elapsed:.3f}s ({made / elapsed:,.0f} actions/s)")
+
+
+def bench_mappings(games: int, max_actions: int, seed: int):
+    requests = rebuilds = made = 0
+    elapsed = 0.0
+
+    for game in range(games):
+        board = Board(BOARD_ROWS, BOARD_COLS)
+        BoardSetter(DefaultPositions()).set_board(board)
+        model = GameModel(GameModel.default().state, board, PlayerNumber.ONE, 3)
+        rng = random.Random(seed + game)
+
+        for _ in range(max_actions):
+            actions = state_actions(model.state)
+            if model.state.game_status != GameStatus.ONGOING or not actions:
+                break
+
+            before = (board.mapping_requests, board.mapping_rebuilds)
+            start = time.perf_counter()
+            model.make_action(rng.choice(actions))
+            elapsed += time.perf_counter() - start
+
+            requests += board.mapping_requests - before[0]
+            rebuilds += board.mapping_rebuilds - before[1]
+            made += 1
+
+    print(f"{made} actions, {elapsed / made * 1e3:.2f} ms per make_action")
+    print(f"mapping lookups per action (each was a full 64-tile rebuild before): {requests / made:.1f}")
+    print(f"full mapping rebuilds per action now: {rebuilds / made:.1f}")
+
+
+def uncached_droppable_locations(board: Board, owner: PlayerNumber) -> list[Location]:
+    """Reference: every tile checked against every protected piece's freshly computed range (pre-cache implementation)"""
+    opponent = PlayerNumber.ONE if owner == PlayerNumber.TWO else PlayerNumber.TWO
+    locations = [Location(row, col) for row in range(BOARD_ROWS) for col in range(BOARD_COLS)]
+    droppable: list[Location] = []
+
+    for location in locations:
+        if board.get_live_piece(location) is not None:
+            continue
+
+        protected = [
+            piece for loc in locations
+            if type(piece := board.get_live_piece(loc)) == ProtectedPiece
+        ]
+        if not any(location in piece.get_movement_range(board.get_movable_locations_mapping(opponent)) for piece in protected):
+            droppable.append(location)
+
+    return droppable
+
+
+def bench_drops(min_captures: int, repeat: int, seed: int):
+    model = late_game_model(min_captures, seed)
+    captured = model.state.captured_pieces
+    print(f"position: {len(captured)} captured pieces, {len(model.state.live_pieces)} live pieces")
+
+    board = Board(BOARD_ROWS, BOARD_COLS)
+    for piece in model.state.live_pieces:
+        assert piece.location is not None
+        board.put(piece.location.row, piece.location.col, PieceFactory.make(piece.kind, piece.location, piece.owner), piece.owner)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for piece in captured:
+            uncached_droppable_locations(board, piece.owner)
+    uncached = (time.perf_counter() - start) / repeat
+
+    hand = [PieceFactory.make(piece.kind, Location(0, 0), piece.owner) for piece in captured]
+    empty = captured[0].moves[0]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        board.take(empty) # any grid write invalidates the per-state cache
+        for piece in hand:
+            if type(piece) == Piece:
+                board.get_piece_droppable_locations(piece)
+    cached = (time.perf_counter() - start) / repeat
+
+    print(f"drop targets for all captures, per state: uncached {uncached * 1e3:.2f} ms, cached {cached * 1e3:.3f} ms ({uncached / cached:.0f}x)")
+
+    start = time.perf_counter()
+    model.make_action(state_actions(model.state)[0])
+    print(f"make_action in this position: {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+
+def bench_roundtrip(trials: int, depth: int, seed: int):
+    """Random walks made with push and reverted with pop, per board engine"""
+    for name, engine in BOARD_ENGINES.items():
+        rng = random.Random(seed)
+        pushed = 0
+        elapsed = 0.0
+
+        for _ in range(trials):
+            model = GameModel.default(engine)
+            made = 0
+
+            for _ in range(depth):
+                actions = state_actions(model.state)
+                if model.state.game_status != GameStatus.ONGOING or not actions:
+                    break
+
+                start = time.perf_counter()
+                model.push(rng.choice(actions))
+                elapsed += time.perf_counter() - start
+                made += 1
+
+            start = time.perf_counter()
+            for _ in range(made):
+                model.pop()
+            elapsed += time.perf_counter() - start
+            pushed += made
+
+        print(f"{name:>10}: {trials} random walks of up to {depth} actions; {pushed / elapsed:,.0f} push+pop pairs/s")
+
+
+def bench_actions(games: int, max_actions: int, seed: int):
+    for name, engine in BOARD_ENGINES.items():
+        positions = 0
+        from_state = generated = encoded = 0.0
+
+        for game in range(games):
+            model = GameModel.default(engine)
+            rng = random.Random(seed + game)
+
+            for _ in range(max_actions):
+                state = model.state
+                expected = state_actions(state)
+                if state.game_status != GameStatus.ONGOING or not expected:
+                    break
+
+                start = time.perf_counter()
+                model.push(expected[0])
+                model.pop()
+                state_actions(model.state)
+                from_state += time.perf_counter() - start
+
+                start = time.perf_counter()
+                model.push(expected[0])
+                model.pop()
+                for _ in model.legal_actions():
+                    pass
+                generated += time.perf_counter() - start
+
+                start = time.perf_counter()
+                model.push(expected[0])
+                model.pop()
+                for _ in model.legal_action_codes():
+                    pass
+                encoded += time.perf_counter() - start
+
+                positions += 1
+                model.make_action(rng.choice(expected))
+
+        print(f"{name:>10}: {positions} positions; per position: "
+              f"GameState {from_state / positions * 1e6:.0f} us, "
+              f"legal_actions {generated / positions * 1e6:.0f} us, "
+              f"legal_action_codes {encoded / positions * 1e6:.0f} us")
+
+
+def bench_lazy(games: int, max_actions: int, min_captures: int, seed: int):
+    """make_action latency with lazily generated LivePiece.moves, and with every move list generated (previous behaviour)"""
+    rng = random.Random(seed)
+    late = late_game_model(min_captures, seed).history
+    phases = {'opening': [], f'late ({min_captures}+ captures)': late}
+
+    print(f"\nmake_action latency over {games} random walks of {max_actions} actions, per position:")
+
+    for name, engine in BOARD_ENGINES.items():
+        for phase, prefix in phases.items():
+            timings: dict[str, list[float]] = {'lazy': [], 'every move list read (as before)': []}
+
+            for _ in range(games):
+                walk_seed = rng.randrange(1 << 30)
+
+                for label, samples in timings.items():
+                    walk = random.Random(walk_seed)
+                    model = GameModel.default(engine)
+                    for action in prefix:
+                        model.push(action)
+
+                    for _ in range(max_actions):
+                        codes = list(model.legal_action_codes())
+                        if model.game_status != GameStatus.ONGOING or not codes:
+                            break
+
+                        action = decode_action(walk.choice(codes))
+                        start = time.perf_counter()
+                        model.make_action(action)
+                        if label != 'lazy':
+                            for piece in model.state.live_pieces + model.state.captured_pieces:
+                                piece.moves
+                        samples.append(time.perf_counter() - start)
+
+            for label, samples in timings.items():
+                samples.sort()
+                print(f"{name:>10} {phase:>22} {label:>33}: mean {sum(samples) / len(samples) * 1e6:6.1f} us, "
+                      f"p99 {samples[int(len(samples) * 0.99)] * 1e6:6.1f} us")
+
+
+def bench_search(budget_ms: int, repeat: int, seed: int):
+    positions = {
+        'opening': GameModel.default(),
+        'late game': late_game_model(15, seed),
+    }
+    search = AlphaBetaSearch()
+
+    for name, model in positions.items():
+        overshoot = 0.0
+        for _ in range(repeat):
+            result = search.search(model, budget_ms)
+            overshoot = max(overshoot, result.elapsed * 1e3 - budget_ms)
+
+        print(f"{name:>10}: {result.summary()}; worst overshoot {overshoot:.1f} ms over {repeat} searches")
+
+
+def bench_tt(depth: int, sizes_mb: list[float], seed: int):
+    """Iterative deepening to a fixed depth without and with transposition tables of several sizes"""
+    positions = {
+        'opening': GameModel.default(),
+        'late game': late_game_model(15, seed),
+    }
+
+    for name, model in positions.items():
+        baseline = AlphaBetaSearch(max_depth=depth).search(model, budget_ms=10**9)
+        print(f"{name:>10}: no table: {baseline.summary()}")
+
+        for size_mb in sizes_mb:
+            table = TranspositionTable(size_mb)
+            result = AlphaBetaSearch(max_depth=depth, table=table).search(model, budget_ms=10**9)
+
+            print(f"{'':>10}  {size_mb:g} MB ({table.capacity:,} entries, {table.fill_ratio():.1%} full): {result.summary()}; "
+                  f"{baseline.elapsed / result.elapsed:.1f}x faster")
+            print(f"{'':>10}    {table.stats.summary()}")
+
+
+def bench_parallel(depth: int, workers: list[int], table_mb: float, seed: int):
+    """Iterative deepening to a fixed depth: single process vs ParallelSearch per worker count"""
+    positions = {
+        'opening': GameModel.default(),
+        'middle game': late_game_model(6, seed),
+        'late game': late_game_model(15, seed),
+    }
+
+    print(f"{os.cpu_count()} CPUs; compact position {len(GameModel.default().to_compact())} bytes")
+
+    for name, model in positions.items():
+        serial = AlphaBetaSearch(max_depth=depth, table=TranspositionTable(table_mb)).search(model, budget_ms=10**9)
+        print(f"{name:>11}: 1 process: {serial.summary()}")
+
+        for count in workers:
+            with ParallelSearch(count, max_depth=depth, table_mb=table_mb) as search:
+                result = search.search(model, budget_ms=10**9)
+
+            agrees = "same score" if result.score == serial.score else f"score differs ({serial.score})"
+            print(f"{'':>11}  {count} workers: {result.summary()}; {serial.elapsed / result.elapsed:.2f}x speedup, {agrees}")
+
+
+def bench_mcts(budget_ms: int, workers: list[int], batch_size: int, seed: int):
+    """Playouts/s per playout policy and worker count, and root visits kept by subtree reuse"""
+    positions = {
+        'opening': GameModel.default(),
+        'late game': late_game_model(15, seed),
+    }
+
+    for name, model in positions.items():
+        for policy_name, policy in PLAYOUT_POLICIES.items():
+            for count in workers:
+                with MCTSSearch(policy=policy(), batch_size=batch_size, workers=count, seed=seed) as search:
+                    result = search.search(model, budget_ms)
+
+                print(f"{name:>10}: {policy_name:>7} playouts, {count} workers: {result.summary()}")
+
+    # Reuse: search, make the chosen action, search again from the child
+    search = MCTSSearch(batch_size=batch_size, seed=seed)
+    model = GameModel.default()
+    for _ in range(3):
+        result = search.search(model, budget_ms)
+        if result.action is None:
+            break
+        model.make_action(result.action)
+        search.search(model, budget_ms)
+        print(f"  reuse: {search.reused_visits:,} root visits kept after {len(model.history)} actions")
+
+
+def bench_batch(boards: int, steps: int, seed: int):
+    """Random playouts: batch_engine.BatchEngine vs GameModel one action at a time"""
+    # numpy is only needed here, not by the game
+    try:
+        import numpy as np
+        from batch_engine import BatchEngine, random_actions
+    except ImportError as error:
+        raise SystemExit(f"batch needs numpy >= 2.0 (poetry install --extras batch, or pip install 'numpy>=2.0'): {error}")
+
+    rng = np.random.default_rng(seed)
+
+    # GameModel: one random playout action at a time
+    py_rng = random.Random(seed)
+    made = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < 2:
+        model = GameModel.default()
+        while model.game_status == GameStatus.ONGOING and len(model.history) < steps:
+            codes = list(model.legal_action_codes())
+            if not codes:
+                break
+            model.push(decode_action(py_rng.choice(codes)))
+            made += 1
+    single = made / (time.perf_counter() - start)
+    print(f"  GameModel: {single:>12,.0f} positions/s")
+
+    batch = BatchEngine.from_compact([GameModel.default().to_compact()] * boards)
+    made = 0
+    start = time.perf_counter()
+    for _ in range(steps):
+        actions = random_actions(batch.legal_groups(), rng)
+        batch.apply(actions)
+        made += int((actions >= 0).sum())
+    batched = made / (time.perf_counter() - start)
+    print(f"BatchEngine: {batched:>12,.0f} positions/s at K={boards} over {steps} actions ({batched / single:.0f}x)")
+
+
+def bench_sprites(frames: int):
+    """Board and captures rendering per frame with the sprite cache, vs loading every sprite from disk (previous behaviour)"""
+    # Headless display; pygame is only needed here
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame
+    from view import SCREEN_WIDTH, SCREEN_HEIGHT, SPRITES, RenderableBoard, Captures, load_sprite
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    state = late_game_model(10, 0).state
+    board = RenderableBoard(state.live_pieces)
+    captures = {player: Captures(player) for player in PlayerNumber}
+    for player, row in captures.items():
+        row.set_captures([piece for piece in state.captured_pieces if piece.owner == player])
+
+    start = time.perf_counter()
+    SPRITES.clear()
+    SPRITES.preload()
+    preload = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        board.mark_all_dirty()
+        board.render_to_screen(screen)
+        for row in captures.values():
+            row.mark_dirty()
+            row.render_to_screen(screen)
+    cached = (time.perf_counter() - start) / frames
+
+    pieces = state.live_pieces + state.captured_pieces
+    start = time.perf_counter()
+    for _ in range(frames):
+        for piece in pieces:
+            load_sprite(piece.kind, piece.owner, 64)
+    loading = (time.perf_counter() - start) / frames
+
+    print(f"preload: {preload * 1e3:.1f} ms; {len(pieces)} pieces drawn per frame")
+    print(f"cached frame: {cached * 1e3:.2f} ms ({SPRITES.summary()})")
+    print(f"uncached: +{loading * 1e3:.2f} ms per frame loading sprites ({(cached + loading) / cached:.1f}x the cached frame)")
+
+    pygame.quit()
+
+
+def bench_render(frames: int, seconds: float):
+    """Frame time and CPU use of full redraws every frame (previous behaviour) vs dirty-rect rendering (dummy display)"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame
+    from view import SCREEN_WIDTH, SCREEN_HEIGHT, SPRITES, GameView
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    SPRITES.preload()
+
+    def make_view(model: GameModel) -> GameView:
+        view = GameView(model.state)
+        view._screen = screen  # pyright: ignore[reportPrivateUsage]
+        return view
+
+    def full_frame(view: GameView):
+        view._needs_full_redraw = True  # pyright: ignore[reportPrivateUsage]
+        view._render_frame()  # pyright: ignore[reportPrivateUsage]
+        pygame.display.flip()
+
+    def dirty_frame(view: GameView):
+        view._push_frame()  # pyright: ignore[reportPrivateUsage]
+
+    def workload(name: str, view: GameView, model: GameModel, frame: int, rng: random.Random):
+        """Change something every 10th frame, like a player would"""
+        if frame % 10 != 0 or name == 'idle':
+            return
+
+        if name == 'select':
+            pieces = [piece for piece in model.state.live_pieces if piece.owner == model.state.active_player and piece.moves]
+            location = rng.choice(pieces).location
+            assert location is not None
+            view._start_move_turn(location)  # pyright: ignore[reportPrivateUsage]
+
+        elif model.state.game_status == GameStatus.ONGOING:
+            actions = state_actions(model.state)
+            if actions:
+                model.make_action(rng.choice(actions))
+                view.on_state_change(model.state)
+                view._rerender_after_turn()  # pyright: ignore[reportPrivateUsage]
+
+    print(f"{frames} uncapped frames per workload; the view changes every 10th frame ('idle': never)")
+    for name in ('idle', 'select', 'play'):
+        for label, render in (('full redraw', full_frame), ('dirty rects', dirty_frame)):
+            model = GameModel.default()
+            view = make_view(model)
+            rng = random.Random(0)
+            render(view)
+
+            wall, cpu = time.perf_counter(), time.process_time()
+            for frame in range(frames):
+                workload(name, view, model, frame, rng)
+                render(view)
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+
+            print(f"{name:>7} {label}: {wall / frames * 1e3:7.3f} ms/frame ({frames / wall:8,.0f} FPS), {cpu / frames * 1e3:7.3f} ms CPU/frame")
+
+    print(f"\nidle at 60 FPS for {seconds:.1f}s")
+    for label, render in (('full redraw', full_frame), ('dirty rects', dirty_frame)):
+        view = make_view(GameModel.default())
+        clock = pygame.time.Clock()
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        while time.perf_counter() - wall < seconds:
+            pygame.event.pump()
+            render(view)
+            clock.tick(60)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+
+        print(f"{label}: {cpu / wall:6.1%} of a core")
+
+    pygame.quit()
+
+
+def bench_loop(seconds: float, messages: int):
+    """Idle CPU use and wake-up latency of GameView.run with a fixed 60 FPS loop vs the event-driven loop (dummy display)"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import threading
+    import statistics
+    import pygame
+    from view import GameView
+
+    wake = pygame.event.custom_type()
+    """Stands in for online_view.NETWORK_MESSAGE, posted from another thread like NetworkPump does"""
+
+    print(f"GameView.run idle for {seconds:.1f}s, then {messages} events posted from another thread 10-40 ms apart")
+    for label, event_driven in (('fixed 60 FPS', False), ('event-driven', True)):
+        view = GameView(GameModel.default().state, event_driven)
+        latencies: list[float] = []
+        cpu: list[float] = []
+        next_events = view._next_events  # pyright: ignore[reportPrivateUsage]
+
+        def timed_events() -> list[pygame.event.Event]:
+            events = next_events()
+            now = time.perf_counter()
+            latencies.extend(now - event.sent for event in events if event.type == wake)
+            return events
+
+        def drive():
+            while not pygame.display.get_init():
+                time.sleep(0.01)
+            time.sleep(0.5)
+
+            wall, start = time.perf_counter(), time.process_time()
+            time.sleep(seconds)
+            cpu.append((time.process_time() - start) / (time.perf_counter() - wall))
+
+            rng = random.Random(0)
+            for _ in range(messages):
+                time.sleep(rng.uniform(0.01, 0.04))
+                pygame.event.post(pygame.event.Event(wake, sent=time.perf_counter()))
+
+            time.sleep(0.1)
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+        view._next_events = timed_events  # pyright: ignore[reportPrivateUsage]
+        driver = threading.Thread(target=drive)
+        driver.start()
+        view.run()
+        driver.join()
+
+        latencies.sort()
+        print(f"{label}: idle {cpu[0]:6.1%} of a core; wake-up latency "
+              f"mean {statistics.mean(latencies) * 1e3:.2f} ms, p99 {latencies[int(len(latencies) * 0.99)] * 1e3:.2f} ms "
+              f"({len(latencies)} events)")
+
+
+def drawn_tiles(tiles: list['Tile']) -> 'pygame.Surface':
+    """Reference: every tile drawn on its own surface, then copied to the board (pre-cache implementation)"""
+    import pygame
+    from view import TILE_PIXELS, BOARD_WIDTH, BOARD_HEIGHT, get_blittable
+
+    surface = pygame.Surface((BOARD_WIDTH, BOARD_HEIGHT))
+    actual_tile = pygame.Surface((TILE_PIXELS, TILE_PIXELS))
+
+    for tile in tiles:
+        actual_tile.fill('white')
+        pygame.draw.rect(actual_tile, "black", pygame.Rect(0, 0, TILE_PIXELS, TILE_PIXELS), width=1)
+        if tile.occupier is not None:
+            actual_tile.blit(get_blittable(tile.occupier), (0, 0))
+        if tile.is_targetable:
+            pygame.draw.circle(actual_tile, 'blue', (TILE_PIXELS//2, TILE_PIXELS//2), 16.0)
+        surface.blit(actual_tile, tile.rect)
+
+    return surface
+
+def bench_background(frames: int):
+    """Full board redraw drawing every tile's grid, border and dot (previous behaviour) vs blitting cached surfaces, and cached text (dummy display)"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame
+    from view import SCREEN_WIDTH, SCREEN_HEIGHT, BOARD_WIDTH, BOARD_HEIGHT, SPRITES, RenderableBoard, TextCache
+
+    pygame.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    SPRITES.preload()
+
+    model = late_game_model(10, 0)
+    board = RenderableBoard(model.state.live_pieces)
+    piece = next(piece for piece in model.state.live_pieces if piece.owner == model.state.active_player and piece.moves)
+    board.mark_nearby_targetable(piece)
+    tiles = [board.get_tile(Location(row, col)) for row in range(BOARD_ROWS) for col in range(BOARD_COLS)]
+
+    def cached_tiles() -> pygame.Surface:
+        surface = pygame.Surface((BOARD_WIDTH, BOARD_HEIGHT))
+
+        for tile in tiles:
+            tile.render_to_board(surface)
+
+        return surface
+
+    print(f"late-game board, {sum(tile.is_targetable for tile in tiles)} target dots:")
+    for label, render in (('drawn tiles', lambda: drawn_tiles(tiles)), ('cached surfaces', cached_tiles)):
+        start = time.perf_counter()
+        for _ in range(frames):
+            render()
+        print(f"{label:>15}: {(time.perf_counter() - start) / frames * 1e3:.3f} ms per full board")
+
+    font = pygame.font.SysFont('Arial', 25)
+    texts = TextCache(font)
+    lines = [("Game Verdict: Player 1 won!", 'black'), ("P1", 'green'), ("P1", 'white')]
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        for text, color in lines:
+            font.render(text, True, color)
+    rendered = (time.perf_counter() - start) / frames
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        for text, color in lines:
+            texts.get(text, color)
+    cached = (time.perf_counter() - start) / frames
+
+    print(f"text per frame: font.render {rendered * 1e6:.1f} µs, TextCache {cached * 1e6:.1f} µs ({texts.summary()})")
+
+    pygame.quit()
+
+
+def bench_wire(repeat: int, seed: int):
+    """Payload sizes and encode/decode throughput of the compact wire codec vs the previous string payloads"""
+    rng = random.Random(seed)
+    actions = [
+        PlayerAction(action_type, player, source, Location(target // BOARD_COLS, target % BOARD_COLS), kind)
+        for kind in PieceKind
+        for player in PlayerNumber
+        for action_type, sources in (
+            (ActionType.MOVE, [Location(tile // BOARD_COLS, tile % BOARD_COLS) for tile in range(BOARD_ROWS * BOARD_COLS)]),
+            (ActionType.DROP, [None]),
+        )
+        for source in sources
+        for target in range(BOARD_ROWS * BOARD_COLS)
+    ]
+
+    sample = rng.sample(actions, 1000)
+    legacy = [wire_codec.encode_legacy(action) for action in sample]
+    compact = [wire_codec.encode(action) for action in sample]
+    texts = [wire_codec.encode_text([action]) for action in sample]
+
+    print(f"payload size: legacy {sum(map(len, legacy)) / len(sample):.1f} bytes, compact {len(compact[0])} bytes, "
+          f"compact text {len(texts[0])} bytes; a 3-action turn as a text batch: {len(wire_codec.encode_text(sample[:3]))} bytes")
+
+    def timed(label: str, work: Callable[[], object]):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            work()
+        elapsed = time.perf_counter() - start
+        print(f"{label:>22}: {repeat * len(sample) / elapsed:12,.0f} actions/s")
+
+    timed('legacy encode', lambda: [wire_codec.encode_legacy(action) for action in sample])
+    timed('compact encode', lambda: [wire_codec.encode(action) for action in sample])
+    timed('compact text encode', lambda: [wire_codec.encode_text([action]) for action in sample])
+    timed('legacy decode', lambda: [wire_codec.decode_legacy(payload) for payload in legacy])
+    timed('compact decode', lambda: [wire_codec.decode(data) for data in compact])
+    timed('compact text decode', lambda: [wire_codec.decode_text(text) for text in texts])
+
+    batches = [wire_codec.encode_batch(sample[start:start + 250]) for start in range(0, len(sample), 250)]
+    timed('compact batch decode', lambda: [wire_codec.decode(batch) for batch in batches])
+
+
+def bench_diff(games: int, max_actions: int, seed: int):
+    """State diffs between consecutive positions vs full snapshots: bytes and microseconds per action, and the view's tile updates"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pickle
+    from view import RenderableBoard
+
+    rng = random.Random(seed)
+    histories: list[list[PlayerAction]] = []
+    pairs: list[tuple[bytes, bytes, GameState]] = []
+
+    for _ in range(games):
+        model = GameModel.default()
+        before = model.to_compact()
+
+        while len(model.history) < max_actions and model.game_status == GameStatus.ONGOING:
+            codes = list(model.legal_action_codes())
+            if not codes:
+                break
+
+            model.make_action(decode_action(rng.choice(codes)))
+            after = model.to_compact()
+            pairs.append((before, after, model.state))
+            before = after
+
+        histories.append(model.history)
+
+    diffs = [state_diff.encode(state_diff.diff(before, after)) for before, after, _ in pairs]
+    snapshots = [pickle.dumps(state, pickle.HIGHEST_PROTOCOL) for _, _, state in pairs]
+    texts = [state_diff.encode_text(state_diff.diff(before, after)) for before, after, _ in pairs]
+
+    print(f"{len(pairs):,} actions of {games} random games")
+    print(f"\nbytes per action: pickled GameState {sum(map(len, snapshots)) / len(pairs):,.0f}, compact snapshot {len(pairs[0][1])}, "
+          f"diff {sum(map(len, diffs)) / len(pairs):.1f} (max {max(map(len, diffs))}), diff text {sum(map(len, texts)) / len(pairs):.1f}; "
+          f"full snapshot as diff text {len(state_diff.encode_text(state_diff.diff(state_diff.EMPTY_POSITION, pairs[-1][1])))}")
+
+    def per_action(label: str, work: Callable[[], object]):
+        start = time.perf_counter()
+        work()
+        print(f"{label:>44}: {(time.perf_counter() - start) / len(pairs) * 1e6:8.1f} us/action")
+
+    def snapshot_states():
+        for history in histories:
+            model = GameModel.default()
+            for action in history:
+                model.make_action(action)
+                pickle.dumps(model.state, pickle.HIGHEST_PROTOCOL)
+
+    def compact_snapshots():
+        for history in histories:
+            model = GameModel.default()
+            for action in history:
+                model.push(action)
+                model.to_compact()
+
+    def compact_diffs():
+        for history in histories:
+            model = GameModel.default()
+            before = model.to_compact()
+            for action in history:
+                model.push(action)
+                after = model.to_compact()
+                state_diff.encode(state_diff.diff(before, after))
+                before = after
+
+    print("\nsending (including the action itself):")
+    per_action('GameState rebuilt and pickled', snapshot_states)
+    per_action('compact snapshot', compact_snapshots)
+    per_action('compact diff, encoded', compact_diffs)
+
+    print("receiving:")
+    per_action('pickled GameState loaded', lambda: [pickle.loads(snapshot) for snapshot in snapshots])
+    per_action('diff decoded and applied', lambda: [
+        state_diff.apply(before, state_diff.decode(data)) for (before, _, _), data in zip(pairs, diffs)
+    ])
+
+    board = RenderableBoard(GameModel.default().state.live_pieces)
+    states = [state for _, _, state in pairs]
+    positions = [state_diff.compact_state(GameModel.default().state)] + [state_diff.compact_state(state) for state in states]
+
+    def incremental():
+        for index, state in enumerate(states):
+            pieces = {piece.location: piece for piece in state.live_pieces if piece.location is not None}
+            board.apply_diff(state_diff.diff(positions[index], state_diff.compact_state(state)), pieces)
+
+    print("view tiles after each action:")
+    per_action('every tile reset (previous)', lambda: [board.set_board_state(state.live_pieces) for state in states])
+    board.set_board_state(GameModel.default().state.live_pieces)
+    per_action('changed tiles from the diff', incremental)
+
+
+def _tuple_string(positions: list[tuple[PlayerNumber, PieceKind, Location]]) -> str:
+    """Reference: ad-hoc 'player-kind-row,col' format of the 'list tuple parsing.py' scratch file (board only)"""
+    return " ".join(f"{player.value}-{kind.value}-{location.row},{location.col}" for player, kind, location in positions)
+
+def _parse_tuple_string(text: str) -> list[tuple[PlayerNumber, PieceKind, Location]]:
+    return [
+        (PlayerNumber(player), PieceKind(kind), Location(*(int(value) for value in location.split(","))))
+        for player, kind, location in (item.split("-") for item in text.split(" "))
+    ]
+
+def bench_notation(games: int, max_actions: int, parses: int, seed: int):
+    """Position notation: parse and format throughput over positions of random games"""
+    rng = random.Random(seed)
+    texts: list[str] = []
+
+    for _ in range(games):
+        model = GameModel.default()
+
+        while len(model.history) < max_actions and model.game_status == GameStatus.ONGOING:
+            codes = list(model.legal_action_codes())
+            if not codes:
+                break
+
+            model.make_action(decode_action(rng.choice(codes)))
+            if model.game_status != GameStatus.ONGOING:
+                break
+
+            texts.append(notation.from_model(model))
+
+    print(f"{len(texts):,} positions of {games} random games, "
+          f"{sum(map(len, texts)) / len(texts):.1f} characters on average (e.g. {texts[-1]!r})")
+
+    compacts = [notation.to_compact(text) for text in texts]
+    tuple_strings = [_tuple_string(notation.NotationPositions(text).get_positions()) for text in texts]
+    print(f"the scratch file's tuple strings take {sum(map(len, tuple_strings)) / len(tuple_strings):.0f} characters, without hands or turn fields")
+
+    def throughput(label: str, items: list, work: Callable, count: int):
+        batch = (items * (count // len(items) + 1))[:count]
+        start = time.perf_counter()
+        for item in batch:
+            work(item)
+        elapsed = time.perf_counter() - start
+        print(f"{label:>36}: {count / elapsed:>12,.0f} positions/s ({elapsed / count * 1e6:.2f} us each)")
+
+    def cold_throughput(label: str, items: list, work: Callable):
+        elapsed = 0.0
+        for item in items:
+            notation.clear_caches()
+            start = time.perf_counter()
+            work(item)
+            elapsed += time.perf_counter() - start
+        print(f"{label:>36}: {len(items) / elapsed:>12,.0f} positions/s ({elapsed / len(items) * 1e6:.2f} us each)")
+
+    print(f"\ncold, caches cleared before each of the {len(texts):,} distinct positions:")
+    cold_throughput('notation -> compact', texts, notation.to_compact)
+    cold_throughput('compact -> notation', compacts, notation.from_compact)
+
+    notation.clear_caches()
+    print(f"\nwarm, cycling the same positions {parses:,} times (after the first pass every rank and hands lookup hits the caches):")
+    throughput('notation -> compact', texts, notation.to_compact, parses)
+    throughput('compact -> notation', compacts, notation.from_compact, parses)
+    throughput('notation -> NotationPositions', texts, notation.NotationPositions, parses // 10)
+    throughput('tuple string -> tuples (scratch)', tuple_strings, _parse_tuple_string, parses // 10)
+    for name, engine in BOARD_ENGINES.items():
+        throughput(f'notation -> GameModel ({name})', texts, lambda text: notation.to_model(text, engine), parses // 100)
+
+
+class RelayServer:
+    """Stand-in for the Go project server: ids 1 and 2, every text message broadcast to all clients as '<id> <payload>'; frees ids on disconnect"""
+    def __init__(self):
+        import asyncio
+        self._loop = asyncio.new_event_loop()
+        self._clients: dict[int, object] = {}
+        self.port = 0
+        self.received = 0
+
+        ready = threading.Event()
+        threading.Thread(target=self._run, args=(ready,), daemon=True).start()
+        ready.wait()
+
+    def _run(self, ready: threading.Event):
+        from websockets.asyncio.server import serve
+
+        async def main():
+            async with serve(self._handle, 'localhost', 0) as server:
+                self.port = next(iter(server.sockets)).getsockname()[1]
+                ready.set()
+                await server.serve_forever()
+
+        self._loop.run_until_complete(main())
+
+    async def _handle(self, connection: 'ServerConnection'):
+        from websockets.asyncio.server import broadcast
+
+        client_id = next((client_id for client_id in (1, 2) if client_id not in self._clients), 0)
+        if client_id == 0:
+            return
+
+        self._clients[client_id] = connection
+        await connection.send(f"{client_id} ")
+
+        try:
+            async for payload in connection:
+                self.received += 1
+                broadcast(list(self._clients.values()), f"{client_id} {payload}")  # pyright: ignore
+        finally:
+            del self._clients[client_id]
+
+    def kick(self, client_id: int):
+        """Drop a client's connection, as if the network failed"""
+        connection = self._clients[client_id]
+        self._loop.call_soon_threadsafe(lambda: self._loop.create_task(connection.close()))  # pyright: ignore
+
+
+def bench_net(messages: int, bursts: int):
+    """Echo round trips, outbound batching and reconnects of the asyncio client against a local stand-in for the project server"""
+    from async_networking import AsyncNetworking, Message
+
+    server = RelayServer()
+    arrived = {1: threading.Event(), 2: threading.Event()}
+    clients: dict[int, AsyncNetworking] = {}
+
+    for _ in range(2):
+        client = AsyncNetworking.connect('localhost', server.port, merge=wire_codec.merge_text, ping_interval=0.05)
+        client.set_message_callback(arrived[client.player_id].set)
+        clients[client.player_id] = client
+
+    one, two = clients[1], clients[2]
+    actions = [decode_action(code) for code in GameModel.default().legal_action_codes()]
+
+    def wait_for(client_id: int, count: int) -> list[str]:
+        payloads: list[str] = []
+        while len(payloads) < count:
+            if not arrived[client_id].wait(5.0):
+                raise TimeoutError(f"no message for client {client_id} within 5s")
+            arrived[client_id].clear()
+            payloads.extend(message.payload for message in clients[client_id].recv() if isinstance(message, Message))
+        return payloads
+
+    delivery: list[float] = []
+    for index in range(messages):
+        start = time.perf_counter()
+        one.send(wire_codec.encode_text([actions[index % len(actions)]]))
+        wait_for(2, 1)
+        delivery.append(time.perf_counter() - start)
+        wait_for(1, 1)
+
+    delivery.sort()
+    print(f"{messages} messages one at a time: echo round trip {one.rtt.summary()}")
+    print(f"  delivered to the other client: mean {sum(delivery) / len(delivery) * 1e3:.2f} ms, p99 {delivery[int(len(delivery) * 0.99)] * 1e3:.2f} ms")
+    print(f"  ping: {one.ping.summary()}")
+
+    sent, payloads_before, received_before = one.sent_messages, one.sent_payloads, server.received
+    for burst in range(bursts):
+        turn = [actions[(burst * 3 + index) % len(actions)] for index in range(3)]
+        for action in turn:
+            one.send(wire_codec.encode_text([action]))
+
+        received = [action for payload in wait_for(2, 1) for action in wire_codec.decode_text(payload)]
+        while len(received) < len(turn):
+            received += [action for payload in wait_for(2, 1) for action in wire_codec.decode_text(payload)]
+        wait_for(1, 1)
+        one.recv()
+
+    print(f"\n{bursts} turns of 3 actions sent back to back: {one.sent_payloads - payloads_before} payloads "
+          f"went out as {one.sent_messages - sent} messages ({server.received - received_before} reached the server)")
+
+    start = time.perf_counter()
+    server.kick(1)
+    while one.is_connected:
+        time.sleep(0.001)
+    one.send(wire_codec.encode_text([actions[0]]))
+    if not one.wait_connected(10.0):
+        raise TimeoutError("not reconnected within 10s")
+    reconnected = time.perf_counter() - start
+
+    print(f"\nreconnected after {reconnected * 1e3:.0f} ms as player {one.player_id} ({one.reconnects} reconnects); "
+          f"{one.dropped_payloads} payloads made against the previous connection were dropped instead of sent")
+
+    for client in clients.values():
+        client.close()
+
+
+def offset_movement_range(kind: PieceKind, row: int, col: int, valid_locations: dict[tuple[int, int], bool]) -> list[Location]:
+    """Reference: movement ranges computed from MovePossibilities offsets on every call (pre-table implementation)"""
+    match kind:
+        case PieceKind.EEVEE | PieceKind.EEVEE_SHINY:
+            possibilities = MovePossibilities.FORWARD if kind == PieceKind.EEVEE else MovePossibilities.FORWARD_OPPOSITE
+            return [
+                Location(row + dr, col + dc)
+                for dr, dc in possibilities.value
+                if 0 <= row + dr < BOARD_ROWS and 0 <= col + dc < BOARD_COLS and (row + dr, col + dc) in valid_locations
+            ]
+
+        case PieceKind.LATIOS | PieceKind.LATIAS:
+            possibilities = MovePossibilities.ORTHOGONALS if kind == PieceKind.LATIOS else MovePossibilities.DIAGONALS
+            return [
+                Location(row + dr, col + dc)
+                for dr, dc in possibilities.value
+                if 0 <= row + dr < BOARD_ROWS and 0 <= col + dc < BOARD_COLS and (row + dr, col + dc) in valid_locations and valid_locations[(row + dr, col + dc)]
+            ]
+
+        case PieceKind.PIKACHU | PieceKind.TURTWIG:
+            possibilities = MovePossibilities.DIAGONALS if kind == PieceKind.PIKACHU else MovePossibilities.ORTHOGONALS
+            locations: list[Location] = []
+
+            for dr, dc in possibilities.value:
+                temp_row, temp_col = row, col
+                while 0 <= temp_row + dr < BOARD_ROWS and 0 <= temp_col + dc < BOARD_COLS and (temp_row + dr, temp_col + dc) in valid_locations:
+                    temp_row += dr
+                    temp_col += dc
+                    if not valid_locations[(temp_row, temp_col)]:
+                        locations.append(Location(temp_row, temp_col))
+                        break
+                    locations.append(Location(temp_row, temp_col))
+
+            return locations
+
+
+def bench_movement(repeat: int):
+    board = Board(BOARD_ROWS, BOARD_COLS)
+    BoardSetter(DefaultPositions()).set_board(board)
+
+    mappings = {
+        'empty board': {(row, col): True for row in range(BOARD_ROWS) for col in range(BOARD_COLS)},
+        'opening': board.get_movable_locations_mapping(PlayerNumber.ONE),
+    }
+    squares = [(row, col) for row in range(BOARD_ROWS) for col in range(BOARD_COLS)]
+
+    for mapping_name, mapping in mappings.items():
+        print(f"{mapping_name}:")
+
+        for kind in PieceKind:
+            pieces = [PieceFactory.make(kind, Location(row, col), PlayerNumber.ONE) for row, col in squares]
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for row, col in squares:
+                    offset_movement_range(kind, row, col, mapping)
+            offsets = (time.perf_counter() - start) / (repeat * len(squares))
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for piece in pieces:
+                    piece.get_movement_range(mapping)
+            tables = (time.perf_counter() - start) / (repeat * len(squares))
+
+            print(f"{kind.value:>12}: offsets {offsets * 1e9:7.0f} ns/call, tables {tables * 1e9:7.0f} ns/call ({offsets / tables:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    engines = subparsers.add_parser('engines', help='random games per board engine (actions/s)')
+    engines.add_argument('--games', type=int, default=20)
+    engines.add_argument('--max-actions', type=int, default=200)
+    engines.add_argument('--seed', type=int, default=0)
+
+    mappings = subparsers.add_parser('mappings', help='movable locations mapping rebuilds per action')
+    mappings.add_argument('--games', type=int, default=5)
+    mappings.add_argument('--max-actions', type=int, default=200)
+    mappings.add_argument('--seed', type=int, default=0)
+
+    drops = subparsers.add_parser('drops', help='drop targets in a late-game position (cached vs uncached)')
+    drops.add_argument('--min-captures', type=int, default=15)
+    drops.add_argument('--repeat', type=int, default=20)
+    drops.add_argument('--seed', type=int, default=0)
+
+    roundtrip = subparsers.add_parser('roundtrip', help='random push/pop walks per board engine (push+pop pairs/s)')
+    roundtrip.add_argument('--trials', type=int, default=50)
+    roundtrip.add_argument('--depth', type=int, default=40)
+    roundtrip.add_argument('--seed', type=int, default=0)
+
+    actions = subparsers.add_parser('actions', help='legal action generator vs GameState enumeration')
+    actions.add_argument('--games', type=int, default=5)
+    actions.add_argument('--max-actions', type=int, default=200)
+    actions.add_argument('--seed', type=int, default=0)
+
+    lazy = subparsers.add_parser('lazy', help='make_action latency with lazily generated move lists (opening, late game)')
+    lazy.add_argument('--games', type=int, default=10)
+    lazy.add_argument('--max-actions', type=int, default=30)
+    lazy.add_argument('--min-captures', type=int, default=15)
+    lazy.add_argument('--seed', type=int, default=0)
+
+    search = subparsers.add_parser('search', help='alpha-beta search depth, nodes/s and deadline overshoot')
+    search.add_argument('--budget-ms', type=int, default=500)
+    search.add_argument('--repeat', type=int, default=5)
+    search.add_argument('--seed', type=int, default=0)
+
+    tt = subparsers.add_parser('tt', help='alpha-beta search to a fixed depth with transposition tables of several sizes')
+    tt.add_argument('--depth', type=int, default=4)
+    tt.add_argument('--sizes-mb', type=float, nargs='+', default=[0.25, 4, 64])
+    tt.add_argument('--seed', type=int, default=0)
+
+    parallel = subparsers.add_parser('parallel', help='single-process vs process pool root search at a fixed depth')
+    parallel.add_argument('--depth', type=int, default=3)
+    parallel.add_argument('--workers', type=int, nargs='+', default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parallel.add_argument('--table-mb', type=float, default=16)
+    parallel.add_argument('--seed', type=int, default=0)
+
+    mcts = subparsers.add_parser('mcts', help='MCTS playouts/s per playout policy and worker count, and subtree reuse')
+    mcts.add_argument('--budget-ms', type=int, default=1000)
+    mcts.add_argument('--workers', type=int, nargs='+', default=sorted({1, os.cpu_count() or 1}))
+    mcts.add_argument('--batch-size', type=int, default=8)
+    mcts.add_argument('--seed', type=int, default=0)
+
+    batch = subparsers.add_parser('batch', help='NumPy batch engine random playouts vs GameModel (requires numpy)')
+    batch.add_argument('--boards', type=int, default=4096)
+    batch.add_argument('--steps', type=int, default=200)
+    batch.add_argument('--seed', type=int, default=0)
+
+    sprites = subparsers.add_parser('sprites', help='frame render time with the sprite cache vs loading sprites per tile (dummy display)')
+    sprites.add_argument('--frames', type=int, default=200)
+
+    render = subparsers.add_parser('render', help='FPS and CPU use of full redraws vs dirty-rect rendering (dummy display)')
+    render.add_argument('--frames', type=int, default=600)
+    render.add_argument('--seconds', type=float, default=3.0, help='duration of the 60 FPS idle CPU measurement')
+
+    loop = subparsers.add_parser('loop', help='idle CPU and event wake-up latency of the fixed-FPS vs event-driven view loop (dummy display)')
+    loop.add_argument('--seconds', type=float, default=3.0, help='idle duration')
+    loop.add_argument('--messages', type=int, default=200)
+
+    background = subparsers.add_parser('background', help='board drawn per tile vs from cached background and overlays, and cached text (dummy display)')
+    background.add_argument('--frames', type=int, default=500)
+
+    wire = subparsers.add_parser('wire', help='compact wire codec payload sizes and throughput vs the previous string payloads')
+    wire.add_argument('--repeat', type=int, default=100)
+    wire.add_argument('--seed', type=int, default=0)
+
+    diff = subparsers.add_parser('diff', help='state diffs vs full snapshots per action: bytes, encode/apply time, view tile updates')
+    diff.add_argument('--games', type=int, default=20)
+    diff.add_argument('--max-actions', type=int, default=300)
+    diff.add_argument('--seed', type=int, default=0)
+
+    position_notation = subparsers.add_parser('notation', help='position notation parse and format throughput')
+    position_notation.add_argument('--games', type=int, default=20)
+    position_notation.add_argument('--max-actions', type=int, default=300)
+    position_notation.add_argument('--parses', type=int, default=1_000_000)
+    position_notation.add_argument('--seed', type=int, default=0)
+
+    net = subparsers.add_parser('net', help='asyncio client round trips, batching and reconnect time against a local stand-in server')
+    net.add_argument('--messages', type=int, default=500)
+    net.add_argument('--bursts', type=int, default=100)
+
+    movement = subparsers.add_parser('movement', help='per-call movement range latency over all tiles (tables vs offsets)')
+    movement.add_argument('--repeat', type=int, default=2000)
+
+    args = parser.parse_args()
+
+    match args.benchmark:
+        case 'engines':
+            bench_engines(args.games, args.max_actions, args.seed)
+
+        case 'mappings':
+            bench_mappings(args.games, args.max_actions, args.seed)
+
+        case 'drops':
+            bench_drops(args.min_captures, args.repeat, args.seed)
+
+        case 'roundtrip':
+            bench_roundtrip(args.trials, args.depth, args.seed)
+
+        case 'actions':
+            bench_actions(args.games, args.max_actions, args.seed)
+
+        case 'lazy':
+            bench_lazy(args.games, args.max_actions, args.min_captures, args.seed)
+
+        case 'search':
+            bench_search(args.budget_ms, args.repeat, args.seed)
+
+        case 'tt':
+            bench_tt(args.depth, args.sizes_mb, args.seed)
+
+        case 'parallel':
+            bench_parallel(args.depth, args.workers, args.table_mb, args.seed)
+
+        case 'mcts':
+            bench_mcts(args.budget_ms, args.workers, args.batch_size, args.seed)
+
+        case 'batch':
+            bench_batch(args.boards, args.steps, args.seed)
+
+        case 'sprites':
+            bench_sprites(args.frames)
+
+        case 'render':
+            bench_render(args.frames, args.seconds)
+
+        case 'loop':
+            bench_loop(args.seconds, args.messages)
+
+        case 'background':
+            bench_background(args.frames)
+
+        case 'wire':
+            bench_wire(args.repeat, args.seed)
+
+        case 'diff':
+            bench_diff(args.games, args.max_actions, args.seed)
+
+        case 'notation':
+            bench_notation(args.games, args.max_actions, args.parses, args.seed)
+
+        case 'net':
+            bench_net(args.messages, args.bursts)
+
+        case 'movement':
+            bench_movement(args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,384 @@
+"""
+Bitboard implementation of the board engine;
+Drop-in alternative to model.Board (select via GameModel.default(BitBoard)).
+Square index is row * width + col, i.e. bit 0 is the top-left tile.
+"""
+from typing import Iterator
+
+from project_types import PieceKind, ActionType, Location, PlayerNumber, LivePiece, PlayerAction
+from model import GameBoard, Board, Piece, ProtectedPiece, PieceFactory, LazyMoves
+from movement_tables import get_tables
+from zobrist import PIECE_KEYS, hand_change_key
+from action_codes import NO_SQUARE, make_code
+
+PROTECTED_KINDS = (PieceKind.LATIAS, PieceKind.LATIOS)
+SLIDING_KINDS = (PieceKind.PIKACHU, PieceKind.TURTWIG)
+CAPTURED_LOCATION = Location(-1, -1)
+
+
+def _other(player: PlayerNumber) -> PlayerNumber:
+    return PlayerNumber.ONE if player == PlayerNumber.TWO else PlayerNumber.TWO
+
+def _switched_kind(kind: PieceKind) -> PieceKind:
+    """Kind of a piece after Piece.switch_ownership"""
+    if kind == PieceKind.EEVEE:
+        return PieceKind.EEVEE_SHINY
+
+    if kind == PieceKind.EEVEE_SHINY:
+        return PieceKind.EEVEE
+
+    return kind
+
+def _iter_bits(mask: int):
+    """Yield square indices of set bits, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+_PIECES: dict[tuple[PieceKind, PlayerNumber, Location], Piece | ProtectedPiece] = {}
+"""
+Pieces returned by get_live_piece and get_captured_piece, one per (kind, owner, location);
+BitBoard never mutates them (move and capture only read their kind and owner), so they are shared
+"""
+
+def _piece(kind: PieceKind, owner: PlayerNumber, location: Location) -> Piece | ProtectedPiece:
+    key = (kind, owner, location)
+    piece = _PIECES.get(key)
+
+    if piece is None:
+        piece = _PIECES[key] = PieceFactory.make(kind, location, owner)
+
+    return piece
+
+
+class BitBoard:
+    def __init__(self, height: int, width: int):
+        self._height: int = height
+        self._width: int = width
+        self._full: int = (1 << (height * width)) - 1
+
+        self._occupied: int = 0
+        self._players: dict[PlayerNumber, int] = {PlayerNumber.ONE: 0, PlayerNumber.TWO: 0}
+        self._kinds: dict[PieceKind, int] = {kind: 0 for kind in PieceKind}
+        self._hands: dict[PlayerNumber, dict[PieceKind, int]] = {PlayerNumber.ONE: {}, PlayerNumber.TWO: {}}
+        # Kind and owner of every square, so lookups need not test each mask
+        self._square_kinds: list[PieceKind | None] = [None] * (height * width)
+        self._square_owners: list[PlayerNumber | None] = [None] * (height * width)
+        self._droppable: int | None = None
+        """Per-state cache of _droppable_mask; cleared by _set and _clear"""
+        self._zobrist_key: int = 0
+        self.version: int = 0
+        self._lazy_moves: LazyMoves | None = None
+
+        tables = get_tables(height, width)
+        self._step_masks = tables.kind_step_masks
+        self._square_rays = tables.kind_square_rays
+        self._locations = tables.locations
+
+    def _square(self, location: Location) -> int:
+        return location.row * self._width + location.col
+
+    def _location(self, square: int) -> Location:
+        return self._locations[square]
+
+    def _kind_at(self, square: int) -> PieceKind | None:
+        return self._square_kinds[square]
+
+    def _owner_at(self, square: int) -> PlayerNumber | None:
+        return self._square_owners[square]
+
+    @property
+    def zobrist_key(self) -> int:
+        """Key of tiles and captured pieces (without turn fields; see GameModel.zobrist_key)"""
+        return self._zobrist_key
+
+    def _set(self, square: int, kind: PieceKind, owner: PlayerNumber):
+        self._clear(square)
+        self._droppable = None
+        self.version += 1
+        bit = 1 << square
+        self._occupied |= bit
+        self._players[owner] |= bit
+        self._kinds[kind] |= bit
+        self._square_kinds[square] = kind
+        self._square_owners[square] = owner
+        self._zobrist_key ^= PIECE_KEYS[(kind, owner)][square]
+
+    def _clear(self, square: int):
+        kind = self._square_kinds[square]
+        owner = self._square_owners[square]
+        if kind is None or owner is None:
+            return
+
+        clear = ~(1 << square)
+        self._square_kinds[square] = None
+        self._square_owners[square] = None
+        self._droppable = None
+        self.version += 1
+        self._occupied &= clear
+        self._players[owner] &= clear
+        self._kinds[kind] &= clear
+        self._zobrist_key ^= PIECE_KEYS[(kind, owner)][square]
+
+    def _change_hand(self, player: PlayerNumber, kind: PieceKind, delta: int):
+        self.version += 1
+        hand = self._hands[player]
+        count = hand.get(kind, 0)
+        if count + delta:
+            hand[kind] = count + delta
+        else:
+            del hand[kind]
+
+        self._zobrist_key ^= hand_change_key(player, kind, count, count + delta)
+
+    def _protected_mask(self) -> int:
+        return self._kinds[PieceKind.LATIAS] | self._kinds[PieceKind.LATIOS]
+
+    def _ray_targets(self, square: int, kind: PieceKind, enemy: int) -> int:
+        """Slide until blocked; a ray includes the first enemy piece it meets"""
+        mask = 0
+        occupied = self._occupied
+
+        for ray in self._square_rays[kind][square]:
+            for target in ray:
+                bit = 1 << target
+                if occupied & bit:
+                    if enemy & bit:
+                        mask |= bit
+                    break
+                mask |= bit
+
+        return mask
+
+    def _movement_mask(self, square: int, kind: PieceKind, owner: PlayerNumber) -> int:
+        """Same ranges as model.Board.get_piece_movable_locations, as a bitmask"""
+        own = self._players[owner]
+
+        # Regular pieces cannot capture protected pieces
+        return self._targets(square, kind, ~self._occupied, self._occupied & ~own & ~self._protected_mask())
+
+    def _targets(self, square: int, kind: PieceKind, empty: int, capturable: int) -> int:
+        """_movement_mask given the position's empty tiles and the pieces the mover may capture, which are the same for all its pieces"""
+        if kind in PROTECTED_KINDS:
+            return self._step_masks[kind][square] & empty
+
+        if kind in SLIDING_KINDS:
+            return self._ray_targets(square, kind, capturable) & (empty | capturable)
+
+        return self._step_masks[kind][square] & (empty | capturable)
+
+    def _forbidden_drop_mask(self) -> int:
+        """Tiles in range of any Latias or Latios (see model.Board.is_valid_location)"""
+        mask = 0
+
+        for kind in PROTECTED_KINDS:
+            step_masks = self._step_masks[kind]
+            for square in _iter_bits(self._kinds[kind]):
+                mask |= step_masks[square]
+
+        return mask & ~self._occupied
+
+    def _droppable_mask(self) -> int:
+        if self._droppable is None:
+            self._droppable = self._full & ~self._occupied & ~self._forbidden_drop_mask()
+
+        return self._droppable
+
+    def _mask_to_locations(self, mask: int) -> list[Location]:
+        """Inlined _iter_bits, as move lists are built for every piece of every GameState read"""
+        locations = self._locations
+        result: list[Location] = []
+
+        while mask:
+            low = mask & -mask
+            result.append(locations[low.bit_length() - 1])
+            mask ^= low
+
+        return result
+
+    def _current_lazy_moves(self) -> LazyMoves:
+        if self._lazy_moves is None or self._lazy_moves.version != self.version:
+            self._lazy_moves = LazyMoves(self)
+
+        return self._lazy_moves
+
+    def get_live_pieces(self) -> list[LivePiece]:
+        """
+        For GameState; moves are generated on first access (see model.LazyMoves)
+        """
+        lazy_moves = self._current_lazy_moves()
+
+        return [LivePiece(kind, owner, lazy_moves.moves_at(location), location) for owner, kind, location in lazy_moves.pieces]
+
+    def get_captured_pieces(self) -> list[LivePiece]:
+        """
+        For GameState; moves are generated on first access (see model.LazyMoves)
+        """
+        pieces: list[LivePiece] = []
+        lazy_moves = self._current_lazy_moves()
+
+        for player in (PlayerNumber.ONE, PlayerNumber.TWO):
+            for kind, count in self._hands[player].items():
+                pieces.extend(LivePiece(kind, player, lazy_moves.drops(player), None) for _ in range(count))
+
+        return pieces
+
+    def get_moves_at(self, location: Location) -> list[Location]:
+        """Moves of the piece on location"""
+        square = location.row * self._width + location.col
+        kind = self._square_kinds[square]
+        owner = self._square_owners[square]
+        assert kind is not None and owner is not None
+
+        return self._mask_to_locations(self._movement_mask(square, kind, owner))
+
+    def get_drops(self, owner: PlayerNumber) -> list[Location]:
+        """Same for both players: empty tiles out of reach of every Latias and Latios"""
+        return self._mask_to_locations(self._droppable_mask())
+
+    def _iter_legal(self, player: PlayerNumber) -> Iterator[tuple[ActionType, PieceKind, int, int]]:
+        """(action type, kind, source, target) of every move, then every drop; see iter_legal_actions"""
+        own = self._players[player]
+        empty = self._full & ~self._occupied
+        capturable = self._occupied & ~own & ~self._protected_mask()
+
+        # Bits are iterated inline rather than with _iter_bits, as this runs for every node of a search
+        for kind in PieceKind:
+            pieces = own & self._kinds[kind]
+
+            while pieces:
+                low = pieces & -pieces
+                pieces ^= low
+                square = low.bit_length() - 1
+                targets = self._targets(square, kind, empty, capturable)
+
+                while targets:
+                    bit = targets & -targets
+                    targets ^= bit
+                    yield (ActionType.MOVE, kind, square, bit.bit_length() - 1)
+
+        for kind in list(self._hands[player]):
+            for target in _iter_bits(self._droppable_mask()):
+                yield (ActionType.DROP, kind, NO_SQUARE, target)
+
+    def iter_legal_actions(self, player: PlayerNumber) -> Iterator[PlayerAction]:
+        """
+        Lazily yield every move, then every drop (once per captured kind) of player;
+        Callers may push/pop actions between items as long as the position is restored before the next one
+        """
+        locations = self._locations
+
+        for action_type, kind, source, target in self._iter_legal(player):
+            yield PlayerAction(action_type, player, locations[source] if source != NO_SQUARE else None, locations[target], kind)
+
+    def iter_legal_action_codes(self, player: PlayerNumber) -> Iterator[int]:
+        """Same as iter_legal_actions, encoded as action_codes integers"""
+        for action_type, kind, source, target in self._iter_legal(player):
+            yield make_code(action_type, player, kind, source, target)
+
+    def iter_pieces(self) -> Iterator[tuple[PlayerNumber, PieceKind, Location | None]]:
+        """(owner, kind, location) of every piece, without computing moves; location is None for captured pieces"""
+        kinds, locations = self._square_kinds, self._locations
+
+        for player in PlayerNumber:
+            for square in _iter_bits(self._players[player]):
+                if (kind := kinds[square]) is not None:
+                    yield (player, kind, locations[square])
+
+            for kind, count in self._hands[player].items():
+                for _ in range(count):
+                    yield (player, kind, None)
+
+    def get_live_piece(self, location: Location) -> Piece | ProtectedPiece | None:
+        """Shared piece (see _PIECES); its location stays that of the lookup"""
+        square = self._square(location)
+        kind = self._square_kinds[square]
+        owner = self._square_owners[square]
+
+        if kind is None or owner is None:
+            return None
+
+        return _piece(kind, owner, self._locations[square])
+
+    def get_captured_piece(self, kind: PieceKind, player: PlayerNumber) -> Piece | None:
+        if self._hands[player].get(kind, 0) > 0:
+            piece = _piece(kind, player, CAPTURED_LOCATION)
+            if type(piece) == Piece:
+                return piece
+
+    def put(self, row: int, col: int, piece: Piece | ProtectedPiece, player: PlayerNumber):
+        self._set(row * self._width + col, piece.kind, player)
+
+    def put_captured(self, piece: Piece, player: PlayerNumber):
+        self._change_hand(player, piece.kind, 1)
+
+    def take(self, location: Location):
+        self._clear(self._square(location))
+
+    def move(self, location: Location, piece: Piece | ProtectedPiece):
+        """Unlike model.Board, pieces are not tracked, so piece (possibly shared, see _PIECES) is left as is"""
+        self._set(self._square(location), piece.kind, piece.owner)
+
+    def capture(self, target: Location, capturing_piece: Piece):
+        captured_kind = self._kind_at(self._square(target))
+        self.move(target, capturing_piece)
+
+        if captured_kind is not None and captured_kind not in PROTECTED_KINDS:
+            self._change_hand(capturing_piece.owner, _switched_kind(captured_kind), 1)
+
+    def drop(self, target: Location, piece: Piece, player: PlayerNumber):
+        self._change_hand(player, piece.kind, -1)
+        self.move(target, piece)
+
+    def undo_move(self, source: Location, target: Location, captured_piece: Piece | ProtectedPiece | None):
+        """Revert move or capture; captured_piece is the get_live_piece copy, so it still has its original kind and owner"""
+        square = self._square(target)
+        kind = self._kind_at(square)
+        owner = self._owner_at(square)
+        assert kind is not None and owner is not None
+
+        self._set(self._square(source), kind, owner)
+
+        if type(captured_piece) == Piece:
+            self._change_hand(owner, _switched_kind(captured_piece.kind), -1)
+            self._set(square, captured_piece.kind, captured_piece.owner)
+
+        else:
+            self._clear(square)
+
+    def undo_drop(self, target: Location, player: PlayerNumber):
+        square = self._square(target)
+        kind = self._kind_at(square)
+        assert kind is not None
+
+        self._clear(square)
+        self._change_hand(player, kind, 1)
+
+    def can_capture(self, location: Location) -> bool:
+        bit = 1 << self._square(location)
+        return bool(self._occupied & bit and not self._protected_mask() & bit)
+
+    def is_valid_location(self, location: Location, owner: PlayerNumber) -> bool:
+        return bool(self._droppable_mask() & 1 << self._square(location))
+
+    def opponent_immobile(self, curr_player: PlayerNumber) -> bool:
+        """
+        Checks if Latias and Latios of each player can still move
+        """
+        opponent = _other(curr_player)
+        protected = self._players[opponent] & self._protected_mask()
+
+        for kind in PROTECTED_KINDS:
+            for square in _iter_bits(protected & self._kinds[kind]):
+                if self._movement_mask(square, kind, opponent):
+                    return False
+
+        return True
+
+
+BOARD_ENGINES: dict[str, type[GameBoard]] = {
+    'board': Board,
+    'bitboard': BitBoard,
+}
+"""Board engines by name, for command line options (see GameModel.default)"""
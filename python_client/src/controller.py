@@ -1,12 +1,13 @@
 from model import GameModel
 from view import GameView
-from project_types import GameState, GameStateChangeObserver, PlayerAction
+from project_types import GameState, GameStateChangeObserver, PlayerAction, TurnProvider
 
 class GameController:
     def __init__(self, model: GameModel, view: GameView):
         self._model = model
         self._view = view
         self._game_state_change_observers: list[GameStateChangeObserver] = []
+        self._turn_providers: list[TurnProvider] = []
 
     def start(self):
         view = self._view
@@ -15,8 +16,17 @@ class GameController:
         view.register_make_turn_observer(self)
         view.register_new_game_observer(self)
 
+        for provider in self._turn_providers:
+            self.register_game_state_change_observer(provider)
+            view.register_turn_provider(provider)
+            provider.on_state_change(self._model.state)
+
         view.run()
 
+    def register_turn_provider(self, provider: TurnProvider):
+        """For non-human players (e.g. ai.ComputerPlayer); must be called before start"""
+        self._turn_providers.append(provider)
+
     def register_game_state_change_observer(self, observer: GameStateChangeObserver):
         self._game_state_change_observers.append(observer)
 
@@ -0,0 +1,317 @@
+"""
+Load generator for server.py: simulated clients in pairs, one room per pair, playing random legal actions with some think time
+(and a share of illegal ones, which must be rejected). Each client waits for the server's reply before its next action.
+Reports p50/p99 action latency (send until the server's reply) and rooms per core: rooms the server's CPU time would sustain
+on one fully used core at this load. Clients are spread over processes, e.g.
+`poetry run python src/loadgen.py --clients 2000 --duration 20 --spawn-server`
+With --scripted, pairs replay random games generated up front instead, so clients stay cheap enough to saturate the server;
+--workers 1 2 4 then compares aggregate actions per second of sharded servers (see sharded_server.py) per worker count,
+and --restart-every restarts one of their workers after another during the run.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed
+
+from project_types import GameStatus, PlayerAction
+from model import GameModel
+from action_codes import decode_action
+from bitboard import BOARD_ENGINES
+from server import SEAT_PLAYERS, STATS_PATH, REJECTION_PREFIX, ServerStats
+from sharded_server import RESTART_PATH
+import wire_codec
+
+CONNECT_TIMEOUT_S = 30.0
+REPLY_GRACE_S = 2.0
+"""How long past the deadline a client still waits for a reply"""
+SCRIPTED_GAMES = 16
+SCRIPTED_MAX_ACTIONS = 300
+
+
+@dataclass
+class ClientResults:
+    latencies: list[float] = field(default_factory=list[float])
+    """Seconds from sending an action until the server's reply, accepted or rejected"""
+    accepted: int = 0
+    rejected: int = 0
+    unexpected: int = 0
+    """Legal actions rejected, or illegal ones accepted"""
+    games: int = 0
+    errors: int = 0
+
+    def merge(self, other: 'ClientResults'):
+        self.latencies += other.latencies
+        self.accepted += other.accepted
+        self.rejected += other.rejected
+        self.unexpected += other.unexpected
+        self.games += other.games
+        self.errors += other.errors
+
+
+def _illegal(action: PlayerAction) -> PlayerAction:
+    """Same action for the other player's pieces, which the server must reject"""
+    opponent = next(player for player in SEAT_PLAYERS.values() if player != action.player)
+    return PlayerAction(action.action_type, opponent, action.source_location, action.target_location, action.kind)
+
+
+def random_games(count: int, max_actions: int, seed: int) -> list[list[PlayerAction]]:
+    """Scripts for --scripted: random legal games, cut off after max_actions"""
+    rng = random.Random(seed)
+    games: list[list[PlayerAction]] = []
+
+    for _ in range(count):
+        model = GameModel.default()
+
+        while model.game_status == GameStatus.ONGOING and len(model.history) < max_actions:
+            model.push(decode_action(rng.choice(list(model.legal_action_codes()))))
+
+        games.append(list(model.history))
+
+    return games
+
+
+async def play_games(uri: str, room: str, deadline: float, think_s: float, illegal_rate: float, seed: int, results: ClientResults,
+                     scripts: list[list[PlayerAction]] | None = None):
+    """
+    Play games in rooms room-0, room-1, ... until the deadline; the other client of the pair uses the same room names.
+    With scripts, game n replays scripts[n % len(scripts)] without a local GameModel (both clients of a pair pick the same one).
+    """
+    rng = random.Random(seed)
+    game = 0
+
+    while time.perf_counter() < deadline:
+        try:
+            async with connect(f"{uri}/{room}-{game}", ping_interval=None, open_timeout=CONNECT_TIMEOUT_S) as connection:
+                greeting = await connection.recv()
+                seat = int(str(greeting).partition(' ')[0])
+                player = SEAT_PLAYERS[seat]
+
+                script = scripts[game % len(scripts)] if scripts else None
+                model = GameModel.default() if script is None else None
+                made = 0
+                sent_at: float | None = None
+                sent_illegal = False
+
+                while model.game_status == GameStatus.ONGOING if model is not None else made < len(script or []):
+                    active_player = model.active_player if model is not None else (script or [])[made].player
+
+                    if active_player == player and sent_at is None:
+                        if time.perf_counter() >= deadline:
+                            break
+
+                        await asyncio.sleep(rng.uniform(0, 2 * think_s))
+
+                        if model is not None:
+                            codes = list(model.legal_action_codes())
+                            if not codes:
+                                break
+                            action = decode_action(rng.choice(codes))
+                        else:
+                            action = (script or [])[made]
+
+                        sent_illegal = rng.random() < illegal_rate
+
+                        sent_at = time.perf_counter()
+                        await connection.send(wire_codec.encode_text([_illegal(action) if sent_illegal else action]))
+
+                    remaining = max(deadline - time.perf_counter(), 0) + REPLY_GRACE_S
+                    source, _, payload = str(await asyncio.wait_for(connection.recv(), remaining)).partition(' ')
+                    is_reply = int(source) == seat and sent_at is not None
+
+                    if payload.startswith(REJECTION_PREFIX):
+                        if is_reply and sent_at is not None:
+                            results.latencies.append(time.perf_counter() - sent_at)
+                            results.rejected += 1
+                            results.unexpected += not sent_illegal
+                            sent_at = None
+                        continue
+
+                    if model is not None:
+                        for action in wire_codec.decode_text(payload):
+                            model.push(action)
+                    else:
+                        made += len(wire_codec.decode_text(payload))
+
+                    if is_reply and sent_at is not None:
+                        results.latencies.append(time.perf_counter() - sent_at)
+                        results.accepted += 1
+                        results.unexpected += sent_illegal
+                        sent_at = None
+
+                results.games += model.game_status != GameStatus.ONGOING if model is not None else made == len(script or [])
+
+        except TimeoutError:
+            # Only once the deadline passed: the other client of the pair stopped playing
+            results.errors += time.perf_counter() < deadline
+
+        except (OSError, ConnectionClosed):
+            results.errors += 1
+
+        game += 1
+
+
+async def run_clients(uri: str, pairs: range, duration: float, think_s: float, illegal_rate: float, seed: int,
+                      scripts: list[list[PlayerAction]] | None = None) -> ClientResults:
+    results = ClientResults()
+    deadline = time.perf_counter() + duration
+
+    await asyncio.gather(*(
+        play_games(uri, f"load-{pair}", deadline, think_s, illegal_rate, seed * 1_000_003 + pair * 2 + side, results, scripts)
+        for pair in pairs
+        for side in range(2)
+    ))
+
+    return results
+
+def _process_clients(uri: str, pairs: range, duration: float, think_s: float, illegal_rate: float, seed: int,
+                     scripts: list[list[PlayerAction]] | None) -> ClientResults:
+    return asyncio.run(run_clients(uri, pairs, duration, think_s, illegal_rate, seed, scripts))
+
+
+async def fetch_stats(uri: str) -> ServerStats:
+    async with connect(uri + STATS_PATH, ping_interval=None) as connection:
+        return ServerStats(**json.loads(await connection.recv()))
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('localhost', 0))
+        return sock.getsockname()[1]
+
+def spawn_server(port: int, engine: str, workers: int = 0) -> subprocess.Popen[bytes]:
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server.py'), '--host', 'localhost', '--port', str(port),
+         '--engine', engine, '--workers', str(workers)],
+        stdout=subprocess.DEVNULL,
+        )
+
+    for _ in range(100):
+        try:
+            asyncio.run(fetch_stats(f"ws://localhost:{port}"))
+            return server
+        except OSError:
+            time.sleep(0.1)
+
+    server.kill()
+    raise RuntimeError("server did not start")
+
+
+async def restart_workers(uri: str, workers: int, interval: float, deadline: float) -> list[dict[str, Any]]:
+    """Restart the workers of a sharded server one after another until the deadline"""
+    restarts: list[dict[str, Any]] = []
+
+    for worker in itertools.cycle(range(workers)):
+        await asyncio.sleep(interval)
+        if time.perf_counter() + interval > deadline:
+            return restarts
+
+        async with connect(f"{uri}{RESTART_PATH}{worker}", ping_interval=None, open_timeout=CONNECT_TIMEOUT_S) as connection:
+            restart = json.loads(await connection.recv())
+            if 'error' in restart:
+                raise RuntimeError(f"restarting worker {worker}: {restart['error']}")
+            restarts.append(restart)
+
+    return restarts
+
+
+def run_load(args: argparse.Namespace, uri: str, workers: int) -> tuple[ClientResults, float, ServerStats, ServerStats]:
+    """Results, elapsed seconds and server statistics before and after"""
+    rooms = args.clients // 2
+    scripts = random_games(SCRIPTED_GAMES, SCRIPTED_MAX_ACTIONS, args.seed) if args.scripted else None
+    before = asyncio.run(fetch_stats(uri))
+    start = time.perf_counter()
+
+    results = ClientResults()
+    with ProcessPoolExecutor(args.processes) as pool:
+        futures = [
+            pool.submit(_process_clients, uri, range(process, rooms, args.processes), args.duration,
+                        args.think_ms / 1e3, args.illegal_rate, args.seed + process, scripts)
+            for process in range(args.processes)
+        ]
+
+        if workers and args.restart_every:
+            restarts = asyncio.run(restart_workers(uri, workers, args.restart_every, start + args.duration))
+            for restart in restarts:
+                print(f"restarted worker {restart['worker']} in {restart['seconds'] * 1e3:.0f} ms, "
+                      f"moving {restart['moved_out']} rooms out and {restart['moved_back']} back")
+
+        for future in futures:
+            results.merge(future.result())
+
+    elapsed = time.perf_counter() - start
+    after = asyncio.run(fetch_stats(uri))
+
+    return results, elapsed, before, after
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=15000)
+    parser.add_argument('--spawn-server', action='store_true', help='start server.py on a free port for the run')
+    parser.add_argument('--engine', choices=BOARD_ENGINES, default='board', help='engine of the spawned server')
+    parser.add_argument('--workers', type=int, nargs='+', default=[0],
+                        help='worker processes of the spawned server (0: unsharded); one run per count')
+    parser.add_argument('--restart-every', type=float, default=0, help='seconds between worker restarts of a sharded server (0: never)')
+    parser.add_argument('--clients', type=int, default=200, help='simulated clients, two per room')
+    parser.add_argument('--processes', type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds')
+    parser.add_argument('--think-ms', type=float, default=200, help='mean pause before each action')
+    parser.add_argument('--illegal-rate', type=float, default=0.05, help='share of actions sent for the wrong player')
+    parser.add_argument('--scripted', action='store_true', help='replay pre-generated games instead of generating legal actions')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rooms = args.clients // 2
+    throughput: list[tuple[int, float, float, float]] = []
+
+    for workers in args.workers if args.spawn_server else [0]:
+        server = spawn_server(port := _free_port(), args.engine, workers) if args.spawn_server else None
+        uri = f"ws://{args.host if server is None else 'localhost'}:{args.port if server is None else port}"
+
+        try:
+            results, elapsed, before, after = run_load(args, uri, workers)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+        latencies = sorted(results.latencies)
+        if not latencies:
+            raise SystemExit("no actions completed")
+
+        # Clients only send before the deadline; afterwards, they wait up to REPLY_GRACE_S for replies
+        active = min(elapsed, args.duration)
+        cores = (after.cpu_seconds - before.cpu_seconds) / active
+        actions = after.accepted + after.rejected - before.accepted - before.rejected
+        p50, p99 = statistics.median(latencies), latencies[int(len(latencies) * 0.99)]
+        throughput.append((workers, actions / active, p50, p99))
+
+        print(f"{args.clients} clients in {rooms} rooms over {args.processes} processes for {elapsed:.1f}s "
+              f"(think time {args.think_ms:.0f} ms, {args.illegal_rate:.0%} illegal{', scripted' if args.scripted else ''}"
+              f"{f', {workers} workers' if workers else ''})")
+        print(f"actions: {results.accepted:,} accepted, {results.rejected:,} rejected ({results.unexpected} unexpectedly), "
+              f"{actions / active:,.0f}/s at the server; {results.games} games finished, {results.errors} connection errors")
+        print(f"latency: p50 {p50 * 1e3:.2f} ms, p99 {p99 * 1e3:.2f} ms, max {latencies[-1] * 1e3:.2f} ms")
+        print(f"server: {cores:.1%} of a core, {rooms / cores if cores > 0 else float('inf'):,.0f} rooms per core at this load")
+
+    if len(throughput) > 1:
+        print(f"\n{'workers':>8} {'actions/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+        for workers, rate, p50, p99 in throughput:
+            print(f"{workers or 'unsharded':>8} {rate:>10,.0f} {p50 * 1e3:>8.2f} {p99 * 1e3:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,22 @@
+import argparse
+
 from model import GameModel
-from online_view import OnlineView
+from online_view import OnlineView, SERVER_HOST, SERVER_PORT
 from controller import GameController
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Online Shogimon")
+    parser.add_argument('--fixed-fps', action='store_true', help='redraw at a fixed 60 FPS instead of sleeping until the next event')
+    parser.add_argument('--sync-networking', action='store_true', help='use the synchronous cs150241project_networking client instead of the asyncio one')
+    args = parser.parse_args()
+
+    networking = None
+    if args.sync_networking:
+        from cs150241project_networking import CS150241ProjectNetworking
+        networking = CS150241ProjectNetworking.connect(SERVER_HOST, SERVER_PORT)
+
     model = GameModel.default()
-    view = OnlineView(model.state)
+    view = OnlineView(model.state, event_driven=not args.fixed_fps, networking=networking)
 
     controller = GameController(model, view)
 
@@ -1,11 +1,41 @@
+import argparse
+
 from model import GameModel
 from view import GameView
 from controller import GameController
+from project_types import PlayerNumber
+from ai import AlphaBetaSearch, ComputerPlayer, SearchEngine
+from transposition import TranspositionTable
+from parallel_search import ParallelSearch
+from mcts import MCTSSearch, PLAYOUT_POLICIES
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Offline (pass and play) Shogimon")
+    parser.add_argument('--computer', choices=[player.value for player in PlayerNumber], help='let the computer play this side')
+    parser.add_argument('--engine', choices=['alphabeta', 'mcts'], default='alphabeta', help='computer search algorithm')
+    parser.add_argument('--budget-ms', type=int, default=1000, help='computer thinking time per action')
+    parser.add_argument('--tt-mb', type=float, default=16, help='computer transposition table size (0 to disable)')
+    parser.add_argument('--workers', type=int, default=1, help='computer search processes')
+    parser.add_argument('--exploration', type=float, default=1.4, help='MCTS exploration constant')
+    parser.add_argument('--playout', choices=PLAYOUT_POLICIES, default='random', help='MCTS playout policy')
+    parser.add_argument('--verbose', action='store_true', help='print depth, nodes and nodes per second of every computer search')
+    parser.add_argument('--fixed-fps', action='store_true', help='redraw at a fixed 60 FPS instead of sleeping until the next event')
+    args = parser.parse_args()
+
     model = GameModel.default()
-    view = GameView(model.state)
+    view = GameView(model.state, event_driven=not args.fixed_fps)
 
     controller = GameController(model, view)
 
+    if args.computer:
+        engine: SearchEngine
+        if args.engine == 'mcts':
+            engine = MCTSSearch(args.exploration, PLAYOUT_POLICIES[args.playout](), workers=args.workers)
+        elif args.workers > 1:
+            engine = ParallelSearch(args.workers, table_mb=args.tt_mb)
+        else:
+            engine = AlphaBetaSearch(table=TranspositionTable(args.tt_mb) if args.tt_mb > 0 else None)
+
+        controller.register_turn_provider(ComputerPlayer(model, PlayerNumber(args.computer), engine, args.budget_ms, args.verbose))
+
     controller.start()
\ No newline at end of file
@@ -0,0 +1,377 @@
+"""
+Computer opponent: Monte Carlo tree search (UCT) with batched random playouts.
+Every action is one tree level; node values are kept for the player who made the action, so 3-action turns need no special casing.
+The tree is kept between searches and the subtree of the new position is reused.
+With workers > 1, each worker process grows its own tree and the root statistics are merged every merge_interval_ms.
+"""
+import math
+import multiprocessing
+import random
+import time
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from typing import Protocol
+
+from project_types import GameStatus, PlayerNumber
+from model import GameModel
+from movement_tables import get_tables
+from action_codes import DROP_BIT, decode_action
+from ai import SearchResult, evaluate
+
+CUTOFF_SCALE = 400
+"""Unfinished playouts are scored 0.5 + 0.5 * tanh(evaluate / CUTOFF_SCALE) for the side to move"""
+REUSE_DEPTH = 6
+"""Levels below the old root searched for the new position (own remaining actions plus an opponent turn)"""
+
+
+class PlayoutPolicy(Protocol):
+    def choose(self, model: GameModel, codes: list[int], rng: random.Random) -> int:
+        """One of the legal action codes (non-empty) of model's active player"""
+        ...
+
+class RandomPlayout:
+    def choose(self, model: GameModel, codes: list[int], rng: random.Random) -> int:
+        return rng.choice(codes)
+
+class CapturePlayout:
+    """Random, but captures (when there are any) with probability capture_rate"""
+    def __init__(self, capture_rate: float = 0.8):
+        self._capture_rate = capture_rate
+
+    def choose(self, model: GameModel, codes: list[int], rng: random.Random) -> int:
+        if rng.random() < self._capture_rate:
+            board = model.board
+            locations = get_tables().locations
+            captures = [
+                code for code in codes
+                if not code >> 16 & DROP_BIT and board.get_live_piece(locations[code & 0xFF]) is not None
+            ]
+
+            if captures:
+                return rng.choice(captures)
+
+        return rng.choice(codes)
+
+PLAYOUT_POLICIES: dict[str, type[PlayoutPolicy]] = {'random': RandomPlayout, 'capture': CapturePlayout}
+
+
+class _Node:
+    __slots__ = ('code', 'player', 'key', 'children', 'untried', 'visits', 'wins')
+
+    def __init__(self, code: int | None, player: PlayerNumber | None, key: int):
+        self.code = code
+        self.player = player
+        """Player who made code (None at the root)"""
+        self.key = key
+        self.children: dict[int, _Node] = {}
+        self.untried: list[int] | None = None
+        """Legal codes without a child yet; None until the node is first expanded"""
+        self.visits = 0
+        self.wins = 0.0
+        """Playout value summed for player"""
+
+
+@dataclass(frozen=True)
+class RootStats:
+    visits: int
+    wins: float
+
+
+class MCTSSearch:
+    """SearchEngine; call close() (or use as a context manager) when done if workers > 1"""
+    def __init__(self, exploration: float = 1.4, policy: PlayoutPolicy | None = None, batch_size: int = 8,
+                 max_playout_actions: int = 90, workers: int = 1, merge_interval_ms: int = 100, seed: int | None = None):
+        self._exploration = exploration
+        self._policy = policy or RandomPlayout()
+        self._batch_size = batch_size
+        self._max_playout_actions = max_playout_actions
+        self._workers = workers
+        self._merge_interval_ms = merge_interval_ms
+        self._seed = seed
+        self._rng = random.Random(seed)
+
+        self._root: _Node | None = None
+        self._baseline: dict[int, RootStats] = {}
+        self._max_depth = 0
+        self._connections: list[Connection] = []
+        self._processes: list[multiprocessing.process.BaseProcess] = []
+
+        self.reused_visits = 0
+        """Root visits carried over from the previous search by subtree reuse"""
+
+    @property
+    def max_depth(self) -> int:
+        """Deepest tree level reached in the current search"""
+        return self._max_depth
+
+    # Serial search
+
+    def search(self, model: GameModel, budget_ms: int) -> SearchResult:
+        """Playouts until budget_ms runs out; returns the most visited root action"""
+        start = time.perf_counter()
+        deadline = start + budget_ms / 1000
+
+        if self._workers > 1:
+            stats, playouts = self._search_parallel(model, deadline)
+        else:
+            self.set_root(model)
+            playouts = self.run(model, deadline)
+            stats = self.root_stats()
+
+        elapsed = time.perf_counter() - start
+        if not stats:
+            return SearchResult(None, 0, 0, playouts, elapsed, 'playouts')
+
+        code, best = max(stats.items(), key=lambda item: item[1].visits)
+        return SearchResult(decode_action(code), round(1000 * best.wins / best.visits), self._max_depth, playouts, elapsed, 'playouts')
+
+    def run(self, model: GameModel, deadline: float) -> int:
+        """Grow the current tree (see set_root) from model's position until deadline; returns the number of playouts"""
+        assert self._root is not None
+        playouts = 0
+
+        while time.perf_counter() < deadline:
+            playouts += self._iterate(model, deadline)
+            if self._root.untried == [] and not self._root.children:
+                break
+
+        return playouts
+
+    def _iterate(self, model: GameModel, deadline: float) -> int:
+        """Select and expand a leaf, run a batch of playouts from it, and back the results up"""
+        assert self._root is not None
+        node = self._root
+        path = [node]
+
+        # Selection
+        while node.untried == [] and node.children:
+            node = self._select_child(node)
+            assert node.code is not None
+            model.push(decode_action(node.code))
+            path.append(node)
+
+        # Expansion
+        if node.untried is None:
+            node.untried = list(model.legal_action_codes())
+            self._rng.shuffle(node.untried)
+
+        if node.untried:
+            code = node.untried.pop()
+            player = model.active_player
+            model.push(decode_action(code))
+            child = _Node(code, player, model.zobrist_key)
+            node.children[code] = child
+            node = child
+            path.append(node)
+
+        self._max_depth = max(self._max_depth, len(path) - 1)
+
+        # Playouts, all from the same leaf; the batch is cut short at the deadline
+        size = 1 if model.game_status != GameStatus.ONGOING else self._batch_size
+        batch, value_one = 0, 0.0
+        while batch < size and (batch == 0 or time.perf_counter() < deadline):
+            value_one += self._playout(model)
+            batch += 1
+
+        for _ in range(len(path) - 1):
+            model.pop()
+
+        # Backpropagation
+        for visited in path:
+            visited.visits += batch
+            visited.wins += value_one if visited.player == PlayerNumber.ONE else batch - value_one
+
+        return batch
+
+    def _select_child(self, node: _Node) -> _Node:
+        log_visits = math.log(node.visits)
+        exploration = self._exploration
+
+        return max(
+            node.children.values(),
+            key=lambda child: child.wins / child.visits + exploration * math.sqrt(log_visits / child.visits),
+            )
+
+    def _playout(self, model: GameModel) -> float:
+        """Value of a playout for player one (1 win, 0 loss); model is restored afterwards"""
+        policy, rng = self._policy, self._rng
+        made = 0
+
+        while model.game_status == GameStatus.ONGOING and made < self._max_playout_actions:
+            codes = list(model.legal_action_codes())
+            if not codes:
+                break
+
+            model.push(decode_action(policy.choose(model, codes, rng)))
+            made += 1
+
+        match model.game_status:
+            case GameStatus.PLAYER_WIN:
+                value = 1.0
+            case GameStatus.PLAYER_LOSE:
+                value = 0.0
+            case _:
+                value = 0.5 + 0.5 * math.tanh(evaluate(model) / CUTOFF_SCALE)
+                if model.active_player == PlayerNumber.TWO:
+                    value = 1 - value
+
+        for _ in range(made):
+            model.pop()
+
+        return value
+
+    def set_root(self, model: GameModel):
+        """Reuse the subtree of model's position if the previous tree has it, else start a new tree"""
+        key = model.zobrist_key
+        root = self._root
+        self._max_depth = 0
+
+        found = self._find(root, key) if root is not None else None
+        self._root = found or _Node(None, None, key)
+        self._root.code, self._root.player = None, None
+        self.reused_visits = self._root.visits
+        self._baseline = {}
+
+    def _find(self, root: _Node, key: int) -> _Node | None:
+        level = [root]
+
+        for _ in range(REUSE_DEPTH + 1):
+            for node in level:
+                if node.key == key:
+                    return node
+
+            level = [child for node in level for child in node.children.values()]
+
+        return None
+
+    # Root statistics, for merging trees of parallel workers
+
+    def root_stats(self) -> dict[int, RootStats]:
+        assert self._root is not None
+        return {code: RootStats(child.visits, child.wins) for code, child in self._root.children.items()}
+
+    def root_deltas(self) -> dict[int, RootStats]:
+        """Root statistics gathered since the last merge_root_stats"""
+        deltas: dict[int, RootStats] = {}
+
+        for code, stats in self.root_stats().items():
+            baseline = self._baseline.get(code, RootStats(0, 0.0))
+            if stats.visits > baseline.visits:
+                deltas[code] = RootStats(stats.visits - baseline.visits, stats.wins - baseline.wins)
+
+        return deltas
+
+    def merge_root_stats(self, totals: dict[int, RootStats], model: GameModel):
+        """Replace the root statistics by totals merged from all workers"""
+        root = self._root
+        assert root is not None
+        player = model.active_player
+
+        for code, stats in totals.items():
+            child = root.children.get(code)
+
+            if child is None:
+                if root.untried is None or code not in root.untried:
+                    continue
+
+                root.untried.remove(code)
+                model.push(decode_action(code))
+                child = root.children[code] = _Node(code, player, model.zobrist_key)
+                model.pop()
+
+            root.visits += stats.visits - child.visits
+            child.visits, child.wins = stats.visits, stats.wins
+
+        self._baseline = dict(totals)
+
+    # Parallel search
+
+    def start(self):
+        """Start the worker processes ahead of the first search"""
+        if self._workers <= 1 or self._processes:
+            return
+
+        # Spawned workers do not inherit threads or pygame state from the client process
+        context = multiprocessing.get_context('spawn')
+
+        for index in range(self._workers):
+            parent, child = context.Pipe()
+            seed = None if self._seed is None else self._seed + index
+            process = context.Process(
+                target=_worker_loop,
+                args=(child, self._exploration, self._policy, self._batch_size, self._max_playout_actions, seed),
+                daemon=True,
+                )
+            process.start()
+            self._connections.append(parent)
+            self._processes.append(process)
+
+        for connection in self._connections:
+            connection.recv()
+
+    def close(self):
+        for connection in self._connections:
+            connection.send(None)
+        for process in self._processes:
+            process.join()
+
+        self._connections, self._processes = [], []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *_: object):
+        self.close()
+
+    def _search_parallel(self, model: GameModel, deadline: float) -> tuple[dict[int, RootStats], int]:
+        self.start()
+        position = model.to_compact()
+        totals: dict[int, RootStats] = {}
+        playouts = 0
+        merged: dict[int, RootStats] | None = None
+        self._max_depth = 0
+
+        while (remaining := deadline - time.perf_counter()) > 0:
+            interval = min(self._merge_interval_ms / 1000, remaining)
+
+            for connection in self._connections:
+                connection.send((position, merged, interval))
+
+            round_playouts = 0
+            for connection in self._connections:
+                deltas, count, depth = connection.recv()
+                round_playouts += count
+                self._max_depth = max(self._max_depth, depth)
+
+                for code, delta in deltas.items():
+                    total = totals.get(code, RootStats(0, 0.0))
+                    totals[code] = RootStats(total.visits + delta.visits, total.wins + delta.wins)
+
+            merged = totals
+            playouts += round_playouts
+
+            # No legal actions at the root
+            if not round_playouts:
+                break
+
+        return totals, playouts
+
+
+def _worker_loop(connection: Connection, exploration: float, policy: PlayoutPolicy, batch_size: int, max_playout_actions: int, seed: int | None):
+    """Worker process: (position, merged root stats or None for a new search, seconds) -> (root deltas, playouts, depth)"""
+    search = MCTSSearch(exploration, policy, batch_size, max_playout_actions, seed=seed)
+    model: GameModel | None = None
+    connection.send('ready')
+
+    while (message := connection.recv()) is not None:
+        position, merged, interval = message
+
+        if merged is None or model is None:
+            model = GameModel.from_compact(position)
+            search.set_root(model)
+        else:
+            search.merge_root_stats(merged, model)
+
+        playouts = search.run(model, time.perf_counter() + interval)
+        connection.send((search.root_deltas(), playouts, search.max_depth))
@@ -1,75 +1,80 @@
-from typing import Self
+from dataclasses import dataclass
+from typing import Callable, Iterator, Protocol, Self
 
-from project_types import GameState, Movement, PieceKind, Location, PlayerNumber, MovePossibilities, PiecePositions, LivePiece, PlayerAction, ActionType, GameStatus, BOARD_ROWS, BOARD_COLS
+from project_types import GameState, Movement, PieceKind, Location, PlayerNumber, PiecePositions, LivePiece, PlayerAction, ActionType, GameStatus, BOARD_ROWS, BOARD_COLS
+from movement_tables import get_tables
+from zobrist import piece_key, hand_change_key, turn_key
+from action_codes import NO_SQUARE, KINDS, KIND_INDEX, make_code, encode_action
 
-class EeveeMovement:
-    def get_movement_range(self, row: int, col: int, valid_locations: dict[tuple[int, int], bool]) -> list[Location]:
-        
-        return [
-            Location(row + dr, col + dc)
-            for dr, dc in MovePossibilities.FORWARD.value
-            if 0 <= row + dr < BOARD_ROWS and 0 <= col + dc < BOARD_COLS and (row + dr, col + dc) in valid_locations
-        ]
+class StepMovement:
+    """Single step to each adjacent target in the precomputed table (see movement_tables)"""
+    def __init__(self, kind: PieceKind):
+        self._steps = get_tables().steps[kind]
 
-class EeveeShinyMovement:
     def get_movement_range(self, row: int, col: int, valid_locations: dict[tuple[int, int], bool]) -> list[Location]:
-        
         return [
-            Location(row + dr, col + dc)
-            for dr, dc in MovePossibilities.FORWARD_OPPOSITE.value
-            if 0 <= row + dr < BOARD_ROWS and 0 <= col + dc < BOARD_COLS and (row + dr, col + dc) in valid_locations
+            location
+            for key, location in self._steps[row * BOARD_COLS + col]
+            if key in valid_locations
         ]
 
-class PikachuMovement:
+class SlidingMovement:
+    """Slide along each precomputed ray until blocked (see movement_tables)"""
+    def __init__(self, kind: PieceKind):
+        self._rays = get_tables().rays[kind]
+
     def get_movement_range(self, row: int, col: int, valid_locations: dict[tuple[int, int], bool]) -> list[Location]:
-        diagonals: list[Location] = []
-        
-        for dr, dc in MovePossibilities.DIAGONALS.value:
-
-            temp_row, temp_col = row, col
-            while 0 <= temp_row + dr < BOARD_ROWS and 0 <= temp_col + dc < BOARD_COLS and (temp_row + dr, temp_col + dc) in valid_locations:
-                temp_row += dr
-                temp_col += dc
-                if not valid_locations[(temp_row,temp_col)]: # if encounters a location with opponent piece (False), block the range
-                    diagonals.append(Location(temp_row, temp_col))
+        locations: list[Location] = []
+
+        for ray in self._rays[row * BOARD_COLS + col]:
+            for key, location in ray:
+                is_empty = valid_locations.get(key)
+                if is_empty is None: # own piece blocks the range
                     break
-                diagonals.append(Location(temp_row, temp_col))
-        
-        return diagonals
 
-class TurtwigMovement:
-    def get_movement_range(self, row: int, col: int, valid_locations: dict[tuple[int, int], bool]) -> list[Location]:
-        orthogonals: list[Location] = []
-        
-        for dr, dc in MovePossibilities.ORTHOGONALS.value:
-
-            temp_row, temp_col = row, col
-            while 0 <= temp_row + dr < BOARD_ROWS and 0 <= temp_col + dc < BOARD_COLS and (temp_row + dr, temp_col + dc) in valid_locations:
-                temp_row += dr
-                temp_col += dc
-                if not valid_locations[(temp_row,temp_col)]: # if encounters a location with opponent piece (False), block the range
-                    orthogonals.append(Location(temp_row, temp_col))
+                locations.append(location)
+                if not is_empty: # if encounters a location with opponent piece (False), block the range
                     break
-                orthogonals.append(Location(temp_row, temp_col))
-        
-        return orthogonals
 
-class LatiosMovement:
+        return locations
+
+class NonCapturingStepMovement:
+    """Single step to adjacent empty targets only"""
+    def __init__(self, kind: PieceKind):
+        self._steps = get_tables().steps[kind]
+
     def get_movement_range(self, row: int, col: int, valid_locations: dict[tuple[int, int], bool]) -> list[Location]:
         return [
-            Location(row + dr, col + dc)
-            for dr, dc in MovePossibilities.ORTHOGONALS.value
-            if 0 <= row + dr < BOARD_ROWS and 0 <= col + dc < BOARD_COLS and (row + dr, col + dc) in valid_locations and valid_locations[(row + dr, col + dc)] # Latios cannot capture hence only locations with True values are considered
+            location
+            for key, location in self._steps[row * BOARD_COLS + col]
+            if valid_locations.get(key, False)
         ]
+
+class EeveeMovement(StepMovement):
+    def __init__(self):
+        super().__init__(PieceKind.EEVEE)
+
+class EeveeShinyMovement(StepMovement):
+    def __init__(self):
+        super().__init__(PieceKind.EEVEE_SHINY)
+
+class PikachuMovement(SlidingMovement):
+    def __init__(self):
+        super().__init__(PieceKind.PIKACHU)
+
+class TurtwigMovement(SlidingMovement):
+    def __init__(self):
+        super().__init__(PieceKind.TURTWIG)
+
+class LatiosMovement(NonCapturingStepMovement):
+    # Latios cannot capture hence only locations with True values are considered
+    def __init__(self):
+        super().__init__(PieceKind.LATIOS)
     
-class LatiasMovement:
-    def get_movement_range(self, row: int, col: int, valid_locations: dict[tuple[int, int], bool]) -> list[Location]:
-         return [
-            Location(row + dr, col + dc)
-            for dr, dc in MovePossibilities.DIAGONALS.value
-            if 0 <= row + dr < BOARD_ROWS and 0 <= col + dc < BOARD_COLS and (row + dr, col + dc) in valid_locations and valid_locations[(row + dr, col + dc)]
-            # Latias cannot capture hence only locations with True values are considered
-        ]
+class LatiasMovement(NonCapturingStepMovement):
+    # Latias cannot capture hence only locations with True values are considered
+    def __init__(self):
+        super().__init__(PieceKind.LATIAS)
 
 class BasePiece:
     def __init__(self, kind: PieceKind, location: Location, movement: Movement, owner: PlayerNumber):
@@ -118,6 +123,112 @@ class ProtectedPiece(BasePiece):
         self.is_immobile = False
     
 
+class GameBoard(Protocol):
+    """Board engine used by GameModel; implemented by Board and bitboard.BitBoard"""
+    version: int
+    """Incremented by every mutation; see LazyMoves"""
+
+    def __init__(self, height: int, width: int):
+        ...
+
+    @property
+    def zobrist_key(self) -> int:
+        ...
+
+    def get_live_pieces(self) -> list[LivePiece]:
+        ...
+
+    def get_captured_pieces(self) -> list[LivePiece]:
+        ...
+
+    def get_live_piece(self, location: Location) -> Piece | ProtectedPiece | None:
+        ...
+
+    def get_captured_piece(self, kind: PieceKind, player: PlayerNumber) -> Piece | None:
+        ...
+
+    def get_moves_at(self, location: Location) -> list[Location]:
+        ...
+
+    def get_drops(self, owner: PlayerNumber) -> list[Location]:
+        ...
+
+    def put(self, row: int, col: int, piece: Piece | ProtectedPiece, player: PlayerNumber):
+        ...
+
+    def put_captured(self, piece: Piece, player: PlayerNumber):
+        ...
+
+    def take(self, location: Location):
+        ...
+
+    def move(self, location: Location, piece: Piece | ProtectedPiece):
+        ...
+
+    def capture(self, target: Location, capturing_piece: Piece):
+        ...
+
+    def drop(self, target: Location, piece: Piece, player: PlayerNumber):
+        ...
+
+    def undo_move(self, source: Location, target: Location, captured_piece: Piece | ProtectedPiece | None):
+        ...
+
+    def undo_drop(self, target: Location, player: PlayerNumber):
+        ...
+
+    def can_capture(self, location: Location) -> bool:
+        ...
+
+    def is_valid_location(self, location: Location, owner: PlayerNumber) -> bool:
+        ...
+
+    def opponent_immobile(self, curr_player: PlayerNumber) -> bool:
+        ...
+
+    def iter_legal_actions(self, player: PlayerNumber) -> Iterator[PlayerAction]:
+        ...
+
+    def iter_pieces(self) -> Iterator[tuple[PlayerNumber, PieceKind, Location | None]]:
+        ...
+
+    def iter_legal_action_codes(self, player: PlayerNumber) -> Iterator[int]:
+        ...
+
+
+class LazyMoves:
+    """
+    Moves of the LivePieces of one board version, generated on first access of LivePiece.moves;
+    From the board while it is still at that version, after that from a board rebuilt from the pieces it had
+    (without hands, which no move depends on), so a GameState stays valid after further actions
+    """
+    def __init__(self, board: GameBoard):
+        self.version = board.version
+        self.pieces: list[tuple[PlayerNumber, PieceKind, Location]] = [
+            (owner, kind, location) for owner, kind, location in board.iter_pieces() if location is not None
+        ]
+        self._board = board
+        self._rebuilt: GameBoard | None = None
+
+    def _source(self) -> GameBoard:
+        if self._board.version == self.version:
+            return self._board
+
+        if self._rebuilt is None:
+            rebuilt = type(self._board)(BOARD_ROWS, BOARD_COLS)
+            for owner, kind, location in self.pieces:
+                rebuilt.put(location.row, location.col, PieceFactory.make(kind, location, owner), owner)
+            self._rebuilt = rebuilt
+
+        return self._rebuilt
+
+    def moves_at(self, location: Location) -> Callable[[], list[Location]]:
+        return lambda: self._source().get_moves_at(location)
+
+    def drops(self, owner: PlayerNumber) -> Callable[[], list[Location]]:
+        return lambda: self._source().get_drops(owner)
+
+
 class Board:
     def __init__(self, height: int, width: int):
         self._height: int = height
@@ -126,36 +237,59 @@ class Board:
         self._live_pieces: dict[PlayerNumber, list[Piece]] = {PlayerNumber.ONE: [], PlayerNumber.TWO: []}
         self._captured_pieces: dict[PlayerNumber, list[Piece]] = {PlayerNumber.ONE: [], PlayerNumber.TWO: []}
         self._grid: list[list[Piece | ProtectedPiece | None]] = [[ None for _ in range(width)] for _ in range(height)]
-        ...
+
+        # Maintained by _set_tile; see get_movable_locations_mapping
+        self._movable_locations: dict[PlayerNumber, dict[tuple[int, int], bool]] = {
+            player: {(row, col): True for row in range(height) for col in range(width)}
+            for player in PlayerNumber
+        }
+
+        # Per-state drop caches; cleared by _set_tile
+        self._forbidden_drops: dict[PlayerNumber, set[Location]] = {}
+        self._droppable_locations: dict[PlayerNumber, list[Location]] = {}
+
+        # Incremental Zobrist key of tiles and captured counts; see zobrist
+        self._zobrist_key: int = 0
+        self._hand_counts: dict[tuple[PlayerNumber, PieceKind], int] = {}
+
+        # Instrumentation: mapping lookups vs full 64-tile scans
+        self.mapping_requests: int = 0
+        self.mapping_rebuilds: int = 0
+
+        self.version: int = 0
+        self._lazy_moves: LazyMoves | None = None
+
+    def _current_lazy_moves(self) -> LazyMoves:
+        if self._lazy_moves is None or self._lazy_moves.version != self.version:
+            self._lazy_moves = LazyMoves(self)
+
+        return self._lazy_moves
 
     def get_live_pieces(self) -> list[LivePiece]:
         """
-        For GameState
+        For GameState; moves are generated on first access (see LazyMoves)
         """
-        return [
-
-                LivePiece(piece.kind, piece.owner, self.get_piece_movable_locations(piece), Location(piece.row, piece.col)) 
-                for piece in (self._live_pieces[PlayerNumber.ONE] + self._protected_pieces[PlayerNumber.ONE])
-
-            ] + [
+        lazy_moves = self._current_lazy_moves()
 
-                LivePiece(piece.kind, piece.owner, self.get_piece_movable_locations(piece), Location(piece.row, piece.col)) 
-                for piece in (self._live_pieces[PlayerNumber.TWO] + self._protected_pieces[PlayerNumber.TWO])
-                
-            ]
+        return [
+            LivePiece(kind, owner, lazy_moves.moves_at(location), location)
+            for owner, kind, location in lazy_moves.pieces
+        ]
 
     def get_captured_pieces(self) -> list[LivePiece]:
         """
-        For GameState
+        For GameState; moves are generated on first access (see LazyMoves)
         """
+        lazy_moves = self._current_lazy_moves()
+
         return [
             
-                LivePiece(piece.kind, piece.owner, self.get_piece_droppable_locations(piece), None) 
+                LivePiece(piece.kind, piece.owner, lazy_moves.drops(piece.owner), None) 
                 for piece in self._captured_pieces[PlayerNumber.ONE]
 
             ] + [
 
-                LivePiece(piece.kind, piece.owner, self.get_piece_droppable_locations(piece), None) 
+                LivePiece(piece.kind, piece.owner, lazy_moves.drops(piece.owner), None) 
                 for piece in self._captured_pieces[PlayerNumber.TWO]
                 
             ]
@@ -169,13 +303,50 @@ class Board:
             if piece.kind == kind:
                 return piece
     
+    @property
+    def zobrist_key(self) -> int:
+        """Key of tiles and captured pieces (without turn fields; see GameModel.zobrist_key)"""
+        return self._zobrist_key
+
     def _live_to_captured(self, piece: Piece, captured_player: PlayerNumber, capturing_player: PlayerNumber):
         self._live_pieces[captured_player].remove(piece)
         self._captured_pieces[capturing_player].append(piece)
+        self._change_hand(capturing_player, piece.kind, 1)
 
     def _captured_to_live(self, piece: Piece, player: PlayerNumber):
         self._captured_pieces[player].remove(piece)
         self._live_pieces[player].append(piece)
+        self._change_hand(player, piece.kind, -1)
+
+    def _change_hand(self, player: PlayerNumber, kind: PieceKind, delta: int):
+        self.version += 1
+        count = self._hand_counts.get((player, kind), 0)
+        self._hand_counts[(player, kind)] = count + delta
+        self._zobrist_key ^= hand_change_key(player, kind, count, count + delta)
+
+    def _set_tile(self, row: int, col: int, piece: Piece | ProtectedPiece | None):
+        """Single point of grid mutation; keeps the per-player movable locations mappings and Zobrist key in sync"""
+        self.version += 1
+        previous = self._grid[row][col]
+        if previous is not None:
+            self._zobrist_key ^= piece_key(previous.kind, previous.owner, row, col)
+        if piece is not None:
+            self._zobrist_key ^= piece_key(piece.kind, piece.owner, row, col)
+
+        self._grid[row][col] = piece
+        self._forbidden_drops.clear()
+        self._droppable_locations.clear()
+
+        if piece is None:
+            for mapping in self._movable_locations.values():
+                mapping[(row, col)] = True
+            return
+
+        for player, mapping in self._movable_locations.items():
+            if player == piece.owner:
+                mapping.pop((row, col), None)
+            else:
+                mapping[(row, col)] = False
 
     def put(self, row: int, col: int, piece: Piece | ProtectedPiece, player: PlayerNumber):
         live_pieces = self._live_pieces[player]
@@ -184,14 +355,19 @@ class Board:
             live_pieces.append(piece)
         elif type(piece) == ProtectedPiece:
             protected_pieces.append(piece)
-        self._grid[row][col] = piece
+        self._set_tile(row, col, piece)
+
+    def put_captured(self, piece: Piece, player: PlayerNumber):
+        """Place piece directly in player's captured pieces (for setting up positions)"""
+        self._captured_pieces[player].append(piece)
+        self._change_hand(player, piece.kind, 1)
 
     def take(self, location: Location):
-        self._grid[location.row][location.col] = None
+        self._set_tile(location.row, location.col, None)
         
     def move(self, location: Location, piece: Piece | ProtectedPiece):
         piece.location = Location(location.row, location.col)
-        self._grid[location.row][location.col] = piece
+        self._set_tile(location.row, location.col, piece)
     
     def capture(self, target: Location, capturing_piece: Piece):
         captured_player = PlayerNumber.TWO if capturing_piece.owner == PlayerNumber.ONE else PlayerNumber.ONE
@@ -208,6 +384,32 @@ class Board:
         self.move(target, piece)
         self._captured_to_live(piece, player)
 
+    def undo_move(self, source: Location, target: Location, captured_piece: Piece | ProtectedPiece | None):
+        """Revert move or capture from source to target; captured_piece is the same object that capture switched"""
+        piece = self._grid[target.row][target.col]
+        assert piece is not None
+
+        self.move(source, piece)
+
+        if type(captured_piece) == Piece:
+            capturing_player = captured_piece.owner
+            self._captured_pieces[capturing_player].remove(captured_piece)
+            self._change_hand(capturing_player, captured_piece.kind, -1)
+
+            captured_piece.switch_ownership()
+            self._live_pieces[captured_piece.owner].append(captured_piece)
+            self.move(target, captured_piece)
+
+        else:
+            self.take(target)
+
+    def undo_drop(self, target: Location, player: PlayerNumber):
+        piece = self._grid[target.row][target.col]
+        assert type(piece) == Piece
+
+        self.take(target)
+        self._live_to_captured(piece, player, player)
+
     def can_capture(self, location: Location) -> bool:
         piece = self._grid[location.row][location.col]
         if piece and type(piece) == Piece:
@@ -216,6 +418,15 @@ class Board:
         return False
     
     def get_movable_locations_mapping(self, owner: PlayerNumber) -> dict[tuple[int, int], bool]:
+        """
+        Incrementally maintained view (see _set_tile); shared, so callers must not mutate it
+        """
+        self.mapping_requests += 1
+        return self._movable_locations[owner]
+
+    def rebuild_movable_locations_mapping(self, owner: PlayerNumber) -> dict[tuple[int, int], bool]:
+        """Full scan of the grid; for checking the maintained mapping"""
+        self.mapping_rebuilds += 1
 
         grid = self._grid
         locations: dict[tuple[int, int], bool] = {}
@@ -235,6 +446,50 @@ class Board:
 
         return locations
     
+    def iter_legal_actions(self, player: PlayerNumber) -> Iterator[PlayerAction]:
+        """
+        Lazily yield every move, then every drop (once per captured kind) of player;
+        Callers may push/pop actions between items as long as the position is restored before the next one
+        """
+        for piece in self._live_pieces[player] + self._protected_pieces[player]:
+            source = piece.location
+            for target in self.get_piece_movable_locations(piece):
+                yield PlayerAction(ActionType.MOVE, player, source, target, piece.kind)
+
+        for piece in self._unique_captured_pieces(player):
+            for target in self.get_piece_droppable_locations(piece):
+                yield PlayerAction(ActionType.DROP, player, None, target, piece.kind)
+
+    def iter_legal_action_codes(self, player: PlayerNumber) -> Iterator[int]:
+        """Same as iter_legal_actions, encoded as action_codes integers"""
+        width = self._width
+
+        for piece in self._live_pieces[player] + self._protected_pieces[player]:
+            source = piece.row * width + piece.col
+            for target in self.get_piece_movable_locations(piece):
+                yield make_code(ActionType.MOVE, player, piece.kind, source, target.row * width + target.col)
+
+        for piece in self._unique_captured_pieces(player):
+            for target in self.get_piece_droppable_locations(piece):
+                yield make_code(ActionType.DROP, player, piece.kind, NO_SQUARE, target.row * width + target.col)
+
+    def iter_pieces(self) -> Iterator[tuple[PlayerNumber, PieceKind, Location | None]]:
+        """(owner, kind, location) of every piece, without computing moves; location is None for captured pieces"""
+        for player in PlayerNumber:
+            for piece in self._live_pieces[player] + self._protected_pieces[player]:
+                yield (player, piece.kind, piece.location)
+
+            for piece in self._captured_pieces[player]:
+                yield (player, piece.kind, None)
+
+    def _unique_captured_pieces(self, player: PlayerNumber) -> list[Piece]:
+        """First captured piece of each kind (identical kinds have identical drops)"""
+        kinds: dict[PieceKind, Piece] = {}
+        for piece in self._captured_pieces[player]:
+            kinds.setdefault(piece.kind, piece)
+
+        return list(kinds.values())
+
     def get_all_movable_locations(self, player: PlayerNumber) -> list[Location]:
         locations: list[Location] = []
 
@@ -254,24 +509,54 @@ class Board:
         return locations
     
     def get_piece_droppable_locations(self, piece: Piece) -> list[Location]:
+        return self.get_drops(piece.owner)
 
-        locations: list[Location] = []
+    def get_moves_at(self, location: Location) -> list[Location]:
+        """Moves of the piece on location"""
+        piece = self._grid[location.row][location.col]
+        assert piece is not None
 
-        for row in range(self._height):
-            for col in range(self._width):
-                loc = Location(row, col)
-                if self.is_valid_location(loc, piece.owner):
-                    locations.append(loc)
+        return self.get_piece_movable_locations(piece)
+
+    def get_drops(self, owner: PlayerNumber) -> list[Location]:
+        """Computed once per board state and owner, shared by all captured pieces of that owner"""
+        locations = self._droppable_locations.get(owner)
+
+        if locations is None:
+            locations = [
+                Location(row, col)
+                for row in range(self._height)
+                for col in range(self._width)
+                if self.is_valid_location(Location(row, col), owner)
+            ]
+            self._droppable_locations[owner] = locations
         
-        return locations
+        return list(locations)
+
+    def get_forbidden_drop_locations(self, owner: PlayerNumber) -> set[Location]:
+        """
+        Locations within movement range of any Latias or Latios;
+        Computed once per board state and owner (invalidated by _set_tile)
+        """
+        forbidden = self._forbidden_drops.get(owner)
+
+        if forbidden is None:
+            opponent: PlayerNumber = PlayerNumber.ONE if owner == PlayerNumber.TWO else PlayerNumber.TWO
+            mapping = self.get_movable_locations_mapping(opponent)
+
+            forbidden = set[Location]()
+            for piece in self._protected_pieces[opponent] + self._protected_pieces[owner]:
+                forbidden.update(piece.get_movement_range(mapping))
+
+            self._forbidden_drops[owner] = forbidden
+
+        return forbidden
     
     def is_valid_location(self, location: Location, owner: PlayerNumber) -> bool:
         loc = self._grid[location.row][location.col]
-        opponent: PlayerNumber = PlayerNumber.ONE if owner == PlayerNumber.TWO else PlayerNumber.TWO
 
-        for piece in self._protected_pieces[opponent] + self._protected_pieces[owner]:
-            if location in piece.get_movement_range(self.get_movable_locations_mapping(opponent)):
-                return False
+        if location in self.get_forbidden_drop_locations(owner):
+            return False
             
         return not loc
 
@@ -377,22 +662,44 @@ class DefaultPositions:
 
 # If we need to add game pieces, we create another PiecePosition Class
 
+COMPACT_SIZE = BOARD_ROWS * BOARD_COLS + 2 * len(KINDS) + 3
+"""
+GameModel.to_compact layout: one byte per tile (0 if empty, else 1 + kind index, | 0x08 if owned by player two),
+captured counts per (player, kind index), then active player, action count and game status
+"""
+COMPACT_PLAYER_TWO = 0x08
+COMPACT_STATUSES: list[GameStatus] = list(GameStatus)
+
 class BoardSetter:
     def __init__(self, positions: PiecePositions):
         self._positions = positions.get_positions()
     
-    def set_board(self, board: Board):
+    def set_board(self, board: GameBoard):
 
 
         for player, kind, location in self._positions:
             piece = PieceFactory.make(kind, location, player)
             board.put(location.row, location.col, piece, player)
 
+@dataclass(frozen=True)
+class ActionRecord:
+    """
+    Minimal delta for GameModel.pop; captured_piece is the piece on the target tile before capture
+    (as returned by get_live_piece), None if the move did not capture
+    """
+    action: PlayerAction
+    moved: bool
+    captured_piece: Piece | ProtectedPiece | None
+    dropped: bool
+    active_player: PlayerNumber
+    action_count: int
+    game_status: GameStatus
+
 class GameModel:
     @classmethod
-    def default(cls) -> Self:
-
-        board = Board(BOARD_ROWS, BOARD_COLS)
+    def default(cls, board_type: type[GameBoard] = Board) -> Self:
+        """board_type selects the board engine (e.g. bitboard.BitBoard); defaults to Board"""
+        board = board_type(BOARD_ROWS, BOARD_COLS)
 
         setter = BoardSetter(DefaultPositions())
         setter.set_board(board)
@@ -409,16 +716,38 @@ class GameModel:
         return cls(state, board, PlayerNumber.ONE, 3)
 
 
-    def __init__(self, state: GameState, board: Board, player: PlayerNumber, action_count: int):
+    def __init__(self, state: GameState, board: GameBoard, player: PlayerNumber, action_count: int):
         self._state = state
         self._board = board
         self._active_player = player
         self._action_count = action_count
         self._game_status: GameStatus = GameStatus.ONGOING
+        self._history: list[ActionRecord] = []
+        self._state_is_stale = False
     
     @property
     def state(self) -> GameState:
+        if self._state_is_stale:
+            self._update_state()
+
         return self._state
+
+    @property
+    def board(self) -> GameBoard:
+        """For read-only queries (e.g. search evaluation); mutate only through make_action/push/pop"""
+        return self._board
+
+    @property
+    def active_player(self) -> PlayerNumber:
+        return self._active_player
+
+    @property
+    def action_count(self) -> int:
+        return self._action_count
+
+    @property
+    def game_status(self) -> GameStatus:
+        return self._game_status
     
     def _update_turn_status(self):
         if self._action_count == 0 and GameStatus.ONGOING:
@@ -426,6 +755,7 @@ class GameModel:
             self._action_count = 3
     
     def _update_state(self):
+        self._state_is_stale = False
 
         self._state = GameState(
             active_player = self._active_player,
@@ -443,18 +773,28 @@ class GameModel:
            self._game_status= GameStatus.PLAYER_WIN if winner == PlayerNumber.ONE else GameStatus.PLAYER_LOSE
 
     def make_action(self, action: PlayerAction):
+        self.push(action)
+        self._update_state()
+
+    def push(self, action: PlayerAction):
+        """
+        Make action and record the minimal delta needed to revert it with pop;
+        Unlike make_action, the GameState is only rebuilt when state is next read
+        """
         board = self._board
         target = action.target_location
         source = action.source_location
         kind = action.kind
         player = action.player
 
-        print(target, source, kind, player)
+        active_player, action_count, game_status = self._active_player, self._action_count, self._game_status
+        moved, dropped = False, False
+        captured_piece: Piece | ProtectedPiece | None = None
+
         match action.action_type:
 
             case ActionType.MOVE:
                 if source:
-                    print("I am moving!")
                     piece_to_move = board.get_live_piece(source)
 
                     # Narrow type down
@@ -466,17 +806,20 @@ class GameModel:
 
                             # Check if can capture
                             if board.can_capture(target):
-                                
+                                captured_piece = board.get_live_piece(target)
                                 board.capture(target, piece_to_move)
 
                             # Move piece simply  
                             else:
                                 board.move(target, piece_to_move)
 
+                            moved = True
+
                         # If protected piece, check if target location is valid
                         elif type(piece_to_move) == ProtectedPiece:
                             board.take(source)
                             board.move(target, piece_to_move)
+                            moved = True
 
 
             case ActionType.DROP:
@@ -484,14 +827,107 @@ class GameModel:
 
                 if piece_to_drop and board.is_valid_location(target, player):
                     board.drop(target, piece_to_drop, player)
+                    dropped = True
 
         self._action_count -= 1
         self._check_if_game_over()
         self._update_turn_status()
-        self._update_state()
+
+        self._history.append(ActionRecord(action, moved, captured_piece, dropped, active_player, action_count, game_status))
+        self._state_is_stale = True
+
+    def pop(self) -> PlayerAction:
+        """Revert the last action made (via push or make_action); raises IndexError if there is none"""
+        record = self._history.pop()
+        action = record.action
+
+        if record.moved and action.source_location is not None:
+            self._board.undo_move(action.source_location, action.target_location, record.captured_piece)
+
+        elif record.dropped:
+            self._board.undo_drop(action.target_location, action.player)
+
+        self._active_player = record.active_player
+        self._action_count = record.action_count
+        self._game_status = record.game_status
+        self._state_is_stale = True
+
+        return action
+
+    def legal_actions(self) -> Iterator[PlayerAction]:
+        """Lazily yield the legal actions of the active player (moves, then drops); none once the game is over"""
+        if self._game_status == GameStatus.ONGOING:
+            yield from self._board.iter_legal_actions(self._active_player)
+
+    def legal_action_codes(self) -> Iterator[int]:
+        """Same as legal_actions, encoded as action_codes integers (see action_codes.decode_action)"""
+        if self._game_status == GameStatus.ONGOING:
+            yield from self._board.iter_legal_action_codes(self._active_player)
+
+    def is_legal_action(self, action: PlayerAction) -> bool:
+        code = encode_action(action)
+        return any(legal == code for legal in self.legal_action_codes())
+
+    @property
+    def zobrist_key(self) -> int:
+        """Key of the position: tiles, captured pieces, active player and remaining actions (see zobrist)"""
+        return self._board.zobrist_key ^ turn_key(self._active_player, self._action_count)
+
+    def to_compact(self) -> bytes:
+        """Position as COMPACT_SIZE bytes (no history); cheap to send to other processes, see from_compact"""
+        data = bytearray(COMPACT_SIZE)
+        hands = BOARD_ROWS * BOARD_COLS
+
+        for owner, kind, location in self._board.iter_pieces():
+            player_two = owner == PlayerNumber.TWO
+
+            if location is None:
+                data[hands + player_two * len(KINDS) + KIND_INDEX[kind]] += 1
+            else:
+                data[location.row * BOARD_COLS + location.col] = 1 + KIND_INDEX[kind] | (COMPACT_PLAYER_TWO if player_two else 0)
+
+        data[-3] = self._active_player == PlayerNumber.TWO
+        data[-2] = self._action_count
+        data[-1] = COMPACT_STATUSES.index(self._game_status)
+
+        return bytes(data)
+
+    @classmethod
+    def from_compact(cls, data: bytes, board_type: type[GameBoard] = Board) -> Self:
+        """Inverse of to_compact; the model starts with an empty history"""
+        if len(data) != COMPACT_SIZE:
+            raise ValueError(f"Compact position must be {COMPACT_SIZE} bytes, got {len(data)}")
+
+        board = board_type(BOARD_ROWS, BOARD_COLS)
+        hands = BOARD_ROWS * BOARD_COLS
+
+        for square in range(hands):
+            if tile := data[square]:
+                owner = PlayerNumber.TWO if tile & COMPACT_PLAYER_TWO else PlayerNumber.ONE
+                location = Location(square // BOARD_COLS, square % BOARD_COLS)
+                board.put(location.row, location.col, PieceFactory.make(KINDS[(tile & ~COMPACT_PLAYER_TWO) - 1], location, owner), owner)
+
+        for index, count in enumerate(data[hands:hands + 2 * len(KINDS)]):
+            owner = PlayerNumber.TWO if index >= len(KINDS) else PlayerNumber.ONE
+            for _ in range(count):
+                piece = PieceFactory.make(KINDS[index % len(KINDS)], Location(-1, -1), owner)
+                if type(piece) == Piece:
+                    board.put_captured(piece, owner)
+
+        player = PlayerNumber.TWO if data[-3] else PlayerNumber.ONE
+        model = cls(GameState(player, [], [], data[-2], COMPACT_STATUSES[data[-1]]), board, player, data[-2])
+        model._game_status = COMPACT_STATUSES[data[-1]]
+        model._state_is_stale = True
+
+        return model
+
+    @property
+    def history(self) -> list[PlayerAction]:
+        """Actions made since the start of the game, oldest first"""
+        return [record.action for record in self._history]
         
     def new_game(self):
-        self._board = Board(BOARD_ROWS, BOARD_COLS)
+        self._board = type(self._board)(BOARD_ROWS, BOARD_COLS)
         setter = BoardSetter(DefaultPositions())
         setter.set_board(self._board)
 
@@ -506,3 +942,5 @@ class GameModel:
         self._active_player = PlayerNumber.ONE
         self._action_count = 3
         self._game_status: GameStatus = GameStatus.ONGOING
+        self._history = []
+        self._state_is_stale = False
@@ -0,0 +1,91 @@
+"""
+Precomputed movement tables: per piece kind and tile, the single-step targets and the ordered rays of sliding pieces;
+Built once per board size on first use, so a movement range is a table lookup plus a blocker scan.
+Tiles are indexed by row * width + col.
+"""
+from functools import cache
+
+from project_types import PieceKind, Location, MovePossibilities, BOARD_ROWS, BOARD_COLS
+
+Direction = tuple[int, int]
+Target = tuple[tuple[int, int], Location]
+"""(row, col) key into a valid_locations mapping, paired with a shared Location instance"""
+
+KIND_DIRECTIONS: dict[PieceKind, list[Direction]] = {
+    PieceKind.EEVEE: MovePossibilities.FORWARD.value,
+    PieceKind.EEVEE_SHINY: MovePossibilities.FORWARD_OPPOSITE.value,
+    PieceKind.PIKACHU: MovePossibilities.DIAGONALS.value,
+    PieceKind.TURTWIG: MovePossibilities.ORTHOGONALS.value,
+    PieceKind.LATIOS: MovePossibilities.ORTHOGONALS.value,
+    PieceKind.LATIAS: MovePossibilities.DIAGONALS.value,
+}
+SLIDING_KINDS = (PieceKind.PIKACHU, PieceKind.TURTWIG)
+
+
+class MovementTables:
+    def __init__(self, height: int, width: int):
+        self.height = height
+        self.width = width
+
+        self.locations: list[Location] = [Location(row, col) for row in range(height) for col in range(width)]
+
+        self.square_rays: dict[Direction, list[tuple[int, ...]]] = {}
+        """Per direction and tile: tile indices walked outwards until the edge of the board"""
+        self.step_masks: dict[Direction, list[int]] = {}
+        """Per direction and tile: bit of the adjacent tile (0 if off the board)"""
+        self.kind_step_masks: dict[PieceKind, list[int]] = {}
+        """Per kind and tile: bits of all adjacent targets"""
+        self.kind_square_rays: dict[PieceKind, list[tuple[tuple[int, ...], ...]]] = {}
+        """Per kind and tile: ordered rays of tile indices"""
+
+        self.steps: dict[PieceKind, list[tuple[Target, ...]]] = {}
+        """Per kind and tile: adjacent targets, in MovePossibilities order"""
+        self.rays: dict[PieceKind, list[tuple[tuple[Target, ...], ...]]] = {}
+        """Per kind and tile: ordered rays of targets, in MovePossibilities order"""
+
+        for dr, dc in MovePossibilities.ORTHOGONALS.value + MovePossibilities.DIAGONALS.value:
+            self._init_direction(dr, dc)
+
+        for kind, directions in KIND_DIRECTIONS.items():
+            self.kind_step_masks[kind] = [
+                sum(self.step_masks[direction][square] for direction in directions)
+                for square in range(height * width)
+            ]
+            self.kind_square_rays[kind] = [
+                tuple(self.square_rays[direction][square] for direction in directions)
+                for square in range(height * width)
+            ]
+            self.rays[kind] = [
+                tuple(tuple(self._target(target) for target in self.square_rays[direction][square]) for direction in directions)
+                for square in range(height * width)
+            ]
+            self.steps[kind] = [
+                tuple(ray[0] for ray in rays if ray)
+                for rays in self.rays[kind]
+            ]
+
+    def _init_direction(self, dr: int, dc: int):
+        rays: list[tuple[int, ...]] = []
+
+        for row in range(self.height):
+            for col in range(self.width):
+                ray: list[int] = []
+                temp_row, temp_col = row + dr, col + dc
+                while 0 <= temp_row < self.height and 0 <= temp_col < self.width:
+                    ray.append(temp_row * self.width + temp_col)
+                    temp_row += dr
+                    temp_col += dc
+
+                rays.append(tuple(ray))
+
+        self.square_rays[(dr, dc)] = rays
+        self.step_masks[(dr, dc)] = [1 << ray[0] if ray else 0 for ray in rays]
+
+    def _target(self, square: int) -> Target:
+        location = self.locations[square]
+        return ((location.row, location.col), location)
+
+
+@cache
+def get_tables(height: int = BOARD_ROWS, width: int = BOARD_COLS) -> MovementTables:
+    return MovementTables(height, width)
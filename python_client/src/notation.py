@@ -0,0 +1,208 @@
+"""
+Compact text notation of a position, like chess FEN: "<ranks> <hands> <active player> <remaining actions>";
+Ranks are listed from row 0 (player two's side) down, separated by '/', one letter per piece and a digit per run of empty tiles.
+Letters are KIND_LETTERS, uppercase for player one and lowercase for player two. Hands list each player's captured kinds
+(player one first, in action_codes.KINDS order) as letters with the count before them if more than one, or '-' if both are empty.
+The starting position is START_NOTATION. Notation describes positions in play; loaded positions are ongoing.
+"""
+from functools import lru_cache
+
+from project_types import GameStatus, Location, PieceKind, PlayerNumber, BOARD_ROWS, BOARD_COLS
+from action_codes import KINDS, KIND_INDEX
+from model import GameModel, GameBoard, Board, COMPACT_SIZE, COMPACT_PLAYER_TWO, COMPACT_STATUSES
+from bitboard import PROTECTED_KINDS
+
+KIND_LETTERS: dict[PieceKind, str] = {
+    PieceKind.EEVEE: 'e',
+    PieceKind.EEVEE_SHINY: 's',
+    PieceKind.PIKACHU: 'p',
+    PieceKind.LATIAS: 'a',
+    PieceKind.LATIOS: 'o',
+    PieceKind.TURTWIG: 't',
+}
+START_NOTATION = 'tp1oa1pt/ssssssss/8/8/8/8/EEEEEEEE/TP1OA1PT - 1 3'
+EMPTY_HANDS = '-'
+PLAYERS: dict[str, PlayerNumber] = {'1': PlayerNumber.ONE, '2': PlayerNumber.TWO}
+MAX_ACTIONS = 3
+
+TILE_COUNT = BOARD_ROWS * BOARD_COLS
+HAND_COUNT = 2 * len(KINDS)
+_ONGOING = COMPACT_STATUSES.index(GameStatus.ONGOING)
+_RUNS = '12345678'[:BOARD_COLS]
+_DIGITS = '0123456789'
+
+_TILES: dict[str, int] = {
+    **{letter.upper(): 1 + KIND_INDEX[kind] for kind, letter in KIND_LETTERS.items()},
+    **{letter: 1 + KIND_INDEX[kind] | COMPACT_PLAYER_TWO for kind, letter in KIND_LETTERS.items()},
+}
+_LETTERS: dict[int, str] = {tile: letter for letter, tile in _TILES.items()}
+_HAND_INDEX: dict[str, int] = {
+    **{letter.upper(): KIND_INDEX[kind] for kind, letter in KIND_LETTERS.items() if kind not in PROTECTED_KINDS},
+    **{letter: len(KINDS) + KIND_INDEX[kind] for kind, letter in KIND_LETTERS.items() if kind not in PROTECTED_KINDS},
+}
+_HAND_LETTERS: list[str] = [
+    *(KIND_LETTERS[kind].upper() for kind in KINDS),
+    *(KIND_LETTERS[kind] for kind in KINDS),
+]
+
+
+class NotationError(ValueError):
+    """Malformed notation"""
+
+
+@lru_cache(maxsize=1 << 14)
+def _parse_rank(rank: str) -> bytes:
+    """Tiles of one rank; ranks repeat a lot (empty ranks, unmoved eevees), hence cached"""
+    tiles = bytearray()
+    after_run = False
+
+    for char in rank:
+        if (tile := _TILES.get(char)) is not None:
+            tiles.append(tile)
+            after_run = False
+        elif char in _RUNS and not after_run:
+            tiles += bytes(int(char))
+            after_run = True
+        else:
+            raise NotationError(f"Invalid piece {char!r} in rank {rank!r}")
+
+    if len(tiles) != BOARD_COLS:
+        raise NotationError(f"Rank {rank!r} has {len(tiles)} tiles instead of {BOARD_COLS}")
+
+    return bytes(tiles)
+
+@lru_cache(maxsize=1 << 12)
+def _parse_hands(hands: str) -> bytes:
+    counts = bytearray(HAND_COUNT)
+
+    if hands == EMPTY_HANDS:
+        return bytes(counts)
+
+    count = ''
+    last = -1
+    for char in hands:
+        if char in _DIGITS:
+            count += char
+            continue
+
+        index = _HAND_INDEX.get(char)
+        if index is None or index <= last or count.startswith('0') or count == '1':
+            raise NotationError(f"Invalid hands {hands!r}")
+
+        number = int(count or 1)
+        if number > 0xFF:
+            raise NotationError(f"Hand count {number} in {hands!r} exceeds {0xFF}")
+
+        counts[index] = number
+        count = ''
+        last = index
+
+    if count:
+        raise NotationError(f"Invalid hands {hands!r}")
+
+    return bytes(counts)
+
+def to_compact(text: str) -> bytes:
+    """Position in the layout of GameModel.to_compact"""
+    fields = text.split(' ')
+    if len(fields) != 4:
+        raise NotationError(f"Expected ranks, hands, active player and remaining actions, got {text!r}")
+
+    ranks, hands, player, actions = fields
+    rows = ranks.split('/')
+    if len(rows) != BOARD_ROWS:
+        raise NotationError(f"Expected {BOARD_ROWS} ranks, got {len(rows)}")
+
+    if player not in PLAYERS:
+        raise NotationError(f"Invalid active player {player!r}")
+
+    if len(actions) != 1 or not '1' <= actions <= str(MAX_ACTIONS):
+        raise NotationError(f"Invalid remaining actions {actions!r}")
+
+    return b''.join(map(_parse_rank, rows)) + _parse_hands(hands) + bytes((player == '2', int(actions), _ONGOING))
+
+
+@lru_cache(maxsize=1 << 14)
+def _format_rank(tiles: bytes) -> str:
+    rank = ''
+    empty = 0
+
+    for tile in tiles:
+        if not tile:
+            empty += 1
+            continue
+
+        if empty:
+            rank += str(empty)
+            empty = 0
+        rank += _LETTERS[tile]
+
+    return rank + str(empty) if empty else rank
+
+@lru_cache(maxsize=1 << 12)
+def _format_hands(counts: bytes) -> str:
+    hands = ''.join(f"{count if count > 1 else ''}{letter}" for letter, count in zip(_HAND_LETTERS, counts) if count)
+
+    return hands or EMPTY_HANDS
+
+def from_compact(data: bytes) -> str:
+    """Notation of a GameModel.to_compact position (its game status is not part of it)"""
+    if len(data) != COMPACT_SIZE:
+        raise NotationError(f"Compact position must be {COMPACT_SIZE} bytes, got {len(data)}")
+
+    ranks = '/'.join([_format_rank(data[start:start + BOARD_COLS]) for start in range(0, TILE_COUNT, BOARD_COLS)])
+
+    return f"{ranks} {_format_hands(data[TILE_COUNT:TILE_COUNT + HAND_COUNT])} {2 if data[-3] else 1} {data[-2]}"
+
+
+def clear_caches():
+    """Empty the rank and hands caches of the parser and formatter, e.g. to measure them cold"""
+    for cached in (_parse_rank, _parse_hands, _format_rank, _format_hands):
+        cached.cache_clear()
+
+
+def from_model(model: GameModel) -> str:
+    return from_compact(model.to_compact())
+
+def from_board(board: GameBoard, active_player: PlayerNumber = PlayerNumber.ONE, action_count: int = MAX_ACTIONS) -> str:
+    """Notation of a board outside of a GameModel, e.g. one set up with BoardSetter"""
+    data = bytearray(COMPACT_SIZE)
+
+    for owner, kind, location in board.iter_pieces():
+        player_two = owner == PlayerNumber.TWO
+
+        if location is None:
+            data[TILE_COUNT + player_two * len(KINDS) + KIND_INDEX[kind]] += 1
+        else:
+            data[location.row * BOARD_COLS + location.col] = 1 + KIND_INDEX[kind] | (COMPACT_PLAYER_TWO if player_two else 0)
+
+    data[-3] = active_player == PlayerNumber.TWO
+    data[-2] = action_count
+
+    return from_compact(bytes(data))
+
+def to_model(text: str, board_type: type[GameBoard] = Board) -> GameModel:
+    """Ongoing model in the position, with an empty history"""
+    return GameModel.from_compact(to_compact(text), board_type)
+
+
+class NotationPositions:
+    """PiecePositions of the board in a notation (for BoardSetter); hands and turn fields are kept alongside"""
+    def __init__(self, text: str):
+        data = to_compact(text)
+
+        self._positions: list[tuple[PlayerNumber, PieceKind, Location]] = [
+            (PlayerNumber.TWO if tile & COMPACT_PLAYER_TWO else PlayerNumber.ONE, KINDS[(tile & ~COMPACT_PLAYER_TWO) - 1], Location(square // BOARD_COLS, square % BOARD_COLS))
+            for square, tile in enumerate(data[:TILE_COUNT])
+            if tile
+        ]
+        self.hands: list[tuple[PlayerNumber, PieceKind, int]] = [
+            (PlayerNumber.TWO if index >= len(KINDS) else PlayerNumber.ONE, KINDS[index % len(KINDS)], count)
+            for index, count in enumerate(data[TILE_COUNT:TILE_COUNT + HAND_COUNT])
+            if count
+        ]
+        self.active_player = PlayerNumber.TWO if data[-3] else PlayerNumber.ONE
+        self.action_count: int = data[-2]
+
+    def get_positions(self) -> list[tuple[PlayerNumber, PieceKind, Location]]:
+        return self._positions
@@ -1,85 +1,238 @@
+import queue
+import threading
+from collections.abc import Iterable
+from typing import Protocol
+
 import pygame
-from cs150241project_networking import CS150241ProjectNetworking, Message
 
 from project_types import (
     GameStatus, PieceKind, ActionType, Location, PlayerNumber,
     GameState, PlayerAction,
     )
 from view import *
+from async_networking import AsyncNetworking, Message, Joined
+from server import SEAT_PLAYERS, SPECTATOR_SEAT
+import wire_codec
+
+SERVER_HOST = 'localhost'
+SERVER_PORT = 15000
+
+
+class NetworkClient(Protocol):
+    """AsyncNetworking, or the course's synchronous CS150241ProjectNetworking"""
+    @property
+    def player_id(self) -> int:
+        ...
+
+    def send(self, payload: str):
+        ...
+
+    def recv(self) -> Iterable[Message | Joined]:
+        ...
+
 
 class DataParser:
     """
-    Abstraction that only parses messages to type PlayerAction and vice versa; for SRP compliance
+    Abstraction that only parses messages to type PlayerAction and vice versa; for SRP compliance.
+    Sends the compact wire format (see wire_codec), and still understands the previous string format.
     """
     def parse_to_message(self, server_id, action: PlayerAction) -> Message | None:
         """Convert type PlayerAction to message (if valid; else None)"""
-        source_loc = f"{ action.source_location.row }-{ action.source_location.col }" if action.source_location \
-            else f""
-        
-        payload = f"{ action.action_type.value }%{ action.player.value }%{ source_loc }%{ action.target_location.row }-{ action.target_location.col }%{ action.kind }"
+        return Message(server_id, wire_codec.encode_text([action]))
 
-        return Message(server_id, payload)
+    def parse_to_player_actions(self, message: Message) -> list[PlayerAction]:
+        """Convert type message to PlayerActions, several for a batch (empty if invalid)"""
+        if wire_codec.is_compact_text(message.payload):
+            try:
+                return wire_codec.decode_text(message.payload)
+            except wire_codec.WireError:
+                return []
+
+        _action = wire_codec.decode_legacy(message.payload)
+        return [_action] if _action is not None else []
     
     def parse_to_player_action(self, message: Message) -> PlayerAction | None:
-        """Convert type message to PlayerAction (if valid; else None)"""
-        properties = message.payload.split('%')
+        """Convert type message to PlayerAction (if valid and a single action; else None)"""
+        _actions = self.parse_to_player_actions(message)
+
+        return _actions[0] if len(_actions) == 1 else None
+
+NETWORK_MESSAGE = pygame.event.custom_type()
+"""Posted by NetworkPump whenever messages were queued; wakes up the event-driven loop"""
+NETWORK_POLL_S = 0.002
+
+
+class NetworkPump:
+    """
+    Drains a synchronous networking object in a daemon thread, so the render loop never polls it;
+    Received messages are queued in order, and a NETWORK_MESSAGE event is posted for each batch
+    """
+    def __init__(self, networking: NetworkClient, poll_interval: float = NETWORK_POLL_S):
+        self._networking = networking
+        self._poll_interval = poll_interval
+        self._messages: queue.SimpleQueue[Message | Joined] = queue.SimpleQueue()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="network-pump", daemon=True)
 
-        if len(properties) != 5:
-            return None
+    def start(self):
+        """Call after pygame.init(), since events are posted from this thread"""
+        self._thread.start()
 
-        action_type = ActionType.MOVE if properties[0] == ActionType.MOVE else ActionType.DROP
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            _received = False
+
+            for message in self._networking.recv():
+                self._messages.put(message)
+                _received = True
+
+            if _received:
+                pygame.event.post(pygame.event.Event(NETWORK_MESSAGE))
+
+            self._stopped.wait(self._poll_interval)
+
+    def drain(self) -> list[Message | Joined]:
+        """Messages received so far, oldest first; called from the render loop"""
+        _messages: list[Message | Joined] = []
+
+        while True:
+            try:
+                _messages.append(self._messages.get_nowait())
+            except queue.Empty:
+                return _messages
 
-        return PlayerAction(
-            action_type,
-            player = PlayerNumber.ONE if properties[1] == PlayerNumber.ONE else PlayerNumber.TWO,
-            source_location = \
-                None if action_type == ActionType.DROP \
-                else Location(int(properties[2][0]), int(properties[2][2])),
-            target_location = Location(int(properties[3][0]), int(properties[3][2])),
-            kind = PieceKind(properties[4])
-            )
 
 class OnlineView(GameView):
     """
     MVC class for online implementation
     """
-    def __init__(self, state: GameState):
-        super().__init__(state)
+    def __init__(self, state: GameState, event_driven: bool = True, networking: NetworkClient | None = None):
+        """networking: connects an AsyncNetworking client to the project server if not given"""
+        super().__init__(state, event_driven)
 
-        self._networking = CS150241ProjectNetworking.connect('localhost', 15000)
-        self._server_id = self._networking.player_id
+        self._networking = networking if networking is not None \
+            else AsyncNetworking.connect(SERVER_HOST, SERVER_PORT, merge=wire_codec.merge_text)
 
-        self._viewing_player = PlayerNumber.ONE if self._server_id == 1 else PlayerNumber.TWO
+        "AsyncNetworking wakes the loop itself; others are drained by a NetworkPump thread"
+        self._network_pump = NetworkPump(self._networking) if not isinstance(self._networking, AsyncNetworking) else None
+        self._rendered_network_stats: tuple[str, ...] = ()
+
+        self._rendered_player: tuple[int, str] | None = None
+
+        self._joined: Joined | None = None
+        """Last connection of AsyncNetworking whose game is shown; None before the first, and for other clients"""
+
+    @property
+    def _server_id(self) -> int:
+        """Seat of the connection whose game is shown, as AsyncNetworking is seated again on every reconnect"""
+        return self._joined.player_id if self._joined is not None else self._networking.player_id
+
+    @property
+    def _viewing_player(self) -> PlayerNumber | None:
+        """None for spectators"""
+        return SEAT_PLAYERS.get(self._server_id)
 
     def _is_valid_move(self):
-        """Check if move is for own piece and current active player"""
-        return self._viewing_player == self._active_player
+        """Check if move is for own piece and current active player; spectators never move"""
+        return self._viewing_player is not None and self._viewing_player == self._active_player
 
     def _send_to_server(self, action: PlayerAction):
         """Send player's message to network --- no local actions done"""
         message = DataParser().parse_to_message(self._server_id, action)
 
-        if message:
+        if not message:
+            return
+
+        if isinstance(self._networking, AsyncNetworking) and self._joined is not None:
+            "Dropped by AsyncNetworking if it reconnected since: the action was made against the previous connection's game"
+            self._networking.send(message.payload, self._joined.connection)
+        else:
             self._networking.send(message.payload)
 
-    def _receive_from_server(self, message: Message):
+    def _receive_from_server(self, message: Message | Joined):
         """Use received message to manipulate client"""
-        _received_turn = DataParser().parse_to_player_action(message)
+        if isinstance(message, Joined):
+            self._rejoin(message)
+            return
 
-        if _received_turn:
+        for _received_turn in DataParser().parse_to_player_actions(message):
             self._make_turn(_received_turn)
             self._rerender_after_turn()
 
-    def _render_player_number(self):
+    def _rejoin(self, joined: Joined):
+        """The server replays the room's game from its start (or starts a new one) on every connection, so start over"""
+        self._joined = joined
+
+        self._new_game()
+        self._init_view_state()
+
+    def _render_player_number(self) -> pygame.Rect:
         """Render viewing player, and if it's their turn (green) or not (white)"""
-        _renderable = self._font.render(
-            f"P{self._server_id}",
-            True,
-            'green' if self._active_player == self._viewing_player else 'white'
-            )
+        _player = self._rendered_player = (self._server_id, 'green' if self._active_player == self._viewing_player else 'white')
+
+        _renderable = self._text_cache.get(f"P{_player[0]}" if _player[0] != SPECTATOR_SEAT else "Spectating", _player[1])
         _blittable = _renderable.get_rect(centery = SCREEN_HEIGHT//2)
 
-        self._screen.blit(_renderable, _blittable)
+        self._screen.fill('black', _blittable)
+        return self._screen.blit(_renderable, _blittable)
+
+    def _network_stats(self) -> tuple[str, ...]:
+        """HUD lines with round-trip latencies of AsyncNetworking (none for other clients)"""
+        if not isinstance(self._networking, AsyncNetworking):
+            return ()
+
+        if not self._networking.is_connected:
+            return ("reconnecting...",)
+
+        _rtt, _p99, _ping = self._networking.rtt.mean, self._networking.rtt.percentile(0.99), self._networking.ping.last
+
+        return (
+            f"rtt {_rtt * 1e3:.0f} ms" if _rtt is not None else "rtt -",
+            f"p99 {_p99 * 1e3:.0f} ms" if _p99 is not None else "p99 -",
+            f"ping {_ping * 1e3:.0f} ms" if _ping is not None else "ping -",
+        )
+
+    def _render_network_stats(self, lines: tuple[str, ...]) -> pygame.Rect:
+        """Latency HUD below the player number"""
+        self._rendered_network_stats = lines
+
+        _hud = pygame.Rect(0, SCREEN_HEIGHT//2 + 24, (SCREEN_WIDTH - BOARD_WIDTH)//2, 54)
+        self._screen.fill('black', _hud)
+
+        for line, text in enumerate(lines):
+            self._screen.blit(self._small_text_cache.get(text, 'gray'), (4, _hud.top + 18*line))
+
+        return _hud
+
+    def _render_frame(self) -> list[pygame.Rect]:
+        """
+        Also redraw player number after a full redraw, when the turn changed hands or a reconnect changed the seat,
+        and the latency HUD when it changed
+        """
+        _is_full_redraw = self._needs_full_redraw
+        _updated = super()._render_frame()
+
+        _player = (self._server_id, 'green' if self._active_player == self._viewing_player else 'white')
+
+        if _is_full_redraw or _player != self._rendered_player:
+            _updated.append(self._render_player_number())
+
+        _stats = self._network_stats()
+
+        if _is_full_redraw or _stats != self._rendered_network_stats:
+            _updated.append(self._render_network_stats(_stats))
+
+        return _updated
+
+    def _post_network_message(self):
+        """Called from the network thread"""
+        pygame.event.post(pygame.event.Event(NETWORK_MESSAGE))
+
+    def _received_messages(self) -> Iterable[Message | Joined]:
+        return self._network_pump.drain() if self._network_pump is not None else self._networking.recv()
 
     def run(self):
         """Edited to incorporate networking"""
@@ -87,23 +240,40 @@ class OnlineView(GameView):
 
         self._screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         self._clock = pygame.time.Clock()
+        SPRITES.preload()
+
+        if self._network_pump is not None:
+            self._network_pump.start()
+        elif isinstance(self._networking, AsyncNetworking):
+            self._networking.set_message_callback(self._post_network_message)
+
+            "Messages may have arrived before the callback was set"
+            self._post_network_message()
+
+        self._push_frame()
 
         _game_is_running = True
 
         while _game_is_running:
-            """Receive input from server"""
-            for message in self._networking.recv():
-                self._receive_from_server(message)
-
-            "Receive input from client"
-            for event in pygame.event.get():
+            "Receive input from client and server"
+            for event in self._next_events():
                 if event.type == pygame.QUIT:
                     _game_is_running = False
 
+                elif event.type == NETWORK_MESSAGE:
+                    for message in self._received_messages():
+                        self._receive_from_server(message)
+
+                elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                    self._needs_full_redraw = True
+
                 elif event.type == pygame.KEYDOWN and event.key == pygame.K_r:
                     self._new_game()
                     self._init_view_state()
 
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    self._toggle_frame_time()
+
                 elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self._is_valid_move():
                     if self._renderable_board.rect.collidepoint(event.pos):
                         _player_turn = self._mouse_press_on_board(event.pos)
@@ -114,16 +284,12 @@ class OnlineView(GameView):
                     elif self._is_cursor_on_captures(event.pos):
                         self._mouse_press_on_captures(event.pos, self._active_player)
 
-            self._screen.fill('black')
-            self._captures_p1.render_to_screen(self._screen)
-            self._captures_p2.render_to_screen(self._screen)
-            self._renderable_board.render_to_screen(self._screen)
-            self._render_player_number()
-
-            if self._game_status != GameStatus.ONGOING:
-                self._evaluate_winner()
+            self._push_frame()
 
-            pygame.display.flip()
-            self._clock.tick(60)
+        if self._network_pump is not None:
+            self._network_pump.stop()
+        elif isinstance(self._networking, AsyncNetworking):
+            self._networking.set_message_callback(None)
+            self._networking.close()
 
         pygame.quit()
\ No newline at end of file
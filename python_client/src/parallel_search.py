@@ -0,0 +1,157 @@
+"""
+Parallel root search: the root actions of each iterative deepening iteration are searched in a process pool.
+Workers receive the position as GameModel.to_compact bytes and keep their own AlphaBetaSearch and transposition table.
+The best score so far is the alpha bound of every root action submitted after it, so later actions get cut off sooner.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from model import GameModel, Board, GameBoard
+from bitboard import BOARD_ENGINES
+from ai import AlphaBetaSearch, SearchResult, INFINITY, WIN_SCORE
+from action_codes import decode_action
+from transposition import TranspositionTable
+
+_worker_search: AlphaBetaSearch | None = None
+_worker_board: type[GameBoard] = Board
+_worker_position: tuple[bytes, GameModel] | None = None
+
+
+def _init_worker(table_mb: float, engine: str):
+    global _worker_search, _worker_board
+    _worker_search = AlphaBetaSearch(table=TranspositionTable(table_mb) if table_mb > 0 else None)
+    _worker_board = BOARD_ENGINES[engine]
+
+def _ready(_: int) -> int:
+    return os.getpid()
+
+def _search_action(position: bytes, code: int, depth: int, alpha: int, deadline: float) -> tuple[int, int | None, int]:
+    """(code, score or None on timeout, nodes); the decoded position is kept for the next root action"""
+    global _worker_position
+    assert _worker_search is not None
+
+    if _worker_position is None or _worker_position[0] != position:
+        _worker_position = (position, GameModel.from_compact(position, _worker_board))
+        if _worker_search.table is not None:
+            _worker_search.table.new_search()
+
+    score = _worker_search.search_action(_worker_position[1], code, depth, alpha, INFINITY, deadline)
+    return code, score, _worker_search.nodes
+
+
+class ParallelSearch:
+    """SearchEngine splitting root actions across worker processes; call close() (or use as a context manager) when done"""
+    def __init__(self, workers: int | None = None, max_depth: int = 32, table_mb: float = 16, engine: str = 'board'):
+        self._workers = workers or os.cpu_count() or 1
+        self._max_depth = max_depth
+        self._table_mb = table_mb
+        self._engine = engine
+        self._pool: ProcessPoolExecutor | None = None
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    def start(self):
+        """Start the worker processes ahead of the first search (otherwise the first search pays for it)"""
+        if self._pool is not None:
+            return
+
+        # Spawned workers do not inherit threads or pygame state from the client process
+        self._pool = ProcessPoolExecutor(
+            self._workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self._table_mb, self._engine),
+            )
+        list(self._pool.map(_ready, range(self._workers)))
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *_: object):
+        self.close()
+
+    def search(self, model: GameModel, budget_ms: int) -> SearchResult:
+        """Iterative deepening until budget_ms runs out; returns the best action of the deepest completed iteration"""
+        self.start()
+        assert self._pool is not None
+
+        start = time.perf_counter()
+        deadline = start + budget_ms / 1000
+        position = model.to_compact()
+
+        ordering = AlphaBetaSearch()
+        codes = ordering.order_actions(model, list(model.legal_action_codes()))
+        result = SearchResult(decode_action(codes[0]) if codes else None, 0, 0, 0, 0.0)
+        nodes = 0
+
+        for depth in range(1, self._max_depth + 1):
+            if not codes:
+                break
+
+            scores, iteration_nodes = self._search_iteration(position, codes, depth, deadline)
+            nodes += iteration_nodes
+            if scores is None:
+                break
+
+            # Best first next iteration; fail-low scores are upper bounds but still order the rest usefully
+            codes.sort(key=lambda code: -scores[code])
+            result = SearchResult(decode_action(codes[0]), scores[codes[0]], depth, nodes, time.perf_counter() - start)
+
+            if abs(result.score) >= WIN_SCORE - self._max_depth:
+                break
+
+        return SearchResult(result.action, result.score, result.depth, nodes, time.perf_counter() - start)
+
+    def _search_iteration(self, position: bytes, codes: list[int], depth: int, deadline: float) -> tuple[dict[int, int] | None, int]:
+        """Root scores at depth (None if the deadline passed) and nodes searched"""
+        assert self._pool is not None
+
+        scores: dict[int, int] = {}
+        nodes = 0
+        alpha = -INFINITY
+        pending: set[Future[tuple[int, int | None, int]]] = set()
+        remaining = iter(codes)
+        timed_out = False
+
+        # The first (best known) action alone establishes alpha for the others
+        first = self._pool.submit(_search_action, position, next(remaining), depth, alpha, deadline)
+        pending.add(first)
+        wait(pending)
+
+        while pending:
+            done = {future for future in pending if future.done()}
+            pending -= done
+
+            for future in done:
+                code, score, searched = future.result()
+                nodes += searched
+
+                if score is None:
+                    timed_out = True
+                    continue
+
+                scores[code] = score
+                alpha = max(alpha, score)
+
+            # Keep every worker busy, each new root action bounded by the best score so far
+            while not timed_out and len(pending) < self._workers:
+                code = next(remaining, None)
+                if code is None:
+                    break
+
+                pending.add(self._pool.submit(_search_action, position, code, depth, alpha, deadline))
+
+            if pending:
+                wait(pending, return_when=FIRST_COMPLETED)
+
+        return (None if timed_out else scores), nodes
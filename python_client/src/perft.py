@@ -0,0 +1,87 @@
+"""
+Perft for the rules engine: counts leaf action sequences of a given depth from the default position.
+Each action is one ply (a turn is three plies), including captures and drops; finished games have no legal actions,
+so sequences ending a game before the full depth add no nodes (as checkmates above the horizon do in chess perft).
+Run from python_client, e.g. `poetry run python src/perft.py --depth 4 --check`.
+"""
+import argparse
+import time
+
+from model import GameModel
+from bitboard import BOARD_ENGINES
+
+EXPECTED_COUNTS: dict[int, int] = {
+    1: 9,
+    2: 100,
+    3: 1_432,
+    4: 13_100,
+    5: 160_338,
+    6: 2_664_103,
+}
+"""Perft counts from GameModel.default() (agreed on by both engines); a correctness oracle for engine changes"""
+
+
+def perft(model: GameModel, depth: int) -> int:
+    if depth == 0:
+        return 1
+
+    if depth == 1:
+        return sum(1 for _ in model.legal_action_codes())
+
+    nodes = 0
+    for action in model.legal_actions():
+        model.push(action)
+        nodes += perft(model, depth - 1)
+        model.pop()
+
+    return nodes
+
+def divide(model: GameModel, depth: int) -> dict[str, int]:
+    """Perft per root action, for locating differences between engines"""
+    counts: dict[str, int] = {}
+
+    for action in model.legal_actions():
+        model.push(action)
+        source = f"{action.source_location.row},{action.source_location.col}" if action.source_location else "hand"
+        target = f"{action.target_location.row},{action.target_location.col}"
+        counts[f"{action.action_type.value} {action.kind.value} {source}->{target}"] = perft(model, depth - 1)
+        model.pop()
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--engine', choices=BOARD_ENGINES, default='board')
+    parser.add_argument('--divide', action='store_true', help='print counts per root action')
+    parser.add_argument('--check', action='store_true', help='compare against EXPECTED_COUNTS')
+    args = parser.parse_args()
+
+    failed = False
+
+    for depth in range(1, args.depth + 1):
+        model = GameModel.default(BOARD_ENGINES[args.engine])
+
+        start = time.perf_counter()
+        nodes = perft(model, depth)
+        elapsed = time.perf_counter() - start
+
+        line = f"depth {depth}: {nodes:>12,} nodes in {elapsed:8.3f}s ({nodes / elapsed:>12,.0f} nodes/s)"
+        if args.check and depth in EXPECTED_COUNTS:
+            ok = nodes == EXPECTED_COUNTS[depth]
+            failed = failed or not ok
+            line += " ok" if ok else f" MISMATCH (expected {EXPECTED_COUNTS[depth]:,})"
+
+        print(line)
+
+    if args.divide:
+        for root, nodes in divide(GameModel.default(BOARD_ENGINES[args.engine]), args.depth).items():
+            print(f"{root}: {nodes}")
+
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Protocol
+from dataclasses import dataclass, field
+from typing import Callable, Protocol
 from enum import Enum, StrEnum, auto
 
 
@@ -49,12 +49,27 @@ class Location:
 
 @dataclass(frozen=True)
 class LivePiece:
-    """Infer implicit type from location and moves: type Location => piece is on board, type None => piece is captured 
+    """Infer implicit type from location and moves: type Location => piece is on board, type None => piece is captured;
+    Boards pass moves as a function generating them on first access of moves (see model.LazyMoves)
     """
     kind: PieceKind
     owner: PlayerNumber
-    moves: list[Location]
+    _moves: list[Location] | Callable[[], list[Location]] = field(compare=False, repr=False)
     location: Location | None
+
+    @property
+    def moves(self) -> list[Location]:
+        moves = self._moves
+
+        if callable(moves):
+            moves = moves()
+            object.__setattr__(self, '_moves', moves)
+
+        return moves
+
+    def __reduce__(self):
+        """Pickled and deep-copied with its moves generated, as the function refers to the board"""
+        return (LivePiece, (self.kind, self.owner, self.moves, self.location))
     
 
 
@@ -107,3 +122,19 @@ class GameStateChangeObserver(Protocol):
     """For controller; Communicator of change in game state (ongoing, player 1 win, player 1 lose)"""
     def on_state_change(self, state: GameState):
         ...
+
+class TurnProvider(Protocol):
+    """For view; Non-human player (e.g. computer opponent) notified of state changes, whose turns the view polls every frame"""
+    @property
+    def player(self) -> PlayerNumber:
+        ...
+
+    @property
+    def is_thinking(self) -> bool:
+        ...
+
+    def on_state_change(self, state: GameState):
+        ...
+
+    def poll_turn(self) -> PlayerAction | None:
+        ...
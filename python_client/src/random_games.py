@@ -0,0 +1,131 @@
+"""
+Seeded random games and order-independent views of game states, shared by the benchmarks and the tests
+"""
+import random
+
+from project_types import GameStatus, PieceKind, ActionType, Location, LivePiece, GameState, PlayerAction
+from model import GameModel
+from bitboard import BitBoard
+from action_codes import decode_action
+
+
+def _piece_signature(piece: LivePiece) -> tuple[str, str, tuple[int, int] | None, tuple[tuple[int, int], ...]]:
+    location = (piece.location.row, piece.location.col) if piece.location is not None else None
+    moves = tuple(sorted((loc.row, loc.col) for loc in piece.moves))
+
+    return (piece.kind.value, piece.owner.value, location, moves)
+
+def state_signature(state: GameState) -> tuple[object, ...]:
+    """Order-independent view of a GameState, for comparing engines"""
+    return (
+        state.active_player,
+        state.action_count,
+        state.game_status,
+        tuple(sorted(_piece_signature(piece) for piece in state.live_pieces)),
+        tuple(sorted(_piece_signature(piece) for piece in state.captured_pieces)),
+    )
+
+def state_actions(state: GameState) -> list[PlayerAction]:
+    """All actions of the active player listed in a GameState, in a canonical order"""
+    player = state.active_player
+    actions: list[PlayerAction] = []
+
+    for piece in state.live_pieces:
+        if piece.owner == player and piece.location is not None:
+            actions.extend(
+                PlayerAction(ActionType.MOVE, player, piece.location, target, piece.kind)
+                for target in piece.moves
+            )
+
+    dropped: set[PieceKind] = set()
+    for piece in state.captured_pieces:
+        if piece.owner == player and piece.kind not in dropped:
+            dropped.add(piece.kind)
+            actions.extend(
+                PlayerAction(ActionType.DROP, player, None, target, piece.kind)
+                for target in piece.moves
+            )
+
+    def key(action: PlayerAction) -> tuple[str, str, int, int, int, int]:
+        source = action.source_location or Location(-1, -1)
+        target = action.target_location
+        return (action.action_type.value, action.kind.value, source.row, source.col, target.row, target.col)
+
+    return sorted(actions, key=key)
+
+def random_game(model: GameModel, rng: random.Random, max_actions: int) -> int:
+    """Play random actions until the game ends; returns number of actions made"""
+    made = 0
+
+    while made < max_actions and model.state.game_status == GameStatus.ONGOING:
+        actions = state_actions(model.state)
+        if not actions:
+            break
+
+        model.make_action(rng.choice(actions))
+        made += 1
+
+    return made
+
+def random_search_game(model: GameModel, rng: random.Random, max_actions: int) -> int:
+    """random_game through legal_action_codes and push, without building GameStates (as searches and self-play do)"""
+    made = 0
+
+    while made < max_actions:
+        codes = sorted(model.legal_action_codes())
+        if not codes:
+            break
+
+        model.push(decode_action(rng.choice(codes)))
+        made += 1
+
+    return made
+
+def late_game_model(min_captures: int, seed: int) -> GameModel:
+    """Seeded game that prefers captures, stopped once min_captures pieces are in hand"""
+    for attempt in range(100):
+        model = GameModel.default()
+        rng = random.Random(seed + attempt)
+
+        while model.state.game_status == GameStatus.ONGOING and len(model.state.captured_pieces) < min_captures:
+            actions = state_actions(model.state)
+            if not actions:
+                break
+
+            occupied = {piece.location for piece in model.state.live_pieces}
+            captures = [action for action in actions if action.action_type == ActionType.MOVE and action.target_location in occupied]
+            model.make_action(rng.choice(captures or actions))
+
+        if model.state.game_status == GameStatus.ONGOING and len(model.state.captured_pieces) >= min_captures:
+            return model
+
+    raise RuntimeError(f"no ongoing position with {min_captures} captures found")
+
+def finished_game_endings(count: int, lead: int, seed: int, max_actions: int = 5000) -> list[tuple[GameModel, list[int]]]:
+    """
+    Positions lead actions before the end of seeded random games that finished (by immobilizing a Latias and Latios),
+    with the action codes that end them; random games from the start rarely finish within a short cross-check
+    """
+    endings: list[tuple[GameModel, list[int]]] = []
+    game = 0
+
+    while len(endings) < count:
+        model = GameModel.default(BitBoard)
+        rng = random.Random(seed + game)
+        codes: list[int] = []
+        game += 1
+
+        while len(codes) < max_actions and (legal := sorted(model.legal_action_codes())):
+            codes.append(rng.choice(legal))
+            model.push(decode_action(codes[-1]))
+
+        if model.game_status == GameStatus.ONGOING:
+            continue
+
+        start = GameModel.default()
+        split = max(0, len(codes) - lead)
+        for code in codes[:split]:
+            start.push(decode_action(code))
+        endings.append((start, codes[split:]))
+
+    return endings
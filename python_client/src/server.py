@@ -0,0 +1,345 @@
+"""
+Authoritative game server hosting many rooms in one asyncio process, each with its own GameModel;
+A drop-in replacement for project-server/main.go that validates every action instead of relaying it.
+Clients connect to ws://host:port/<room id> (ws://host:port/ joins room 'lobby') and speak the project server's text protocol:
+the server greets with "<seat> " (1 and 2 play, 0 spectates) and broadcasts every accepted action to the room as "<seat> <payload>".
+Payloads are compact wire_codec text; a batch is applied atomically. An illegal payload is answered to its sender only,
+as "<seat> !<reason>", so every request gets exactly one reply. Late joiners first receive the room's history from seat 0.
+Spectators joining ws://host:port/<room id>?diffs instead receive a state_diff snapshot of the position,
+then one state_diff payload per accepted batch, so they can follow the game without a rules engine.
+ws://host:port/_stats replies with server statistics as JSON, e.g. for loadgen.py.
+With --workers N, rooms are sharded over N worker processes instead (see sharded_server.py).
+`poetry run python src/server.py --port 15000`
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import signal
+import time
+from collections.abc import Coroutine, Hashable
+from dataclasses import dataclass, asdict
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from websockets.asyncio.server import ServerConnection, broadcast, serve
+from websockets.exceptions import ConnectionClosed
+
+from project_types import GameStatus, PlayerNumber, PlayerAction
+from model import GameModel, GameBoard
+from bitboard import BOARD_ENGINES
+import wire_codec
+import state_diff
+
+DEFAULT_ROOM = 'lobby'
+STATS_PATH = '/_stats'
+DIFFS_QUERY = 'diffs'
+REJECTION_PREFIX = '!'
+SEAT_PLAYERS: dict[int, PlayerNumber] = {1: PlayerNumber.ONE, 2: PlayerNumber.TWO}
+SPECTATOR_SEAT = 0
+DIFF_SPECTATOR_SEAT = -1
+"""Spectator sent state diffs instead of actions; greeted as SPECTATOR_SEAT"""
+
+Client = Hashable
+"""Whatever identifies a client to the transport (a connection, or a connection id in a worker process)"""
+Delivery = tuple[list[Client], str]
+"""Text to send to each of the clients"""
+
+
+def room_id_of(path: str) -> str:
+    return urlsplit(path).path.strip('/') or DEFAULT_ROOM
+
+def wants_diffs(path: str) -> bool:
+    return DIFFS_QUERY in parse_qs(urlsplit(path).query, keep_blank_values=True)
+
+def payload_text(payload: str | bytes) -> str:
+    """Binary frames are decoded leniently, so invalid UTF-8 is rejected as a malformed payload rather than dropping the connection"""
+    return payload if isinstance(payload, str) else payload.decode(errors='replace')
+
+def is_rejection(text: str) -> bool:
+    """Whether a message sent by the server is a rejection rather than an accepted payload"""
+    return text.partition(' ')[2].startswith(REJECTION_PREFIX)
+
+
+class Room:
+    def __init__(self, room_id: str, board_type: type[GameBoard]):
+        self.room_id = room_id
+        self.model = GameModel.default(board_type)
+        self.seats: dict[int, Client] = {}
+        self.spectators: set[Client] = set()
+        self.diff_spectators: set[Client] = set()
+        self.position = state_diff.EMPTY_POSITION
+        """Compact position diff spectators were last sent; kept current only while there are any"""
+
+    @property
+    def clients(self) -> list[Client]:
+        """Clients sent accepted actions"""
+        return [*self.seats.values(), *self.spectators]
+
+    @property
+    def members(self) -> list[Client]:
+        """Every client in the room"""
+        return [*self.clients, *self.diff_spectators]
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.seats and not self.spectators and not self.diff_spectators
+
+    def join(self, client: Client, seat: int | None = None) -> int:
+        """First free seat, or SPECTATOR_SEAT if both are taken; seat is given for diff spectators and when restoring a room"""
+        if seat is None:
+            seat = next((seat for seat in SEAT_PLAYERS if seat not in self.seats), SPECTATOR_SEAT)
+
+        if seat == DIFF_SPECTATOR_SEAT:
+            if not self.diff_spectators:
+                self.position = self.model.to_compact()
+            self.diff_spectators.add(client)
+        elif seat == SPECTATOR_SEAT:
+            self.spectators.add(client)
+        else:
+            self.seats[seat] = client
+
+        return seat
+
+    def leave(self, seat: int, client: Client):
+        """A left seat is free for the next (or a reconnecting) client"""
+        if seat == DIFF_SPECTATOR_SEAT:
+            self.diff_spectators.discard(client)
+        elif seat == SPECTATOR_SEAT:
+            self.spectators.discard(client)
+        elif self.seats.get(seat) == client:
+            del self.seats[seat]
+
+    def next_diff(self) -> str:
+        """Payload for diff spectators after a change to the position"""
+        position = self.model.to_compact()
+        changes, self.position = state_diff.diff(self.position, position), position
+
+        return state_diff.encode_text(changes)
+
+    def apply(self, seat: int, actions: list[PlayerAction]) -> str | None:
+        """Make all actions, or none if any is illegal; returns the reason for rejecting them"""
+        model = self.model
+        player = SEAT_PLAYERS.get(seat)
+
+        if player is None:
+            return "spectators cannot act"
+
+        for made, action in enumerate(actions):
+            reason = None
+
+            if model.game_status != GameStatus.ONGOING:
+                reason = "game over"
+            elif action.player != player:
+                reason = "not your piece"
+            elif model.active_player != player:
+                reason = "not your turn"
+            elif not model.is_legal_action(action):
+                reason = "illegal action"
+
+            if reason is not None:
+                for _ in range(made):
+                    model.pop()
+                return reason
+
+            # The server never reads GameState, so push instead of make_action (which also rebuilds it)
+            model.push(action)
+
+        return None
+
+
+@dataclass
+class ServerStats:
+    rooms: int = 0
+    connections: int = 0
+    accepted: int = 0
+    rejected: int = 0
+    games_finished: int = 0
+    cpu_seconds: float = 0.0
+    uptime: float = 0.0
+
+
+class RoomHost:
+    """Rooms and the protocol, independent of the transport: every call returns the deliveries to make"""
+    def __init__(self, board_type: type[GameBoard]):
+        self._board_type = board_type
+        self.rooms: dict[str, Room] = {}
+        self._clients: dict[Client, tuple[Room, int]] = {}
+        self._stats = ServerStats()
+        self._started = time.perf_counter()
+
+    @property
+    def counters(self) -> ServerStats:
+        """Live counters of actions and games; stats() also fills in rooms, connections and times"""
+        return self._stats
+
+    def stats(self) -> ServerStats:
+        stats = self._stats
+        stats.rooms = len(self.rooms)
+        stats.connections = len(self._clients)
+        stats.cpu_seconds = time.process_time()
+        stats.uptime = time.perf_counter() - self._started
+
+        return stats
+
+    def join(self, room_id: str, client: Client, diffs: bool = False) -> tuple[int, list[Delivery]]:
+        """
+        Seat a client; it is greeted with its seat, then sent the room's history,
+        or with diffs, as a spectator sent a snapshot of the position (a diff from state_diff.EMPTY_POSITION)
+        """
+        room = self.rooms.get(room_id)
+        if room is None:
+            room = self.rooms[room_id] = Room(room_id, self._board_type)
+
+        seat = room.join(client, DIFF_SPECTATOR_SEAT if diffs else None)
+        self._clients[client] = (room, seat)
+
+        if diffs:
+            snapshot = state_diff.diff(state_diff.EMPTY_POSITION, room.position)
+            return seat, [([client], f"{SPECTATOR_SEAT} "), ([client], f"{SPECTATOR_SEAT} {state_diff.encode_text(snapshot)}")]
+
+        history = room.model.history
+        return seat, [([client], f"{seat} ")] + [
+            ([client], f"{SPECTATOR_SEAT} {wire_codec.encode_text(history[start:start + wire_codec.MAX_TEXT_BATCH])}")
+            for start in range(0, len(history), wire_codec.MAX_TEXT_BATCH)
+        ]
+
+    def leave(self, client: Client):
+        """Empty rooms are closed"""
+        room, seat = self._clients.pop(client)
+        room.leave(seat, client)
+
+        if room.is_empty and self.rooms.get(room.room_id) is room:
+            del self.rooms[room.room_id]
+
+    def message(self, client: Client, payload: str) -> list[Delivery]:
+        """Validate and apply a payload: broadcast it (and its diff) to the room, or reject it to its sender"""
+        room, seat = self._clients[client]
+
+        try:
+            actions = wire_codec.decode_text(payload)
+        except wire_codec.WireError as error:
+            reason: str | None = f"malformed payload: {error}"
+        else:
+            was_ongoing = room.model.game_status == GameStatus.ONGOING
+            reason = room.apply(seat, actions) if actions else "empty batch"
+
+            if reason is None and was_ongoing and room.model.game_status != GameStatus.ONGOING:
+                self._stats.games_finished += 1
+
+        if reason is not None:
+            self._stats.rejected += 1
+            return [([client], f"{seat} {REJECTION_PREFIX}{reason}")]
+
+        self._stats.accepted += len(actions)
+        deliveries = [(room.clients, f"{seat} {payload}")]
+
+        if room.diff_spectators:
+            deliveries.append((list(room.diff_spectators), f"{seat} {room.next_diff()}"))
+
+        return deliveries
+
+    def drop(self, room_id: str) -> Room | None:
+        """Remove a room and its clients without notifying them, e.g. once moved elsewhere"""
+        room = self.rooms.pop(room_id, None)
+
+        if room is not None:
+            for client in room.members:
+                del self._clients[client]
+
+        return room
+
+    def restore(self, room_id: str, seats: dict[Client, int], log: list[str]):
+        """Rebuild a room elsewhere by replaying its accepted payloads (oldest first), with its clients in their seats"""
+        room = self.rooms[room_id] = Room(room_id, self._board_type)
+
+        for client, seat in seats.items():
+            room.join(client, seat)
+            self._clients[client] = (room, seat)
+
+        for payload in log:
+            for action in wire_codec.decode_text(payload):
+                room.model.push(action)
+
+        if room.diff_spectators:
+            room.position = room.model.to_compact()
+
+
+class GameServer:
+    """Single process server: RoomHost with websocket connections as clients"""
+    def __init__(self, board_type: type[GameBoard] = BOARD_ENGINES['board']):
+        self._host = RoomHost(board_type)
+
+    @property
+    def rooms(self) -> dict[str, Room]:
+        return self._host.rooms
+
+    async def handle(self, connection: ServerConnection):
+        path = connection.request.path if connection.request is not None else '/'
+
+        if path == STATS_PATH:
+            await connection.send(json.dumps(asdict(self._host.stats())))
+            return
+
+        try:
+            _, deliveries = self._host.join(room_id_of(path), connection, wants_diffs(path))
+            for _, text in deliveries:
+                await connection.send(text)
+
+            async for payload in connection:
+                for clients, text in self._host.message(connection, payload_text(payload)):
+                    broadcast(clients, text)  # pyright: ignore[reportArgumentType]
+
+        except ConnectionClosed:
+            pass
+
+        finally:
+            self._host.leave(connection)
+
+
+async def run_server(host: str, port: int, board_type: type[GameBoard], ready: asyncio.Event | None = None):
+    game_server = GameServer(board_type)
+
+    async with serve(game_server.handle, host, port, ping_interval=None, max_size=wire_codec.TEXT_SIZE_LIMIT) as server:
+        if ready is not None:
+            ready.set()
+
+        await server.serve_forever()
+
+
+async def until_terminated(serving: Coroutine[Any, Any, None]):
+    """Serve until cancelled by SIGTERM (e.g. from loadgen.py) as well as Ctrl+C, so servers clean up in their finally blocks"""
+    task = asyncio.ensure_future(serving)
+
+    # Not available on Windows, where only Ctrl+C stops the server
+    with contextlib.suppress(NotImplementedError):
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=15000)
+    parser.add_argument('--engine', choices=BOARD_ENGINES, default='board')
+    parser.add_argument('--workers', type=int, default=0, help='shard rooms over this many worker processes (0: serve them in this process)')
+    parser.add_argument('--admin', action='store_true', help='serve /_restart/<worker> on a non-loopback host too (it is unauthenticated)')
+    args = parser.parse_args()
+
+    print(f"Serving rooms on ws://{args.host}:{args.port}/<room id> ({args.engine} engine"
+          f"{f', {args.workers} workers' if args.workers else ''})", flush=True)
+
+    try:
+        if args.workers:
+            from sharded_server import run_sharded_server
+            asyncio.run(until_terminated(run_sharded_server(args.host, args.port, args.engine, args.workers, admin=args.admin)))
+        else:
+            asyncio.run(until_terminated(run_server(args.host, args.port, BOARD_ENGINES[args.engine])))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,518 @@
+"""
+Sharded variant of server.py: a front process accepts the websocket connections and routes every room to one of N worker
+processes by consistent hashing of its id (HashRing), so rooms spread over cores while clients see the same protocol.
+The front and its workers exchange length-prefixed pickled frames over a Unix socket; workers run server.RoomHost,
+with the front's connection ids as clients. The front keeps each room's accepted payloads, so a room can be rebuilt anywhere:
+when a worker exits, its rooms are replayed onto the workers the ring assigns them next, and moved back once it runs again.
+ws://host:port/_restart/<worker> restarts a worker this way while its rooms keep playing (clients only see a short pause);
+It is unauthenticated, so it is only served when bound to a loopback address, or with --admin.
+`poetry run python src/server.py --port 15000 --workers 4`
+"""
+import asyncio
+import contextlib
+import hashlib
+import ipaddress
+import itertools
+import json
+import multiprocessing
+import os
+import pickle
+import resource
+import struct
+import tempfile
+import time
+from bisect import bisect
+from dataclasses import dataclass, field, asdict
+from multiprocessing.process import BaseProcess
+from typing import Any
+
+from websockets.asyncio.server import ServerConnection, broadcast, serve
+from websockets.exceptions import ConnectionClosed
+
+from bitboard import BOARD_ENGINES
+from server import STATS_PATH, RoomHost, ServerStats, room_id_of, wants_diffs, is_rejection, payload_text
+import wire_codec
+
+RESTART_PATH = '/_restart/'
+LOCAL_HOSTS = {'localhost'}
+RING_REPLICAS = 64
+"""Points per worker on the ring; more spread rooms more evenly"""
+WORKER_START_TIMEOUT_S = 30.0
+
+_FRAME_HEADER = struct.Struct('!I')
+
+Frame = tuple[Any, ...]
+
+
+class HashRing:
+    """Consistent hashing: removing a node only moves the keys it owned, and adding it back only moves those keys back"""
+    def __init__(self, nodes: list[int] | None = None, replicas: int = RING_REPLICAS):
+        self._replicas = replicas
+        self._points: list[int] = []
+        self._owners: list[int] = []
+
+        for node in nodes or []:
+            self.add(node)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest())
+
+    @property
+    def nodes(self) -> set[int]:
+        return set(self._owners)
+
+    def add(self, node: int):
+        ring = [*zip(self._points, self._owners), *((self._hash(f"{node}#{replica}"), node) for replica in range(self._replicas))]
+        ring.sort()
+        self._points = [point for point, _ in ring]
+        self._owners = [owner for _, owner in ring]
+
+    def remove(self, node: int):
+        ring = [(point, owner) for point, owner in zip(self._points, self._owners) if owner != node]
+        self._points = [point for point, _ in ring]
+        self._owners = [owner for _, owner in ring]
+
+    def lookup(self, key: str) -> int:
+        """Node owning the first point at or after the key's hash, wrapping around"""
+        if not self._points:
+            raise LookupError("No nodes on the ring")
+
+        return self._owners[bisect(self._points, self._hash(key)) % len(self._points)]
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Frame:
+    size, = _FRAME_HEADER.unpack(await reader.readexactly(_FRAME_HEADER.size))
+    return pickle.loads(await reader.readexactly(size))
+
+def write_frame(writer: asyncio.StreamWriter, frame: Frame):
+    data = pickle.dumps(frame, pickle.HIGHEST_PROTOCOL)
+    writer.write(_FRAME_HEADER.pack(len(data)) + data)
+
+
+def _worker_main(socket_path: str, index: int, engine: str):
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_run_worker(socket_path, index, engine))
+
+async def _run_worker(socket_path: str, index: int, engine: str):
+    """Apply the front's frames to a RoomHost, in order, until told to stop or the front goes away"""
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    host = RoomHost(BOARD_ENGINES[engine])
+    client_rooms: dict[int, str] = {}
+
+    write_frame(writer, ('hello', index))
+
+    while True:
+        try:
+            frame = await read_frame(reader)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            break
+
+        match frame:
+            case ('join', room_id, client, diffs):
+                seat, deliveries = host.join(room_id, client, diffs)
+                client_rooms[client] = room_id
+
+                write_frame(writer, ('seated', room_id, client, seat))
+                for clients, text in deliveries:
+                    write_frame(writer, ('send', clients, text))
+
+            # Clients that left while their room moved here may still have frames in flight
+            case ('message', client, payload) if client in client_rooms:
+                counters = host.counters
+                accepted, finished = counters.accepted, counters.games_finished
+
+                deliveries = host.message(client, payload)
+                if is_rejection(deliveries[0][1]):
+                    write_frame(writer, ('rejected',))
+                else:
+                    write_frame(writer, ('accepted', client_rooms[client], payload, counters.accepted - accepted, counters.games_finished - finished))
+
+                for clients, text in deliveries:
+                    write_frame(writer, ('send', clients, text))
+
+            case ('leave', client) if client in client_rooms:
+                del client_rooms[client]
+                host.leave(client)
+
+            case ('drop', room_id):
+                room = host.drop(room_id)
+                for client in room.members if room is not None else []:
+                    del client_rooms[client]
+
+                write_frame(writer, ('dropped', room_id))
+
+            case ('restore', room_id, seats, log):
+                host.restore(room_id, seats, log)
+                client_rooms.update(dict.fromkeys(seats, room_id))
+
+            case ('stats',):
+                write_frame(writer, ('stats', asdict(host.stats())))
+
+            case ('stop',):
+                break
+
+        await writer.drain()
+
+    writer.close()
+
+
+@dataclass
+class ShardedRoom:
+    worker: int
+    clients: dict[int, bool] = field(default_factory=dict[int, bool])
+    """Whether each client wants state diffs (see server.wants_diffs)"""
+    seats: dict[int, int] = field(default_factory=dict[int, int])
+    """Seat of each client, as reported by the worker"""
+    log: list[str] = field(default_factory=list[str])
+    """Accepted payloads, oldest first"""
+    held: list[Frame] | None = None
+    """Frames for the room while it moves between workers (None: not moving)"""
+
+
+class WorkerHandle:
+    def __init__(self, index: int, process: BaseProcess):
+        self.index = index
+        self.process = process
+        self.writer: asyncio.StreamWriter | None = None
+        self.stopping = False
+        self.exited = False
+        self.started = asyncio.get_running_loop().create_future()
+        self.drops: dict[str, asyncio.Future[None]] = {}
+        self.stats_requests: list[asyncio.Future[dict[str, Any]]] = []
+
+    def send(self, frame: Frame):
+        """Frames sent to an exited worker are lost"""
+        if self.writer is not None and not self.exited:
+            write_frame(self.writer, frame)
+
+    def request_drop(self, room_id: str) -> asyncio.Future[None]:
+        """Resolved once the worker handled every earlier frame of the room and forgot it"""
+        future = asyncio.get_running_loop().create_future()
+
+        if self.exited:
+            future.set_result(None)
+        else:
+            self.drops[room_id] = future
+            self.send(('drop', room_id))
+
+        return future
+
+    async def stats(self) -> ServerStats:
+        if self.writer is None or self.exited:
+            raise ConnectionError(f"worker {self.index} is not running")
+
+        future = asyncio.get_running_loop().create_future()
+        self.stats_requests.append(future)
+        self.send(('stats',))
+
+        return ServerStats(**await future)
+
+    def exit(self):
+        """Nothing more will be answered, so rooms being dropped are gone"""
+        self.exited = True
+
+        for future in self.drops.values():
+            future.set_result(None)
+        for request in self.stats_requests:
+            request.set_exception(ConnectionError(f"worker {self.index} exited"))
+
+        self.drops.clear()
+        self.stats_requests.clear()
+
+
+def is_loopback(host: str) -> bool:
+    if host in LOCAL_HOSTS:
+        return True
+
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class ShardedServer:
+    def __init__(self, engine: str, workers: int, socket_path: str, admin: bool = False):
+        """admin: serve RESTART_PATH"""
+        self._engine = engine
+        self._admin = admin
+        self._worker_count = workers
+        self._socket_path = socket_path
+        self._context = multiprocessing.get_context('spawn')
+
+        self._ring = HashRing()
+        self._workers: dict[int, WorkerHandle] = {}
+        self._rooms: dict[str, ShardedRoom] = {}
+        self._connections: dict[int, ServerConnection] = {}
+        self._client_ids = itertools.count()
+
+        self._membership = asyncio.Lock()
+        """Held while workers stop, start and hand over their rooms"""
+        self._counters = ServerStats()
+        """Actions and games, counted from the workers' answers so they survive worker restarts and crashes"""
+        self._started = time.perf_counter()
+        self._closing = False
+        self._recoveries: set[asyncio.Task[None]] = set()
+
+    async def start(self):
+        await asyncio.start_unix_server(self._accept_worker, self._socket_path)
+        await asyncio.gather(*(self._start_worker(index) for index in range(self._worker_count)))
+
+        for index in range(self._worker_count):
+            self._ring.add(index)
+
+    async def close(self):
+        self._closing = True
+
+        for worker in self._workers.values():
+            worker.stopping = True
+            worker.send(('stop',))
+
+        for worker in self._workers.values():
+            await asyncio.to_thread(worker.process.join, WORKER_START_TIMEOUT_S)
+
+    async def _start_worker(self, index: int):
+        process = self._context.Process(target=_worker_main, args=(self._socket_path, index, self._engine), name=f"room-worker-{index}", daemon=True)
+        worker = self._workers[index] = WorkerHandle(index, process)
+        process.start()
+
+        await asyncio.wait_for(worker.started, WORKER_START_TIMEOUT_S)
+
+    async def _accept_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        _, index = await read_frame(reader)
+        worker = self._workers[index]
+        worker.writer = writer
+        worker.started.set_result(None)
+
+        try:
+            while True:
+                self._handle_worker_frame(worker, await read_frame(reader))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+        worker.exit()
+        if not worker.stopping and not self._closing:
+            recovery = asyncio.create_task(self._recover(index))
+            self._recoveries.add(recovery)
+            recovery.add_done_callback(self._recoveries.discard)
+
+    def _handle_worker_frame(self, worker: WorkerHandle, frame: Frame):
+        match frame:
+            case ('send', clients, text):
+                self._deliver(clients, text)
+
+            case ('accepted', room_id, payload, actions, finished):
+                self._counters.accepted += actions
+                self._counters.games_finished += finished
+
+                room = self._rooms.get(room_id)
+                if room is not None:
+                    room.log.append(payload)
+
+            case ('rejected',):
+                self._counters.rejected += 1
+
+            case ('seated', room_id, client, seat):
+                room = self._rooms.get(room_id)
+                if room is not None and client in room.clients:
+                    room.seats[client] = seat
+
+            case ('dropped', room_id):
+                future = worker.drops.pop(room_id, None)
+                if future is not None:
+                    future.set_result(None)
+
+            case ('stats', stats):
+                worker.stats_requests.pop(0).set_result(stats)
+
+    def _deliver(self, clients: list[int], text: str):
+        broadcast([self._connections[client] for client in clients if client in self._connections], text)
+
+    def _to_room(self, room: ShardedRoom, frame: Frame):
+        if room.held is None and self._workers[room.worker].exited:
+            # Until _recover moves the room
+            room.held = []
+
+        if room.held is not None:
+            room.held.append(frame)
+        else:
+            self._workers[room.worker].send(frame)
+
+    async def handle(self, connection: ServerConnection):
+        path = connection.request.path if connection.request is not None else '/'
+
+        if path == STATS_PATH:
+            await connection.send(json.dumps(asdict(await self.stats())))
+            return
+
+        if path.startswith(RESTART_PATH):
+            await connection.send(json.dumps(await self._restart_request(path.removeprefix(RESTART_PATH))))
+            return
+
+        if not self._ring.nodes:
+            # The only worker is restarting
+            async with self._membership:
+                pass
+
+        client = next(self._client_ids)
+        room_id = room_id_of(path)
+        room = self._rooms.get(room_id)
+        if room is None:
+            room = self._rooms[room_id] = ShardedRoom(self._ring.lookup(room_id))
+
+        self._connections[client] = connection
+        room.clients[client] = wants_diffs(path)
+        self._to_room(room, ('join', room_id, client, room.clients[client]))
+
+        try:
+            async for payload in connection:
+                self._to_room(room, ('message', client, payload_text(payload)))
+
+        except ConnectionClosed:
+            pass
+
+        finally:
+            del self._connections[client]
+            del room.clients[client]
+            room.seats.pop(client, None)
+            self._to_room(room, ('leave', client))
+
+            if not room.clients and room.held is None and self._rooms.get(room_id) is room:
+                del self._rooms[room_id]
+
+    async def stats(self) -> ServerStats:
+        """Counters of the front; CPU time of the front, its running workers and the worker processes that exited"""
+        stats = ServerStats(**asdict(self._counters))
+
+        for worker_stats in await asyncio.gather(*(worker.stats() for worker in self._workers.values()), return_exceptions=True):
+            if isinstance(worker_stats, ServerStats):
+                stats.cpu_seconds += worker_stats.cpu_seconds
+
+        exited = resource.getrusage(resource.RUSAGE_CHILDREN)
+        stats.cpu_seconds += time.process_time() + exited.ru_utime + exited.ru_stime
+        stats.rooms = len(self._rooms)
+        stats.connections = len(self._connections)
+        stats.uptime = time.perf_counter() - self._started
+
+        return stats
+
+    async def _detach(self, room_ids: list[str], graceful: bool) -> list[tuple[str, ShardedRoom]]:
+        """
+        Hold frames for rooms leaving their worker. Gracefully, the worker first handles everything already sent to it
+        for them, so their logs are complete; otherwise (the worker died) whatever it had not answered is lost.
+        """
+        detached: list[tuple[str, ShardedRoom]] = []
+        drops: list[asyncio.Future[None]] = []
+
+        for room_id in room_ids:
+            room = self._rooms.get(room_id)
+            if room is None:
+                continue
+
+            if room.held is None:
+                room.held = []
+            detached.append((room_id, room))
+
+            if graceful:
+                drops.append(self._workers[room.worker].request_drop(room_id))
+
+        await asyncio.gather(*drops)
+        return detached
+
+    def _attach(self, detached: list[tuple[str, ShardedRoom]], rejoin: bool):
+        """Rebuild detached rooms on the workers the ring assigns them now, then send the frames held for them"""
+        for room_id, room in detached:
+            held, room.held = room.held or [], None
+            room.worker = self._ring.lookup(room_id)
+
+            if not room.clients:
+                if self._rooms.get(room_id) is room:
+                    del self._rooms[room_id]
+                continue
+
+            worker = self._workers[room.worker]
+            worker.send(('restore', room_id, dict(room.seats), room.log))
+
+            if rejoin:
+                # Joins the dead worker never answered
+                joining = {frame[2] for frame in held if frame[0] == 'join'}
+                for client in room.clients.keys() - room.seats.keys() - joining:
+                    worker.send(('join', room_id, client, room.clients[client]))
+
+            for frame in held:
+                worker.send(frame)
+
+    async def _migrate(self, room_ids: list[str]) -> int:
+        """Gracefully move the rooms whose worker on the ring changed"""
+        detached = await self._detach([
+            room_id for room_id in room_ids
+            if room_id in self._rooms and self._rooms[room_id].worker != self._ring.lookup(room_id)
+        ], graceful=True)
+
+        self._attach(detached, rejoin=False)
+        return len(detached)
+
+    async def _replace_worker(self, index: int, graceful: bool) -> tuple[int, int]:
+        """
+        Hand a worker's rooms to the others (or hold them, if it is the only one), start a new process for it,
+        and take its rooms back; returns how many rooms moved out and back
+        """
+        self._ring.remove(index)
+        own = [room_id for room_id, room in self._rooms.items() if room.worker == index]
+
+        if self._ring.nodes:
+            self._attach(await self._detach(own, graceful), rejoin=not graceful)
+            parked = []
+        else:
+            parked = await self._detach(own, graceful)
+
+        worker = self._workers[index]
+        if graceful:
+            worker.stopping = True
+            worker.send(('stop',))
+
+        await asyncio.to_thread(worker.process.join, WORKER_START_TIMEOUT_S)
+        await self._start_worker(index)
+        self._ring.add(index)
+
+        self._attach(parked, rejoin=not graceful)
+        return len(own), len(parked) + await self._migrate(list(self._rooms))
+
+    async def restart_worker(self, index: int) -> dict[str, Any]:
+        """Replace a worker's process while its rooms keep playing"""
+        async with self._membership:
+            start = time.perf_counter()
+            moved_out, moved_back = await self._replace_worker(index, graceful=True)
+
+            return {'worker': index, 'moved_out': moved_out, 'moved_back': moved_back, 'seconds': time.perf_counter() - start}
+
+    async def _restart_request(self, worker: str) -> dict[str, Any]:
+        if not self._admin:
+            return {'error': "restarts are disabled (serve on localhost or pass --admin)"}
+
+        if not worker.isdecimal() or int(worker) not in self._workers:
+            return {'error': f"no worker {worker!r} (workers are 0 to {self._worker_count - 1})"}
+
+        return await self.restart_worker(int(worker))
+
+    async def _recover(self, index: int):
+        """A worker exited unexpectedly: rebuild its rooms from their logs, and restart it"""
+        async with self._membership:
+            await self._replace_worker(index, graceful=False)
+
+
+async def run_sharded_server(host: str, port: int, engine: str, workers: int, ready: asyncio.Event | None = None, admin: bool = False):
+    """Restarts are served with admin, or on a loopback host"""
+    with tempfile.TemporaryDirectory(prefix='shogimon-') as directory:
+        sharded_server = ShardedServer(engine, workers, os.path.join(directory, 'workers.sock'), admin or is_loopback(host))
+        await sharded_server.start()
+
+        try:
+            async with serve(sharded_server.handle, host, port, ping_interval=None, max_size=wire_codec.TEXT_SIZE_LIMIT) as server:
+                if ready is not None:
+                    ready.set()
+
+                await server.serve_forever()
+
+        finally:
+            await sharded_server.close()
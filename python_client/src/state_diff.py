@@ -0,0 +1,274 @@
+"""
+Minimal change set between two positions (pieces moved, added and removed, hand counts, turn fields),
+computed on GameModel.to_compact positions (or compact_state of a GameState), so it costs a byte comparison per tile;
+The view applies it to the tiles that changed instead of resetting all of them, and server.py streams it to spectators.
+Encoded, a diff is a header byte (bits 4-7: version, bits 0-2: which turn fields follow), one count byte per list,
+then 1 byte per removed piece, 2 per moved or added piece and 2 per hand change, then the changed turn fields.
+"""
+import base64
+from dataclasses import dataclass
+
+from project_types import GameState, GameStatus, Location, PieceKind, PlayerNumber, BOARD_COLS
+from action_codes import KINDS, KIND_INDEX
+from model import COMPACT_SIZE, COMPACT_PLAYER_TWO, COMPACT_STATUSES
+
+DIFF_VERSION = 1
+TILE_COUNT = COMPACT_SIZE - 2 * len(KINDS) - 3
+HAND_COUNT = 2 * len(KINDS)
+EMPTY_POSITION = bytes(COMPACT_SIZE)
+"""Diffing from it gives a full snapshot, e.g. for a spectator joining mid-game"""
+
+_ACTIVE_PLAYER_FLAG = 0x01
+_ACTION_COUNT_FLAG = 0x02
+_GAME_STATUS_FLAG = 0x04
+
+TEXT_PREFIX = '^'
+"""Never starts a wire_codec payload ('~') or a rejection ('!')"""
+
+
+class DiffError(ValueError):
+    """Malformed or unsupported encoded diff"""
+
+
+@dataclass(frozen=True)
+class StateDiff:
+    removed: tuple[Location, ...] = ()
+    """Tiles emptied, other than by a piece moving away"""
+    moved: tuple[tuple[Location, Location], ...] = ()
+    """Pieces moved from source to target, replacing whatever was on the target"""
+    added: tuple[tuple[Location, PieceKind, PlayerNumber], ...] = ()
+    """Pieces appearing on a tile (e.g. drops)"""
+    hands: tuple[tuple[PlayerNumber, PieceKind, int], ...] = ()
+    """Change of the captured count per player and kind"""
+    active_player: PlayerNumber | None = None
+    action_count: int | None = None
+    game_status: GameStatus | None = None
+    """Turn fields, None if unchanged"""
+
+    @property
+    def vacated(self) -> list[Location]:
+        """Tiles now empty"""
+        return [*self.removed, *(source for source, _ in self.moved)]
+
+    @property
+    def occupied(self) -> list[Location]:
+        """Tiles with a different occupier"""
+        return [*(target for _, target in self.moved), *(location for location, _, _ in self.added)]
+
+    @property
+    def is_empty(self) -> bool:
+        return self == _NO_CHANGES
+
+
+_NO_CHANGES = StateDiff()
+
+
+def _location(square: int) -> Location:
+    return Location(square // BOARD_COLS, square % BOARD_COLS)
+
+def _square(location: Location) -> int:
+    return location.row * BOARD_COLS + location.col
+
+def _tile(kind: PieceKind, owner: PlayerNumber) -> int:
+    return 1 + KIND_INDEX[kind] | (COMPACT_PLAYER_TWO if owner == PlayerNumber.TWO else 0)
+
+def _piece(tile: int) -> tuple[PieceKind, PlayerNumber]:
+    return KINDS[(tile & ~COMPACT_PLAYER_TWO) - 1], PlayerNumber.TWO if tile & COMPACT_PLAYER_TWO else PlayerNumber.ONE
+
+def _hand(index: int) -> tuple[PlayerNumber, PieceKind]:
+    return PlayerNumber.TWO if index >= len(KINDS) else PlayerNumber.ONE, KINDS[index % len(KINDS)]
+
+
+def compact_state(state: GameState) -> bytes:
+    """GameState in the layout of GameModel.to_compact"""
+    data = bytearray(COMPACT_SIZE)
+
+    for piece in state.live_pieces:
+        if piece.location is not None:
+            data[_square(piece.location)] = _tile(piece.kind, piece.owner)
+
+    for piece in state.captured_pieces:
+        data[TILE_COUNT + (piece.owner == PlayerNumber.TWO) * len(KINDS) + KIND_INDEX[piece.kind]] += 1
+
+    data[-3] = state.active_player == PlayerNumber.TWO
+    data[-2] = state.action_count
+    data[-1] = COMPACT_STATUSES.index(state.game_status)
+
+    return bytes(data)
+
+
+def diff(before: bytes, after: bytes) -> StateDiff:
+    """Changes turning compact position before into after; a piece leaving a tile and the same one arriving elsewhere is a move"""
+    if before == after:
+        return _NO_CHANGES
+
+    vacated: list[int] = []
+    arrived: list[int] = []
+
+    for square in range(TILE_COUNT):
+        old, new = before[square], after[square]
+
+        if old != new:
+            if new:
+                arrived.append(square)
+            else:
+                vacated.append(square)
+
+    moved: list[tuple[Location, Location]] = []
+    added: list[tuple[Location, PieceKind, PlayerNumber]] = []
+
+    for target in arrived:
+        source = next((square for square in vacated if before[square] == after[target]), None)
+
+        if source is not None:
+            vacated.remove(source)
+            moved.append((_location(source), _location(target)))
+        else:
+            added.append((_location(target), *_piece(after[target])))
+
+    hands = tuple(
+        (*_hand(index), after[TILE_COUNT + index] - before[TILE_COUNT + index])
+        for index in range(HAND_COUNT)
+        if before[TILE_COUNT + index] != after[TILE_COUNT + index]
+    )
+
+    return StateDiff(
+        removed=tuple(_location(square) for square in vacated),
+        moved=tuple(moved),
+        added=tuple(added),
+        hands=hands,
+        active_player=(PlayerNumber.TWO if after[-3] else PlayerNumber.ONE) if before[-3] != after[-3] else None,
+        action_count=after[-2] if before[-2] != after[-2] else None,
+        game_status=COMPACT_STATUSES[after[-1]] if before[-1] != after[-1] else None,
+    )
+
+
+def apply(position: bytes, changes: StateDiff) -> bytes:
+    """Compact position with the changes made; apply(before, diff(before, after)) == after"""
+    data = bytearray(position)
+
+    for location in changes.removed:
+        data[_square(location)] = 0
+
+    # Sources are read before any target is written, as a move may end where another started
+    moving = [(data[_square(source)], _square(target)) for source, target in changes.moved]
+    for source, _ in changes.moved:
+        data[_square(source)] = 0
+    for tile, target in moving:
+        data[target] = tile
+
+    for location, kind, owner in changes.added:
+        data[_square(location)] = _tile(kind, owner)
+
+    for owner, kind, delta in changes.hands:
+        data[TILE_COUNT + (owner == PlayerNumber.TWO) * len(KINDS) + KIND_INDEX[kind]] += delta
+
+    if changes.active_player is not None:
+        data[-3] = changes.active_player == PlayerNumber.TWO
+    if changes.action_count is not None:
+        data[-2] = changes.action_count
+    if changes.game_status is not None:
+        data[-1] = COMPACT_STATUSES.index(changes.game_status)
+
+    return bytes(data)
+
+
+def encode(changes: StateDiff) -> bytes:
+    flags = (changes.active_player is not None) * _ACTIVE_PLAYER_FLAG \
+        | (changes.action_count is not None) * _ACTION_COUNT_FLAG \
+        | (changes.game_status is not None) * _GAME_STATUS_FLAG
+
+    data = bytearray((DIFF_VERSION << 4 | flags, len(changes.removed), len(changes.moved), len(changes.added), len(changes.hands)))
+
+    data += bytes(_square(location) for location in changes.removed)
+    for source, target in changes.moved:
+        data += bytes((_square(source), _square(target)))
+    for location, kind, owner in changes.added:
+        data += bytes((_square(location), _tile(kind, owner)))
+    for owner, kind, delta in changes.hands:
+        data += bytes(((owner == PlayerNumber.TWO) * len(KINDS) + KIND_INDEX[kind], delta & 0xFF))
+
+    if changes.active_player is not None:
+        data.append(changes.active_player == PlayerNumber.TWO)
+    if changes.action_count is not None:
+        data.append(changes.action_count)
+    if changes.game_status is not None:
+        data.append(COMPACT_STATUSES.index(changes.game_status))
+
+    return bytes(data)
+
+
+def _checked_location(square: int) -> Location:
+    if square >= TILE_COUNT:
+        raise DiffError(f"Invalid tile {square}")
+
+    return _location(square)
+
+def _checked_piece(tile: int) -> tuple[PieceKind, PlayerNumber]:
+    if not 1 <= tile & ~COMPACT_PLAYER_TWO <= len(KINDS) or tile & ~(COMPACT_PLAYER_TWO | 0x07):
+        raise DiffError(f"Invalid piece {tile:02x}")
+
+    return _piece(tile)
+
+def _checked_hand(index: int) -> tuple[PlayerNumber, PieceKind]:
+    if index >= HAND_COUNT:
+        raise DiffError(f"Invalid hand {index}")
+
+    return _hand(index)
+
+def decode(data: bytes) -> StateDiff:
+    if len(data) < 5:
+        raise DiffError(f"Diff of {len(data)} bytes is shorter than its header")
+
+    version, flags = data[0] >> 4, data[0] & 0x0F
+    if version != DIFF_VERSION:
+        raise DiffError(f"Unsupported diff version {version}")
+
+    removed, moved, added, hands = data[1:5]
+    pairs = 5 + removed
+    fields = pairs + 2 * (moved + added + hands)
+
+    if len(data) != fields + bin(flags & (_ACTIVE_PLAYER_FLAG | _ACTION_COUNT_FLAG | _GAME_STATUS_FLAG)).count('1'):
+        raise DiffError(f"Diff length {len(data)} does not match its counts")
+
+    entries = [(data[offset], data[offset + 1]) for offset in range(pairs, fields, 2)]
+    turn = iter(data[fields:])
+
+    active_player = action_count = game_status = None
+    if flags & _ACTIVE_PLAYER_FLAG:
+        active_player = PlayerNumber.TWO if next(turn) else PlayerNumber.ONE
+    if flags & _ACTION_COUNT_FLAG:
+        action_count = next(turn)
+    if flags & _GAME_STATUS_FLAG:
+        status = next(turn)
+        if status >= len(COMPACT_STATUSES):
+            raise DiffError(f"Invalid game status {status}")
+        game_status = COMPACT_STATUSES[status]
+
+    return StateDiff(
+        removed=tuple(_checked_location(square) for square in data[5:pairs]),
+        moved=tuple((_checked_location(source), _checked_location(target)) for source, target in entries[:moved]),
+        added=tuple((_checked_location(square), *_checked_piece(tile)) for square, tile in entries[moved:moved + added]),
+        hands=tuple((*_checked_hand(index), delta - 0x100 if delta & 0x80 else delta) for index, delta in entries[moved + added:]),
+        active_player=active_player,
+        action_count=action_count,
+        game_status=game_status,
+    )
+
+
+def encode_text(changes: StateDiff) -> str:
+    """Printable payload for websocket text frames, like wire_codec.encode_text"""
+    return TEXT_PREFIX + base64.b64encode(encode(changes)).rstrip(b'=').decode('ascii')
+
+def decode_text(payload: str) -> StateDiff:
+    if not payload.startswith(TEXT_PREFIX):
+        raise DiffError("Not a diff payload")
+
+    encoded = payload[len(TEXT_PREFIX):]
+
+    try:
+        data = base64.b64decode(encoded + '=' * (-len(encoded) % 4), validate=True)
+    except ValueError as error:
+        raise DiffError(f"Invalid base64: {error}") from error
+
+    return decode(data)
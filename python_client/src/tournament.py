@@ -0,0 +1,240 @@
+"""
+Headless self-play tournament: every pair of bots plays a number of games (alternating sides) in a process pool.
+Results are streamed to a CSV or JSONL file as games finish, followed by win rates and Elo ratings.
+Drives GameModel directly and never imports pygame, e.g.
+`poetry run python src/tournament.py --players random alphabeta:100 mcts:100 --games 20 --output results.jsonl`.
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
+from dataclasses import dataclass, asdict, fields
+from itertools import combinations
+from typing import IO, Callable
+
+from project_types import GameStatus, ActionType, PlayerNumber
+from model import GameModel
+from ai import AlphaBetaSearch, SearchEngine, SearchResult
+from action_codes import decode_action
+from mcts import MCTSSearch, CapturePlayout
+from transposition import TranspositionTable
+
+DEFAULT_BUDGET_MS = 100
+ELO_K = 16
+ELO_START = 1500
+
+
+class RandomSearch:
+    """Baseline SearchEngine: a uniformly random legal action"""
+    def __init__(self, seed: int | None = None):
+        self._rng = random.Random(seed)
+
+    def search(self, model: GameModel, budget_ms: int) -> SearchResult:
+        codes = list(model.legal_action_codes())
+        action = decode_action(self._rng.choice(codes)) if codes else None
+
+        return SearchResult(action, 0, 0, len(codes), 0.0)
+
+BOTS: dict[str, Callable[[int], SearchEngine]] = {
+    'random': lambda seed: RandomSearch(seed),
+    'alphabeta': lambda seed: AlphaBetaSearch(table=TranspositionTable(4)),
+    'mcts': lambda seed: MCTSSearch(seed=seed),
+    'mcts-capture': lambda seed: MCTSSearch(policy=CapturePlayout(), seed=seed),
+}
+"""Bot kinds; a player spec is kind[:budget_ms], e.g. alphabeta:200"""
+
+
+def parse_player(spec: str) -> tuple[str, int]:
+    kind, _, budget = spec.partition(':')
+    if kind not in BOTS:
+        raise argparse.ArgumentTypeError(f"Unknown bot {kind!r}; choose from {', '.join(BOTS)}")
+
+    return kind, int(budget) if budget else DEFAULT_BUDGET_MS
+
+
+@dataclass(frozen=True)
+class GameRecord:
+    game: int
+    player_one: str
+    player_two: str
+    winner: str
+    """'one', 'two' or 'draw' (action limit reached, or no legal action)"""
+    actions: int
+    captures_one: int
+    captures_two: int
+    ms_per_action_one: float
+    ms_per_action_two: float
+
+
+def play_game(game: int, player_one: str, player_two: str, max_actions: int, seed: int) -> GameRecord:
+    """One game between two player specs; run in worker processes"""
+    model = GameModel.default()
+    engines: dict[PlayerNumber, tuple[SearchEngine, int]] = {}
+    for player, spec in ((PlayerNumber.ONE, player_one), (PlayerNumber.TWO, player_two)):
+        kind, budget_ms = parse_player(spec)
+        engines[player] = (BOTS[kind](seed * 2 + (player == PlayerNumber.TWO)), budget_ms)
+
+    captures = {player: 0 for player in PlayerNumber}
+    seconds = {player: 0.0 for player in PlayerNumber}
+    actions = {player: 0 for player in PlayerNumber}
+
+    while model.game_status == GameStatus.ONGOING and len(model.history) < max_actions:
+        player = model.active_player
+        engine, budget_ms = engines[player]
+
+        start = time.perf_counter()
+        action = engine.search(model, budget_ms).action
+        seconds[player] += time.perf_counter() - start
+
+        if action is None:
+            break
+
+        if action.action_type == ActionType.MOVE and model.board.get_live_piece(action.target_location) is not None:
+            captures[player] += 1
+
+        model.push(action)
+        actions[player] += 1
+
+    match model.game_status:
+        case GameStatus.PLAYER_WIN:
+            winner = 'one'
+        case GameStatus.PLAYER_LOSE:
+            winner = 'two'
+        case _:
+            winner = 'draw'
+
+    def ms_per_action(player: PlayerNumber) -> float:
+        return round(seconds[player] * 1e3 / actions[player], 3) if actions[player] else 0.0
+
+    return GameRecord(
+        game, player_one, player_two, winner, len(model.history),
+        captures[PlayerNumber.ONE], captures[PlayerNumber.TWO],
+        ms_per_action(PlayerNumber.ONE), ms_per_action(PlayerNumber.TWO),
+        )
+
+
+class ResultWriter:
+    """Appends one row per finished game (CSV or JSONL, by file extension) and flushes it right away"""
+    def __init__(self, file: IO[str], path: str):
+        self._file = file
+        self._csv = csv.DictWriter(file, [field.name for field in fields(GameRecord)]) if path.endswith('.csv') else None
+
+        if self._csv is not None:
+            self._csv.writeheader()
+
+    def write(self, record: GameRecord):
+        if self._csv is not None:
+            self._csv.writerow(asdict(record))
+        else:
+            self._file.write(json.dumps(asdict(record)) + '\n')
+
+        self._file.flush()
+
+
+@dataclass
+class Standing:
+    wins: int = 0
+    losses: int = 0
+    draws: int = 0
+    elo: float = ELO_START
+
+    @property
+    def games(self) -> int:
+        return self.wins + self.losses + self.draws
+
+    @property
+    def score(self) -> float:
+        """Win rate, draws counting half"""
+        return (self.wins + self.draws / 2) / self.games if self.games else 0.0
+
+
+def standings(records: list[GameRecord]) -> dict[str, Standing]:
+    """Win/loss/draw counts and Elo ratings (incremental updates in game order)"""
+    table: dict[str, Standing] = {}
+
+    for record in sorted(records, key=lambda record: record.game):
+        one = table.setdefault(record.player_one, Standing())
+        two = table.setdefault(record.player_two, Standing())
+
+        match record.winner:
+            case 'one':
+                one.wins, two.losses, result = one.wins + 1, two.losses + 1, 1.0
+            case 'two':
+                one.losses, two.wins, result = one.losses + 1, two.wins + 1, 0.0
+            case _:
+                one.draws, two.draws, result = one.draws + 1, two.draws + 1, 0.5
+
+        # A bot playing itself keeps its rating
+        if record.player_one != record.player_two:
+            expected = 1 / (1 + 10 ** ((two.elo - one.elo) / 400))
+            one.elo += ELO_K * (result - expected)
+            two.elo -= ELO_K * (result - expected)
+
+    return table
+
+
+def schedule(players: list[str], games: int) -> list[tuple[str, str]]:
+    """games games per pair of players, sides alternating"""
+    pairs = list(combinations(players, 2)) if len(players) > 1 else [(players[0], players[0])]
+
+    return [
+        (first, second) if game % 2 == 0 else (second, first)
+        for first, second in pairs
+        for game in range(games)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--players', nargs='+', required=True, help=f"bot specs kind[:budget_ms]; kinds: {', '.join(BOTS)}")
+    parser.add_argument('--games', type=int, default=10, help='games per pair of players')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--max-actions', type=int, default=300, help='games reaching this many actions are draws')
+    parser.add_argument('--output', help='stream results to this .csv or .jsonl file')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for spec in args.players:
+        try:
+            parse_player(spec)
+        except argparse.ArgumentTypeError as error:
+            parser.error(str(error))
+
+    games = schedule(args.players, args.games)
+    records: list[GameRecord] = []
+    start = time.perf_counter()
+
+    # The output is closed (and every finished game's row kept) even if a game raises
+    with ExitStack() as stack:
+        writer = ResultWriter(stack.enter_context(open(args.output, 'w', newline='')), args.output) if args.output else None
+        pool = stack.enter_context(ProcessPoolExecutor(args.workers))
+
+        futures = [
+            pool.submit(play_game, index, one, two, args.max_actions, args.seed + index)
+            for index, (one, two) in enumerate(games)
+        ]
+
+        for future in as_completed(futures):
+            record = future.result()
+            records.append(record)
+            if writer is not None:
+                writer.write(record)
+
+            print(f"[{len(records)}/{len(games)}] game {record.game}: {record.player_one} vs {record.player_two}: "
+                  f"{record.winner} after {record.actions} actions", flush=True)
+
+    elapsed = time.perf_counter() - start
+    actions = sum(record.actions for record in records)
+    print(f"\n{len(records)} games, {actions:,} actions in {elapsed:.1f}s ({len(records) / elapsed:.2f} games/s) with {args.workers} workers")
+
+    for name, standing in sorted(standings(records).items(), key=lambda item: -item[1].elo):
+        print(f"{name:>20}: Elo {standing.elo:6.0f}, score {standing.score:6.1%} "
+              f"({standing.wins} won, {standing.losses} lost, {standing.draws} drawn)")
+
+
+if __name__ == '__main__':
+    main()
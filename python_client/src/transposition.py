@@ -0,0 +1,136 @@
+"""
+Fixed-size transposition table for search, keyed by GameModel.zobrist_key (tiles, captured pieces, active player, remaining actions).
+Array-backed: two 64-bit words per entry (key, packed data) and two entries per bucket,
+a depth-preferred slot and an always-replace slot.
+"""
+from array import array
+from dataclasses import dataclass
+from enum import IntEnum
+
+ENTRY_BYTES = 16
+BUCKET_SLOTS = 2
+
+NO_ACTION = 0xFFFFFF
+"""Stored when an entry has no best action (see action_codes)"""
+
+SCORE_BITS = 24
+SCORE_OFFSET = 1 << (SCORE_BITS - 1)
+
+
+class Bound(IntEnum):
+    """Empty slots have bound 0"""
+    EXACT = 1
+    LOWER = 2
+    UPPER = 3
+
+
+@dataclass(frozen=True)
+class TableEntry:
+    score: int
+    depth: int
+    bound: Bound
+    action_code: int | None
+
+
+@dataclass
+class TableStats:
+    probes: int = 0
+    hits: int = 0
+    collisions: int = 0
+    """Probes that found the bucket holding only other positions"""
+    stores: int = 0
+    overwrites: int = 0
+    """Stores that evicted a different position"""
+    bad_actions: int = 0
+    """Stored best actions that were not legal in the probing position (reported by the search); a sign of key collisions"""
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.probes:,} probes, hit rate {self.hit_rate:.1%}, {self.collisions:,} bucket collisions, "
+                f"{self.stores:,} stores, {self.overwrites:,} overwrites, {self.bad_actions:,} bad actions")
+
+
+def _pack(score: int, depth: int, bound: Bound, action_code: int, generation: int) -> int:
+    """score (24 bits, offset) | action code (24) | generation (8) | depth (6) | bound (2)"""
+    return (score + SCORE_OFFSET) << 40 | action_code << 16 | (generation & 0xFF) << 8 | min(depth, 63) << 2 | bound
+
+def _unpack(data: int) -> TableEntry:
+    action_code = data >> 16 & NO_ACTION
+
+    return TableEntry(
+        (data >> 40) - SCORE_OFFSET,
+        data >> 2 & 0x3F,
+        Bound(data & 0x3),
+        None if action_code == NO_ACTION else action_code,
+        )
+
+
+class TranspositionTable:
+    def __init__(self, size_mb: float = 16):
+        self._buckets = max(1, int(size_mb * 2**20) // (ENTRY_BYTES * BUCKET_SLOTS))
+        self._keys = array('Q', bytes(8 * BUCKET_SLOTS * self._buckets))
+        self._data = array('Q', bytes(8 * BUCKET_SLOTS * self._buckets))
+        self._generation = 0
+        self.stats = TableStats()
+
+    @property
+    def capacity(self) -> int:
+        return self._buckets * BUCKET_SLOTS
+
+    @property
+    def size_bytes(self) -> int:
+        return self.capacity * ENTRY_BYTES
+
+    def new_search(self):
+        """Entries from earlier searches become replaceable in depth-preferred slots"""
+        self._generation = (self._generation + 1) & 0xFF
+
+    def clear(self):
+        for index in range(len(self._keys)):
+            self._keys[index] = 0
+            self._data[index] = 0
+        self.stats = TableStats()
+
+    def fill_ratio(self, sample: int = 10_000) -> float:
+        """Occupied fraction of (up to) the first sample slots"""
+        count = min(sample, len(self._data))
+        return sum(1 for index in range(count) if self._data[index]) / count
+
+    def probe(self, key: int) -> TableEntry | None:
+        stats = self.stats
+        stats.probes += 1
+        index = key % self._buckets * BUCKET_SLOTS
+
+        for slot in (index, index + 1):
+            if self._keys[slot] == key and self._data[slot]:
+                stats.hits += 1
+                return _unpack(self._data[slot])
+
+        if self._data[index] or self._data[index + 1]:
+            stats.collisions += 1
+
+        return None
+
+    def store(self, key: int, score: int, depth: int, bound: Bound, action_code: int | None):
+        stats = self.stats
+        stats.stores += 1
+        index = key % self._buckets * BUCKET_SLOTS
+        data = _pack(score, depth, bound, NO_ACTION if action_code is None else action_code, self._generation)
+
+        # Depth-preferred slot: same position, empty, stale, or not deeper than the new entry
+        preferred = self._data[index]
+        if (self._keys[index] == key or not preferred
+                or (preferred >> 8 & 0xFF) != self._generation
+                or (preferred >> 2 & 0x3F) <= depth):
+            slot = index
+        else:
+            slot = index + 1
+
+        if self._data[slot] and self._keys[slot] != key:
+            stats.overwrites += 1
+
+        self._keys[slot] = key
+        self._data[slot] = data
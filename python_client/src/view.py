@@ -2,36 +2,144 @@
 Offline implementation of the game (pass and play);
 Implemented first before online version in online_view, i.e. GameView superclasses OnlineView.
 """
+import time
+from collections import OrderedDict, deque
+from functools import cache
+
 import pygame
 
 from project_types import (
     TILE_PIXELS, BOARD_ROWS, BOARD_COLS,
     GameStatus, PieceKind, ActionType, Location, PlayerNumber,
     LivePiece, GameState, PlayerAction,
-    MakeTurnObserver, NewGameObserver,
+    MakeTurnObserver, NewGameObserver, TurnProvider,
     )
+import state_diff
+from state_diff import StateDiff
 
 SCREEN_WIDTH = 768
 SCREEN_HEIGHT = 720
 BOARD_WIDTH = TILE_PIXELS*BOARD_ROWS
 BOARD_HEIGHT = TILE_PIXELS*BOARD_COLS
 
+FIXED_FPS = 60
+IDLE_WAIT_MS = 1000
+"""Event-driven loop: longest wait for an event; only a safety net, everything that needs a redraw posts or is an event"""
+THINKING_WAIT_MS = 10
+"""Event-driven loop: wait while a TurnProvider is thinking, i.e. how often its finished search is polled"""
+TARGET_DOT_RADIUS = 16
 
-def get_blittable(piece: LivePiece) -> pygame.Surface:
-    """Return surface from piece, for use with blit"""
-    if piece.kind == PieceKind.EEVEE_SHINY:
-        _path = "./../img/eevee-shiny.png"
 
-    elif piece.owner == PlayerNumber.TWO:
-        _path = "./../img/" + piece.kind.value + "-shiny.png"
+def load_sprite(kind: PieceKind, owner: PlayerNumber, size: int, image_dir: str = "./../img/") -> pygame.Surface:
+    """Load and scale a piece image from disk (uncached; see SpriteCache)"""
+    if kind == PieceKind.EEVEE_SHINY:
+        _path = image_dir + "eevee-shiny.png"
+
+    elif owner == PlayerNumber.TWO:
+        _path = image_dir + kind.value + "-shiny.png"
 
     else:
-        _path = "./../img/" + piece.kind.value + ".png"
+        _path = image_dir + kind.value + ".png"
 
     _transformable = pygame.image.load(_path).convert_alpha()
-    returnable = pygame.transform.scale(_transformable, (64, 64))
+    return pygame.transform.scale(_transformable, (size, size))
+
+
+class SpriteCache:
+    """Piece sprites keyed by (kind, owner, size); each image is loaded and scaled once (needs a display mode set)"""
+    def __init__(self, image_dir: str = "./../img/"):
+        self._image_dir = image_dir
+        self._sprites: dict[tuple[PieceKind, PlayerNumber, int], pygame.Surface] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kind: PieceKind, owner: PlayerNumber, size: int = TILE_PIXELS) -> pygame.Surface:
+        key = (kind, owner, size)
+        sprite = self._sprites.get(key)
+
+        if sprite is None:
+            self.misses += 1
+            sprite = self._sprites[key] = load_sprite(kind, owner, size, self._image_dir)
+        else:
+            self.hits += 1
+
+        return sprite
+
+    def preload(self, size: int = TILE_PIXELS):
+        """Load every piece sprite up front, so no frame waits on disk"""
+        for kind in PieceKind:
+            for owner in PlayerNumber:
+                self.get(kind, owner, size)
+
+    def clear(self):
+        self._sprites.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def summary(self) -> str:
+        return f"{len(self._sprites)} sprites, {self.hits:,} hits, {self.misses:,} misses"
+
+SPRITES = SpriteCache()
+
+
+def get_blittable(piece: LivePiece) -> pygame.Surface:
+    """Return surface from piece, for use with blit; shared with other tiles, so do not draw on it"""
+    return SPRITES.get(piece.kind, piece.owner)
+
+
+class TextCache:
+    """Rendered text surfaces keyed by (text, color), least recently used evicted first"""
+    def __init__(self, font: pygame.font.Font, max_size: int = 32):
+        self._font = font
+        self._max_size = max_size
+        self._surfaces: OrderedDict[tuple[str, str], pygame.Surface] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text: str, color: str) -> pygame.Surface:
+        key = (text, color)
+        surface = self._surfaces.get(key)
+
+        if surface is None:
+            self.misses += 1
+            surface = self._surfaces[key] = self._font.render(text, True, color)
+
+            if len(self._surfaces) > self._max_size:
+                self._surfaces.popitem(last=False)
+        else:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+
+        return surface
+
+    def summary(self) -> str:
+        return f"{len(self._surfaces)} texts, {self.hits:,} hits, {self.misses:,} misses"
+
+
+@cache
+def board_background() -> pygame.Surface:
+    """Static grid (white tiles with black borders), rendered once; tiles are redrawn by copying their part of it"""
+    _background = pygame.Surface((BOARD_WIDTH, BOARD_HEIGHT))
+    _background.fill('white')
+
+    for row in range(BOARD_ROWS):
+        for col in range(BOARD_COLS):
+            pygame.draw.rect(_background, "black", pygame.Rect(Location(row, col).pixels, (TILE_PIXELS, TILE_PIXELS)), width=1)
+
+    return _background
+
+@cache
+def target_dot() -> pygame.Surface:
+    """Transparent tile-sized overlay with the blue dot marking a tile as targetable"""
+    _overlay = pygame.Surface((TILE_PIXELS, TILE_PIXELS), pygame.SRCALPHA)
+    pygame.draw.circle(_overlay, 'blue', (TILE_PIXELS//2, TILE_PIXELS//2), TARGET_DOT_RADIUS)
 
-    return returnable
+    return _overlay
+
+
+def appearance(piece: LivePiece | None) -> tuple[PieceKind, PlayerNumber] | None:
+    """What a renderable draws for a piece; moves and location changes alone do not need a redraw"""
+    return (piece.kind, piece.owner) if piece is not None else None
 
 
 class Captures:
@@ -39,12 +147,10 @@ class Captures:
     def __init__(self, number: PlayerNumber):
         self._captures: list[LivePiece] = []
         self._owner = number
+        self._is_dirty = True
 
         self._actual_row = pygame.Surface((TILE_PIXELS*12, TILE_PIXELS*2))
 
-        pygame.font.init()
-        self._font = pygame.font.SysFont('Arial', 25)
-
     @property
     def owner(self) -> PlayerNumber:
         return self._owner
@@ -63,16 +169,32 @@ class Captures:
             case PlayerNumber.TWO:
                 return self._actual_row.get_rect(centerx=SCREEN_WIDTH//2, top=0)
             
+    @property
+    def is_dirty(self) -> bool:
+        return self._is_dirty
+
     def set_captures(self, captures: list[LivePiece]):
+        if [appearance(piece) for piece in captures] != [appearance(piece) for piece in self._captures]:
+            self._is_dirty = True
+
         self._captures = captures
+
+    def mark_dirty(self):
+        self._is_dirty = True
     
     def get_chosen_capture(self, col: int) -> LivePiece:
         """Get clicked capture"""
         return self._captures[col]
 
-    def render_to_screen(self, screen: pygame.Surface):
+    def render_to_screen(self, screen: pygame.Surface) -> list[pygame.Rect]:
+        """Redraw row only if captures changed since last render; return updated screen rects"""
+        if not self._is_dirty:
+            return []
+
         actual_captures = self._render_row()
-        screen.blit(actual_captures, self.rect)
+        self._is_dirty = False
+
+        return [screen.blit(actual_captures, self.rect)]
 
     def _render_row(self) -> pygame.Surface:
         """Render captured pieces in respective row"""
@@ -103,13 +225,12 @@ class Tile:
         self._topleft = location.pixels
         self._occupier: LivePiece | None = None
         self._is_targetable = False
-
-        self._actual_tile = pygame.Surface((TILE_PIXELS, TILE_PIXELS))
+        self._is_dirty = True
 
     @property
     def rect(self) -> pygame.Rect:
-        """Return surface rect with appropriate location; For calculating mouse collision"""
-        return self._actual_tile.get_rect(topleft=self._topleft)
+        """Return tile rect relative to board; For calculating mouse collision"""
+        return pygame.Rect(self._topleft, (TILE_PIXELS, TILE_PIXELS))
 
     @property
     def occupier(self) -> LivePiece | None:
@@ -119,30 +240,50 @@ class Tile:
     def is_targetable(self) -> bool:
         return self._is_targetable
 
+    @property
+    def is_dirty(self) -> bool:
+        return self._is_dirty
+
     def mark_occupied(self, piece: LivePiece):
+        if appearance(piece) != appearance(self._occupier):
+            self._is_dirty = True
+
         self._occupier = piece
 
     def mark_empty(self):
+        if self._occupier is not None:
+            self._is_dirty = True
+
         self._occupier = None
 
     def mark_targetable(self):
+        if not self._is_targetable:
+            self._is_dirty = True
+
         self._is_targetable = True
 
     def unmark_targetable(self):
+        if self._is_targetable:
+            self._is_dirty = True
+
         self._is_targetable = False
 
+    def mark_dirty(self):
+        self._is_dirty = True
+
     def render_to_board(self, board: pygame.Surface):
-        pygame.Surface.fill(self._actual_tile, 'white')
-        pygame.draw.rect(self._actual_tile, "black", pygame.Rect(0, 0, TILE_PIXELS, TILE_PIXELS), width=1)
+        """Draw tile from cached surfaces: its part of the board background, then piece and target dot"""
+        _rect = self.rect
+        board.blit(board_background(), _rect, _rect)
         
         if self._occupier is not None:
             _blittable = get_blittable(self._occupier)
-            self._actual_tile.blit(_blittable, (0,0))
+            board.blit(_blittable, _rect)
 
         if self._is_targetable:
-            pygame.draw.circle(self._actual_tile, 'blue', (TILE_PIXELS//2, TILE_PIXELS//2), 16.0)
+            board.blit(target_dot(), _rect)
 
-        board.blit(self._actual_tile, self.rect)
+        self._is_dirty = False
 
 class RenderableBoard:
     """Renderable class for board; contains all tiles"""
@@ -177,14 +318,19 @@ class RenderableBoard:
         for space in spaces:
             self._location_to_tile[space].mark_empty()
 
-    def mark_nearby_targetable(self, location: Location):
-        selected_piece = self._location_to_tile[location].occupier
+    def apply_diff(self, changes: StateDiff, pieces: dict[Location, LivePiece]):
+        """Update only tiles whose occupier changed; pieces are the current live pieces by location"""
+        for location in changes.vacated:
+            self._location_to_tile[location].mark_empty()
+
+        for location in changes.occupied:
+            self._location_to_tile[location].mark_occupied(pieces[location])
 
-        if selected_piece is not None:
-            self.unmark_all()
+    def mark_nearby_targetable(self, selected_piece: LivePiece):
+        self.unmark_all()
 
-            for loc in selected_piece.moves:
-                self._location_to_tile[loc].mark_targetable()
+        for loc in selected_piece.moves:
+            self._location_to_tile[loc].mark_targetable()
 
     def mark_droppable(self, list_loc: list[Location]):
         for loc in list_loc:
@@ -194,24 +340,50 @@ class RenderableBoard:
         for loc in self._location_to_tile:
             self._location_to_tile[loc].unmark_targetable()
 
-    def render_to_screen(self, screen: pygame.Surface):
-        pygame.Surface.fill(self._actual_board, 'black')
+    def mark_all_dirty(self):
+        for tile in self._location_to_tile.values():
+            tile.mark_dirty()
 
-        for k in self._location_to_tile:
-            self._location_to_tile[k].render_to_board(self._actual_board)
-        
-        screen.blit(self._actual_board, self.rect)
+    def mark_dirty_under(self, screen_rects: list[pygame.Rect]):
+        """Mark tiles overlapped by something drawn over them on screen (e.g. capture rows), so they are drawn on top again"""
+        _board_rect = self.rect
+
+        for tile in self._location_to_tile.values():
+            if tile.rect.move(_board_rect.topleft).collidelist(screen_rects) != -1:
+                tile.mark_dirty()
+
+    def render_to_screen(self, screen: pygame.Surface) -> list[pygame.Rect]:
+        """Redraw only tiles changed since last render; return their screen rects"""
+        _board_rect = self.rect
+        _updated: list[pygame.Rect] = []
+
+        for tile in self._location_to_tile.values():
+            if tile.is_dirty:
+                tile.render_to_board(self._actual_board)
+
+                _tile_rect = tile.rect
+                _updated.append(screen.blit(self._actual_board, _tile_rect.move(_board_rect.topleft), _tile_rect))
+
+        return _updated
 
 class GameView:
     """Actual MVC view class"""
-    def __init__(self, state: GameState):
+    def __init__(self, state: GameState, event_driven: bool = True):
+        """event_driven: sleep until the next event instead of running at a fixed FIXED_FPS"""
         self.on_state_change(state)
+        self._event_driven = event_driven
 
         self._make_turn_observers: list[MakeTurnObserver] = []
         self._new_game_observers: list[NewGameObserver] = []
+        self._turn_providers: list[TurnProvider] = []
 
         pygame.font.init()
         self._font = pygame.font.SysFont('Arial', 25)
+        self._text_cache = TextCache(self._font)
+
+        self._show_frame_time = False
+        self._frame_times: deque[float] = deque(maxlen=FIXED_FPS)
+        self._small_text_cache = TextCache(pygame.font.SysFont('Arial', 14), max_size=16)
 
         self._init_view_state()
 
@@ -228,6 +400,9 @@ class GameView:
         self._current_hovered_location: Location | None = None
         self._current_hovered_piece: LivePiece | None = None
 
+        self._rendered_position = self._position
+        self._needs_full_redraw = True
+
     def on_state_change(self, state: GameState):
         """Update view state based on passed GameState"""
         self._active_player = state.active_player
@@ -241,11 +416,22 @@ class GameView:
         self._action_count = state.action_count
         self._game_status = state.game_status
 
+        "Tiles keep the pieces they were last updated with, whose moves may be outdated; selections look pieces up here"
+        self._pieces = {piece.location: piece for piece in state.live_pieces if piece.location is not None}
+        self._position = state_diff.compact_state(state)
+
     def _rerender_after_turn(self):
-        """For showing state of board every after turn; works with properties established by on_state_change"""
+        """
+        For showing state of board every after turn; works with properties established by on_state_change.
+        Only tiles and capture rows changed since the last rerender are updated (see state_diff).
+        """
+        _changes = state_diff.diff(self._rendered_position, self._position)
+        self._rendered_position = self._position
+
         self._renderable_board.unmark_all()
-        self._renderable_board.set_board_state(self._live_pieces)
+        self._renderable_board.apply_diff(_changes, self._pieces)
 
+        "Always replaced, since drop targets of captured pieces change every action; rows only redraw if _changes.hands"
         self._captures_p1.set_captures(self._all_captures[PlayerNumber.ONE])
         self._captures_p2.set_captures(self._all_captures[PlayerNumber.TWO])
 
@@ -260,16 +446,46 @@ class GameView:
         "For registering controller as observer"
         self._new_game_observers.append(observer)
 
-    def _evaluate_winner(self):
-        """Evaluate game-end on-screen render"""
+    def register_turn_provider(self, provider: TurnProvider):
+        "For registering non-human players (e.g. computer opponent); their turns are polled every frame"
+        self._turn_providers.append(provider)
+
+    def _is_human_turn(self) -> bool:
+        """False while the active player is played by a registered TurnProvider"""
+        return all(provider.player != self._active_player for provider in self._turn_providers)
+
+    def _poll_turn_providers(self):
+        """Make turns of non-human players whose search has finished"""
+        for provider in self._turn_providers:
+            _provider_turn = provider.poll_turn()
+
+            if _provider_turn is not None:
+                self._make_turn(_provider_turn)
+                self._rerender_after_turn()
+
+    def _verdict_text(self) -> str | None:
+        """Game-end text, None while the game is ongoing"""
         if self._game_status == GameStatus.PLAYER_WIN:
-            self._render_text("Game Verdict: Player 1 won!")
+            return "Game Verdict: Player 1 won!"
 
         elif self._game_status == GameStatus.PLAYER_LOSE:
-            self._render_text("Game Verdict: Player 2 won!")
+            return "Game Verdict: Player 2 won!"
             
         elif self._game_status == GameStatus.GAME_DRAW:
-            self._render_text("Game Verdict: Draw")
+            return "Game Verdict: Draw"
+
+    def _evaluate_winner(self) -> pygame.Rect | None:
+        """Evaluate game-end on-screen render; tiles under the verdict are redrawn first,
+        as blitting its anti-aliased edges over a previous copy would darken them"""
+        _text = self._verdict_text()
+
+        if _text is None:
+            return None
+
+        self._renderable_board.mark_dirty_under([self._text_rect(_text)])
+        self._renderable_board.render_to_screen(self._screen)
+
+        return self._render_text(_text)
 
     def _make_turn(self, action: PlayerAction):
         "For interaction with controller"
@@ -281,12 +497,74 @@ class GameView:
         for observer in self._new_game_observers:
             observer.on_new_game()
 
-    def _render_text(self, text: str):
+    def _text_rect(self, text: str) -> pygame.Rect:
+        """Screen rect of text printed by _render_text"""
+        return self._text_cache.get(text, 'black').get_rect(center = (SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
+
+    def _render_text(self, text: str) -> pygame.Rect:
         """Print text on screen using Pygame"""
-        result_text = self._font.render(text, True, 'black')
-        _blittable = result_text.get_rect(center = (SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
+        result_text = self._text_cache.get(text, 'black')
+
+        return self._screen.blit(result_text, self._text_rect(text))
+
+    def _render_frame(self) -> list[pygame.Rect]:
+        """
+        Redraw only what changed since the last frame; return screen rects to push to the display.
+        Everything is redrawn after a new game or when the window was exposed; nothing at all when idle (empty list).
+        """
+        if self._needs_full_redraw:
+            self._screen.fill('black')
+            self._renderable_board.mark_all_dirty()
+            self._captures_p1.mark_dirty()
+            self._captures_p2.mark_dirty()
+
+        _updated = self._captures_p1.render_to_screen(self._screen) \
+            + self._captures_p2.render_to_screen(self._screen)
+
+        "Capture rows overlap the board's outer ranks, which are drawn over them"
+        self._renderable_board.mark_dirty_under(_updated)
+        _updated += self._renderable_board.render_to_screen(self._screen)
 
-        self._screen.blit(result_text, _blittable)
+        "Verdict is drawn over the board, so redraw it whenever tiles under it may have been"
+        if _updated and self._game_status != GameStatus.ONGOING:
+            _verdict = self._evaluate_winner()
+
+            if _verdict is not None:
+                _updated.append(_verdict)
+
+        if self._needs_full_redraw:
+            self._needs_full_redraw = False
+            return [self._screen.get_rect()]
+
+        return _updated
+
+    def _render_frame_time(self) -> pygame.Rect:
+        """Overlay (toggled with F3) with last and average render time of frames that drew something"""
+        _last = self._frame_times[-1] * 1e3
+        _average = sum(self._frame_times) / len(self._frame_times) * 1e3
+
+        "Right of the board, clear of both capture rows"
+        _overlay = pygame.Rect(BOARD_WIDTH + (SCREEN_WIDTH - BOARD_WIDTH)//2, SCREEN_HEIGHT//2 - 18, (SCREEN_WIDTH - BOARD_WIDTH)//2, 36)
+        self._screen.fill('black', _overlay)
+
+        for line, text in enumerate((f"frame {_last:.2f} ms", f"avg {_average:.2f} ms")):
+            _renderable = self._small_text_cache.get(text, 'yellow')
+            self._screen.blit(_renderable, _renderable.get_rect(topright=(SCREEN_WIDTH - 4, _overlay.top + 18*line)))
+
+        return _overlay
+
+    def _push_frame(self):
+        """Render changes and update only those parts of the display"""
+        _start = time.perf_counter()
+        _updated = self._render_frame()
+
+        if _updated:
+            self._frame_times.append(time.perf_counter() - _start)
+
+            if self._show_frame_time:
+                _updated.append(self._render_frame_time())
+
+            pygame.display.update(_updated)
 
     def _mouse_press_on_board(self, abs_pos: tuple[int, int]) -> PlayerAction | None:
         """When mouse is clicked inside RenderableBoard rect"""
@@ -307,9 +585,9 @@ class GameView:
     def _start_move_turn(self, loc: Location):
         """Hover piece (to see possible moves)"""
         self._current_hovered_location = loc
-        self._current_hovered_piece = self._renderable_board.get_tile(loc).occupier
+        self._current_hovered_piece = self._pieces[loc]
 
-        self._renderable_board.mark_nearby_targetable(loc)
+        self._renderable_board.mark_nearby_targetable(self._current_hovered_piece)
 
     def _finish_turn(self, loc: Location) -> PlayerAction:
         "Finish either move turn or drop turn"
@@ -353,6 +631,33 @@ class GameView:
 
             self._renderable_board.mark_droppable(self._current_hovered_piece.moves)
 
+    def _toggle_frame_time(self):
+        self._show_frame_time = not self._show_frame_time
+        self._needs_full_redraw = True
+
+    def _wait_timeout_ms(self) -> int:
+        """Event-driven loop: wake up regularly only while a computer player is searching"""
+        if any(provider.is_thinking for provider in self._turn_providers):
+            return THINKING_WAIT_MS
+
+        return IDLE_WAIT_MS
+
+    def _next_events(self) -> list[pygame.event.Event]:
+        """
+        Events to handle this iteration; in event-driven mode, block until one arrives (or timeout), then drain the queue.
+        Otherwise, wait for the next frame at FIXED_FPS and take whatever arrived meanwhile.
+        """
+        if not self._event_driven:
+            self._clock.tick(FIXED_FPS)
+            return pygame.event.get()
+
+        _first = pygame.event.wait(self._wait_timeout_ms())
+
+        if _first.type == pygame.NOEVENT:
+            return []
+
+        return [_first] + pygame.event.get()
+
     def _is_cursor_on_captures(self, pos: tuple[int, int]):
         return (self._active_player == PlayerNumber.ONE and self._captures_p1.rect.collidepoint(pos)) \
                     or (self._active_player == PlayerNumber.TWO and self._captures_p2.rect.collidepoint(pos))
@@ -363,19 +668,27 @@ class GameView:
 
         self._screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         self._clock = pygame.time.Clock()
+        SPRITES.preload()
+        self._push_frame()
 
         _game_is_running = True
 
         while _game_is_running:
-            for event in pygame.event.get():
+            for event in self._next_events():
                 if event.type == pygame.QUIT:
                     _game_is_running = False
 
+                elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                    self._needs_full_redraw = True
+
                 elif event.type == pygame.KEYDOWN and event.key == pygame.K_r:
                     self._new_game()
                     self._init_view_state()
 
-                elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    self._toggle_frame_time()
+
+                elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self._is_human_turn():
                     if self._renderable_board.rect.collidepoint(event.pos):
                         _player_turn = self._mouse_press_on_board(event.pos)
 
@@ -386,16 +699,7 @@ class GameView:
                     elif self._is_cursor_on_captures(event.pos):
                         self._mouse_press_on_captures(event.pos, self._active_player)
 
-            self._screen.fill('black')
-            self._captures_p1.render_to_screen(self._screen)
-            self._captures_p2.render_to_screen(self._screen)
-            self._renderable_board.render_to_screen(self._screen)
-
-            if self._game_status != GameStatus.ONGOING:
-                self._evaluate_winner()
-
-            pygame.display.flip()
-
-            self._clock.tick(60)
+            self._poll_turn_providers()
+            self._push_frame()
 
         pygame.quit()
\ No newline at end of file
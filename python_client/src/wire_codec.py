@@ -0,0 +1,177 @@
+"""
+Compact, versioned wire format for PlayerAction, replacing online_view.DataParser's '%'-separated strings;
+Every action is its 3-byte action code (see action_codes.py), after a 1-byte header (bits 4-7: version, bits 0-3: frame type).
+A single action is 4 bytes; a batch adds a count byte, i.e. 2 + 3 * n bytes.
+The project server relays text frames only, so payloads are sent as TEXT_PREFIX + unpadded base64 (see encode_text).
+The previous string format is still decoded (decode_legacy) and encoded (encode_legacy), for comparison.
+"""
+import base64
+from collections.abc import Iterable
+from functools import lru_cache
+
+from project_types import PieceKind, ActionType, Location, PlayerNumber, PlayerAction, BOARD_ROWS, BOARD_COLS
+from action_codes import NO_SQUARE, DROP_BIT, KIND_MASK, KINDS, encode_action, decode_action
+
+WIRE_VERSION = 1
+FRAME_ACTION = 0
+FRAME_BATCH = 1
+
+ACTION_SIZE = 3
+MAX_BATCH = 0xFF
+TILE_COUNT = BOARD_ROWS * BOARD_COLS
+UNUSED_HEADER_BITS = 0x38
+"""Action code header bits no field uses; set only in corrupt data"""
+
+TEXT_PREFIX = '~'
+"""Never starts a legacy payload (those start with an ActionType value)"""
+TEXT_SIZE_LIMIT = 202
+"""Project server's read limit per message, in bytes"""
+MAX_TEXT_BATCH = ((TEXT_SIZE_LIMIT - len(TEXT_PREFIX)) * 3 // 4 - 2) // ACTION_SIZE
+"""Most actions per text payload within TEXT_SIZE_LIMIT"""
+
+
+class WireError(ValueError):
+    """Malformed, truncated or unsupported payload"""
+
+
+def encode(action: PlayerAction) -> bytes:
+    return (WIRE_VERSION << 4 | FRAME_ACTION).to_bytes() + encode_action(action).to_bytes(ACTION_SIZE)
+
+def encode_batch(actions: Iterable[PlayerAction]) -> bytes:
+    """Several actions in one frame, e.g. all actions of a turn"""
+    codes = [encode_action(action) for action in actions]
+    if len(codes) > MAX_BATCH:
+        raise WireError(f"At most {MAX_BATCH} actions per batch, got {len(codes)}")
+
+    return bytes((WIRE_VERSION << 4 | FRAME_BATCH, len(codes))) + b''.join(code.to_bytes(ACTION_SIZE) for code in codes)
+
+
+@lru_cache(maxsize=4096)
+def _decode_code(code: int) -> PlayerAction:
+    """Action of a code read off the wire, checked so corrupt data never yields an action off the board; actions are immutable, so shared"""
+    header, source, target = code >> 16, code >> 8 & 0xFF, code & 0xFF
+
+    if header & UNUSED_HEADER_BITS or header & KIND_MASK >= len(KINDS) or target >= TILE_COUNT:
+        raise WireError(f"Invalid action code {code:06x}")
+
+    if (source == NO_SQUARE) != bool(header & DROP_BIT) or (source != NO_SQUARE and source >= TILE_COUNT):
+        raise WireError(f"Invalid action code {code:06x}")
+
+    return decode_action(code)
+
+def decode(data: bytes) -> list[PlayerAction]:
+    """Actions of a single action or batch frame"""
+    if not data:
+        raise WireError("Empty payload")
+
+    version, frame = data[0] >> 4, data[0] & 0x0F
+    if version != WIRE_VERSION:
+        raise WireError(f"Unsupported wire version {version}")
+
+    if frame == FRAME_ACTION:
+        if len(data) != 1 + ACTION_SIZE:
+            raise WireError(f"Action frame must be {1 + ACTION_SIZE} bytes, got {len(data)}")
+
+        return [_decode_code(int.from_bytes(data[1:]))]
+
+    if frame == FRAME_BATCH:
+        if len(data) < 2 or len(data) != 2 + data[1] * ACTION_SIZE:
+            raise WireError(f"Batch frame length {len(data)} does not match its action count")
+
+        return [
+            _decode_code(int.from_bytes(data[offset:offset + ACTION_SIZE]))
+            for offset in range(2, len(data), ACTION_SIZE)
+        ]
+
+    raise WireError(f"Unknown frame type {frame}")
+
+
+def encode_text(actions: list[PlayerAction]) -> str:
+    """Printable payload for the server's text frames: one action frame, or a batch frame for several"""
+    data = encode(actions[0]) if len(actions) == 1 else encode_batch(actions)
+    payload = TEXT_PREFIX + base64.b64encode(data).rstrip(b'=').decode('ascii')
+
+    if len(payload) > TEXT_SIZE_LIMIT:
+        raise WireError(f"Payload of {len(payload)} bytes exceeds the server limit of {TEXT_SIZE_LIMIT}; split the batch")
+
+    return payload
+
+def decode_text(payload: str) -> list[PlayerAction]:
+    if not payload.startswith(TEXT_PREFIX):
+        raise WireError("Not a compact payload")
+
+    encoded = payload[len(TEXT_PREFIX):]
+
+    try:
+        data = base64.b64decode(encoded + '=' * (-len(encoded) % 4), validate=True)
+    except ValueError as error:  # binascii.Error, or non-ASCII text
+        raise WireError(f"Invalid base64: {error}") from error
+
+    return decode(data)
+
+def is_compact_text(payload: str) -> bool:
+    return payload.startswith(TEXT_PREFIX)
+
+def merge_text(payloads: list[str]) -> list[str]:
+    """Consecutive compact payloads merged into as few batch payloads as fit the server limit; order kept, others passed through"""
+    merged: list[str] = []
+    actions: list[PlayerAction] = []
+
+    def flush():
+        for start in range(0, len(actions), MAX_TEXT_BATCH):
+            merged.append(encode_text(actions[start:start + MAX_TEXT_BATCH]))
+        actions.clear()
+
+    for payload in payloads:
+        if is_compact_text(payload):
+            try:
+                actions.extend(decode_text(payload))
+                continue
+            except WireError:
+                pass
+
+        flush()
+        merged.append(payload)
+
+    flush()
+    return merged
+
+
+def encode_legacy(action: PlayerAction) -> str:
+    """Previous DataParser format: type%player%source-row-col%target-row-col%kind"""
+    source_loc = f"{ action.source_location.row }-{ action.source_location.col }" if action.source_location \
+        else f""
+
+    return f"{ action.action_type.value }%{ action.player.value }%{ source_loc }%{ action.target_location.row }-{ action.target_location.col }%{ action.kind }"
+
+def _parse_location(text: str) -> Location:
+    """Raises ValueError off the board, as decode rejects such squares"""
+    row, _, col = text.partition('-')
+    location = Location(int(row), int(col))
+
+    if not (0 <= location.row < BOARD_ROWS and 0 <= location.col < BOARD_COLS):
+        raise ValueError(f"Location {text!r} is off the board")
+
+    return location
+
+def decode_legacy(payload: str) -> PlayerAction | None:
+    """Previous DataParser format (None if invalid, including locations off the board); rows and columns may have leading zeros"""
+    properties = payload.split('%')
+
+    if len(properties) != 5:
+        return None
+
+    action_type = ActionType.MOVE if properties[0] == ActionType.MOVE else ActionType.DROP
+
+    try:
+        return PlayerAction(
+            action_type,
+            player = PlayerNumber.ONE if properties[1] == PlayerNumber.ONE else PlayerNumber.TWO,
+            source_location = \
+                None if action_type == ActionType.DROP \
+                else _parse_location(properties[2]),
+            target_location = _parse_location(properties[3]),
+            kind = PieceKind(properties[4])
+            )
+    except ValueError:
+        return None
@@ -0,0 +1,63 @@
+"""
+Zobrist keys for Shogimon positions;
+A position key is the XOR of one key per occupied tile (kind, owner), one per captured-piece count (owner, kind),
+the active player, and the remaining actions of the turn. Board engines keep their part updated incrementally.
+Keys come from a fixed seed, so they are stable across processes and runs (e.g. for stored replays).
+"""
+import random
+
+from project_types import PieceKind, PlayerNumber, GameState, BOARD_ROWS, BOARD_COLS
+
+SQUARES = BOARD_ROWS * BOARD_COLS
+MAX_ACTIONS = 3
+
+_rng = random.Random(0x5409_1D0E)
+
+def _key() -> int:
+    return _rng.getrandbits(64)
+
+PIECE_KEYS: dict[tuple[PieceKind, PlayerNumber], list[int]] = {
+    (kind, player): [_key() for _ in range(SQUARES)]
+    for kind in PieceKind
+    for player in PlayerNumber
+}
+"""Per (kind, owner): key of each tile index (row * BOARD_COLS + col)"""
+
+HAND_KEYS: dict[tuple[PlayerNumber, PieceKind], list[int]] = {
+    (player, kind): [0] + [_key() for _ in range(SQUARES)]
+    for player in PlayerNumber
+    for kind in PieceKind
+}
+"""Per (owner, kind): key of each captured count; count 0 contributes nothing"""
+
+ACTIVE_PLAYER_KEYS: dict[PlayerNumber, int] = {player: _key() for player in PlayerNumber}
+ACTION_COUNT_KEYS: list[int] = [_key() for _ in range(MAX_ACTIONS + 1)]
+
+
+def piece_key(kind: PieceKind, owner: PlayerNumber, row: int, col: int) -> int:
+    return PIECE_KEYS[(kind, owner)][row * BOARD_COLS + col]
+
+def hand_change_key(player: PlayerNumber, kind: PieceKind, old_count: int, new_count: int) -> int:
+    """XOR into a key when a captured count changes"""
+    keys = HAND_KEYS[(player, kind)]
+    return keys[old_count] ^ keys[new_count]
+
+def turn_key(active_player: PlayerNumber, action_count: int) -> int:
+    return ACTIVE_PLAYER_KEYS[active_player] ^ ACTION_COUNT_KEYS[action_count]
+
+def key_from_state(state: GameState) -> int:
+    """Full (non-incremental) key of a GameState; equals GameModel.zobrist_key for the same position"""
+    key = turn_key(state.active_player, state.action_count)
+
+    for piece in state.live_pieces:
+        if piece.location is not None:
+            key ^= piece_key(piece.kind, piece.owner, piece.location.row, piece.location.col)
+
+    counts: dict[tuple[PlayerNumber, PieceKind], int] = {}
+    for piece in state.captured_pieces:
+        counts[(piece.owner, piece.kind)] = counts.get((piece.owner, piece.kind), 0) + 1
+
+    for (player, kind), count in counts.items():
+        key ^= HAND_KEYS[(player, kind)][count]
+
+    return key
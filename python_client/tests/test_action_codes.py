@@ -0,0 +1,39 @@
+"""GameModel.legal_actions and legal_action_codes (action_codes.py) against the moves listed in GameState"""
+import random
+
+import pytest
+
+from project_types import GameStatus
+from model import GameModel, GameBoard
+from bitboard import BOARD_ENGINES
+from action_codes import encode_action, decode_action
+from random_games import state_actions, finished_game_endings
+
+
+@pytest.mark.parametrize('engine', BOARD_ENGINES.values(), ids=BOARD_ENGINES.keys())
+@pytest.mark.parametrize('seed', range(5))
+def test_legal_actions_match_game_state(engine: type[GameBoard], seed: int):
+    model = GameModel.default(engine)
+    rng = random.Random(seed)
+
+    for _ in range(200):
+        expected = state_actions(model.state)
+        if model.state.game_status != GameStatus.ONGOING or not expected:
+            break
+
+        actions = list(model.legal_actions())
+        codes = list(model.legal_action_codes())
+        assert len(actions) == len(set(actions))
+        assert set(actions) == set(expected)
+        assert [decode_action(code) for code in codes] == actions
+        assert [encode_action(action) for action in actions] == codes
+        assert all(model.is_legal_action(action) for action in actions)
+
+        model.make_action(rng.choice(expected))
+
+def test_finished_games_have_no_legal_actions():
+    [(model, codes)] = finished_game_endings(1, 1, seed=0)
+    model.push(decode_action(codes[0]))
+
+    assert model.game_status != GameStatus.ONGOING
+    assert list(model.legal_actions()) == [] and list(model.legal_action_codes()) == []
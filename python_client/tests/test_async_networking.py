@@ -0,0 +1,57 @@
+"""Reconnects of the asyncio client (async_networking.py) against a local stand-in for the project server"""
+import threading
+import time
+
+import pytest
+
+from model import GameModel
+from action_codes import decode_action
+from async_networking import AsyncNetworking, Joined, Message
+from benchmarks import RelayServer
+import wire_codec
+
+
+@pytest.fixture
+def clients():
+    server = RelayServer()
+    arrived = {1: threading.Event(), 2: threading.Event()}
+    clients: dict[int, AsyncNetworking] = {}
+
+    for _ in range(2):
+        client = AsyncNetworking.connect('localhost', server.port, merge=wire_codec.merge_text, ping_interval=0.05)
+        client.set_message_callback(arrived[client.player_id].set)
+        clients[client.player_id] = client
+
+    yield server, clients, arrived
+
+    for client in clients.values():
+        client.close()
+
+
+def test_reconnect_drops_payloads_of_the_previous_connection(clients: tuple[RelayServer, dict[int, AsyncNetworking], dict[int, threading.Event]]):
+    server, connected, arrived = clients
+    one = connected[1]
+    actions = [decode_action(code) for code in GameModel.default().legal_action_codes()]
+
+    joined = [message for message in one.recv() if isinstance(message, Joined)]
+    assert [message.connection for message in joined] == [1]
+
+    server.kick(1)
+    while one.is_connected:
+        time.sleep(0.001)
+    one.send(wire_codec.encode_text([actions[0]]))
+    assert one.wait_connected(10.0)
+
+    joined = [message for message in one.recv() if isinstance(message, Joined)]
+    assert joined and joined[-1].connection == one.connection == 2
+    assert one.dropped_payloads == 1
+
+    connected[2].recv()
+    arrived[2].clear()
+    one.send(wire_codec.encode_text([actions[1]]), joined[-1].connection)
+    one.send(wire_codec.encode_text([actions[2]]), joined[-1].connection - 1)
+
+    assert arrived[2].wait(5.0)
+    received = [message.payload for message in connected[2].recv() if isinstance(message, Message)]
+    assert [action for payload in received for action in wire_codec.decode_text(payload)] == [actions[1]]
+    assert one.dropped_payloads == 2
@@ -0,0 +1,47 @@
+"""NumPy batch engine (batch_engine.py) against GameModel; skipped without numpy (poetry install --extras batch)"""
+import pytest
+
+np = pytest.importorskip('numpy', minversion='2.0')
+
+from project_types import GameStatus
+from model import GameModel
+from action_codes import decode_action
+from batch_engine import BatchEngine, random_actions
+from random_games import finished_game_endings
+
+
+def cross_check(models: list[GameModel], scripts: list[list[int]], steps: int, seed: int):
+    """Steps a BatchEngine and the models through the same actions (scripted, or random once a script runs out), comparing legal actions and positions"""
+    rng = np.random.default_rng(seed)
+    batch = BatchEngine.from_compact([model.to_compact() for model in models])
+
+    for step in range(steps):
+        mask = batch.legal_mask()
+        actions = random_actions(batch.legal_groups(), rng)
+
+        for index, model in enumerate(models):
+            legal = {batch.action_code(index, int(action)): int(action) for action in np.nonzero(mask[index])[0]}
+            assert sorted(legal) == sorted(model.legal_action_codes()), f"legal actions differ on board {index} at step {step}"
+
+            if scripts[index]:
+                actions[index] = legal[scripts[index].pop(0)]
+
+            if actions[index] >= 0:
+                model.push(decode_action(batch.action_code(index, int(actions[index]))))
+
+        batch.apply(actions)
+        for index, model in enumerate(models):
+            assert batch.compact(index) == model.to_compact(), f"positions differ on board {index} at step {step}"
+
+
+def test_random_games():
+    models = [GameModel.default() for _ in range(16)]
+    cross_check(models, [[] for _ in models], steps=100, seed=0)
+
+def test_finished_games():
+    """Ends of seeded random games that finished, so that win detection is compared too"""
+    endings = finished_game_endings(8, 50, seed=0)
+    models = [model for model, _ in endings]
+    cross_check(models, [codes for _, codes in endings], steps=50, seed=0)
+
+    assert all(model.game_status != GameStatus.ONGOING for model in models)
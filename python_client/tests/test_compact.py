@@ -0,0 +1,17 @@
+"""GameModel.to_compact and from_compact (positions handed to search workers)"""
+import pytest
+
+from model import GameModel
+from bitboard import BOARD_ENGINES
+from random_games import state_signature, late_game_model
+
+
+@pytest.mark.parametrize('min_captures', [0, 6, 15])
+def test_from_compact_restores_position(min_captures: int):
+    model = late_game_model(min_captures, seed=0)
+
+    for engine in BOARD_ENGINES.values():
+        restored = GameModel.from_compact(model.to_compact(), engine)
+        assert restored.zobrist_key == model.zobrist_key
+        assert state_signature(restored.state) == state_signature(model.state)
+        assert restored.to_compact() == model.to_compact()
@@ -0,0 +1,19 @@
+"""Drop targets from model.Board's per-state cache of forbidden drop locations"""
+import pytest
+
+from project_types import BOARD_ROWS, BOARD_COLS
+from model import Board, PieceFactory
+from random_games import late_game_model
+from benchmarks import uncached_droppable_locations
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_cached_drops_match_uncached(seed: int):
+    model = late_game_model(15, seed)
+    board = Board(BOARD_ROWS, BOARD_COLS)
+    for piece in model.state.live_pieces:
+        assert piece.location is not None
+        board.put(piece.location.row, piece.location.col, PieceFactory.make(piece.kind, piece.location, piece.owner), piece.owner)
+
+    for piece in model.state.captured_pieces:
+        assert sorted(piece.moves, key=lambda loc: (loc.row, loc.col)) == uncached_droppable_locations(board, piece.owner)
@@ -0,0 +1,29 @@
+"""model.Board and bitboard.BitBoard play the same games"""
+import random
+
+import pytest
+
+from project_types import GameStatus
+from model import GameModel
+from bitboard import BOARD_ENGINES
+from random_games import state_signature, state_actions
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_engines_agree_on_random_games(seed: int):
+    models = {name: GameModel.default(engine) for name, engine in BOARD_ENGINES.items()}
+    rng = random.Random(seed)
+
+    for _ in range(200):
+        reference = state_signature(models['board'].state)
+        for name, model in models.items():
+            assert state_signature(model.state) == reference, f"{name} diverged from board after {len(model.history)} actions"
+
+        state = models['board'].state
+        actions = state_actions(state)
+        if state.game_status != GameStatus.ONGOING or not actions:
+            break
+
+        action = rng.choice(actions)
+        for model in models.values():
+            model.make_action(action)
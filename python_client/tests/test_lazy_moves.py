@@ -0,0 +1,46 @@
+"""Lazily generated LivePiece.moves (model.LazyMoves)"""
+import copy
+import pickle
+import random
+
+import pytest
+
+from project_types import GameStatus, GameState
+from model import GameModel, GameBoard
+from bitboard import BOARD_ENGINES
+from action_codes import decode_action
+from random_games import state_signature
+
+
+@pytest.mark.parametrize('engine', BOARD_ENGINES.values(), ids=BOARD_ENGINES.keys())
+@pytest.mark.parametrize('seed', range(5))
+def test_states_read_after_later_actions(engine: type[GameBoard], seed: int):
+    rng = random.Random(seed)
+    model, reference = GameModel.default(engine), GameModel.default(engine)
+    unread: list[GameState] = []
+    expected: list[tuple[object, ...]] = []
+
+    while len(model.history) < 60 and model.game_status == GameStatus.ONGOING:
+        codes = list(model.legal_action_codes())
+        if not codes:
+            break
+
+        action = decode_action(rng.choice(codes))
+        model.make_action(action)
+        reference.make_action(action)
+        unread.append(model.state)
+        expected.append(state_signature(reference.state))
+
+    for index, (state, signature) in enumerate(zip(unread, expected)):
+        assert state_signature(state) == signature, f"state after action {index + 1} changed by later actions"
+
+@pytest.mark.parametrize('engine', BOARD_ENGINES.values(), ids=BOARD_ENGINES.keys())
+def test_pickled_and_copied_states(engine: type[GameBoard]):
+    model = GameModel.default(engine)
+    rng = random.Random(0)
+    for _ in range(30):
+        model.make_action(decode_action(rng.choice(list(model.legal_action_codes()))))
+
+    state = model.state
+    assert state_signature(pickle.loads(pickle.dumps(state))) == state_signature(state)
+    assert state_signature(copy.deepcopy(state)) == state_signature(state)
@@ -0,0 +1,26 @@
+"""model.Board's incrementally maintained movable locations mappings"""
+import random
+
+import pytest
+
+from project_types import BOARD_ROWS, BOARD_COLS, GameStatus, PlayerNumber
+from model import GameModel, Board, BoardSetter, DefaultPositions
+from random_games import state_actions
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_mappings_match_rebuild(seed: int):
+    board = Board(BOARD_ROWS, BOARD_COLS)
+    BoardSetter(DefaultPositions()).set_board(board)
+    model = GameModel(GameModel.default().state, board, PlayerNumber.ONE, 3)
+    rng = random.Random(seed)
+
+    for _ in range(200):
+        actions = state_actions(model.state)
+        if model.state.game_status != GameStatus.ONGOING or not actions:
+            break
+
+        model.make_action(rng.choice(actions))
+        for player in PlayerNumber:
+            assert board.get_movable_locations_mapping(player) == board.rebuild_movable_locations_mapping(player), \
+                f"mapping of {player} out of sync after {len(model.history)} actions"
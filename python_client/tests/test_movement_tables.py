@@ -0,0 +1,27 @@
+"""Precomputed movement tables (movement_tables.py) against offsets computed on every call"""
+import pytest
+
+from project_types import BOARD_ROWS, BOARD_COLS, PieceKind, Location, PlayerNumber
+from model import Board, BoardSetter, DefaultPositions, PieceFactory
+from benchmarks import offset_movement_range
+
+
+def opening_mapping() -> dict[tuple[int, int], bool]:
+    board = Board(BOARD_ROWS, BOARD_COLS)
+    BoardSetter(DefaultPositions()).set_board(board)
+    return board.get_movable_locations_mapping(PlayerNumber.ONE)
+
+MAPPINGS = {
+    'empty board': {(row, col): True for row in range(BOARD_ROWS) for col in range(BOARD_COLS)},
+    'opening': opening_mapping(),
+}
+
+
+@pytest.mark.parametrize('mapping', MAPPINGS.values(), ids=MAPPINGS.keys())
+@pytest.mark.parametrize('kind', PieceKind, ids=lambda kind: kind.value)
+@pytest.mark.parametrize('owner', PlayerNumber, ids=lambda owner: f"player {owner.value}")
+def test_tables_match_offsets(mapping: dict[tuple[int, int], bool], kind: PieceKind, owner: PlayerNumber):
+    for row in range(BOARD_ROWS):
+        for col in range(BOARD_COLS):
+            piece = PieceFactory.make(kind, Location(row, col), owner)
+            assert piece.get_movement_range(mapping) == offset_movement_range(kind, row, col, mapping), f"differs at {row},{col}"
@@ -0,0 +1,100 @@
+"""Position notation (notation.py)"""
+import random
+
+import pytest
+
+from project_types import BOARD_ROWS, BOARD_COLS, GameStatus
+from model import GameModel, GameBoard, BoardSetter
+from bitboard import BOARD_ENGINES
+from action_codes import decode_action
+import notation
+
+
+def random_game_notations(seed: int, max_actions: int = 300) -> list[tuple[str, bytes]]:
+    rng = random.Random(seed)
+    model = GameModel.default()
+    notations: list[tuple[str, bytes]] = []
+
+    while len(model.history) < max_actions and model.game_status == GameStatus.ONGOING:
+        codes = list(model.legal_action_codes())
+        if not codes:
+            break
+
+        model.make_action(decode_action(rng.choice(codes)))
+        if model.game_status != GameStatus.ONGOING:
+            break
+
+        notations.append((notation.from_model(model), model.to_compact()))
+
+    return notations
+
+
+def test_start_notation():
+    assert notation.from_model(GameModel.default()) == notation.START_NOTATION
+    assert notation.to_compact(notation.START_NOTATION) == GameModel.default().to_compact()
+
+@pytest.mark.parametrize('seed', range(3))
+def test_compact_round_trip(seed: int):
+    for text, compact in random_game_notations(seed):
+        assert notation.to_compact(text) == compact
+        assert notation.from_compact(compact) == text
+
+@pytest.mark.parametrize('engine', BOARD_ENGINES.values(), ids=BOARD_ENGINES.keys())
+@pytest.mark.parametrize('seed', range(3))
+def test_models_round_trip(engine: type[GameBoard], seed: int):
+    for text, _ in random_game_notations(seed):
+        model = notation.to_model(text, engine)
+        assert notation.from_model(model) == text
+        assert notation.from_board(model.board, model.active_player, model.action_count) == text
+
+        board = engine(BOARD_ROWS, BOARD_COLS)
+        BoardSetter(notation.NotationPositions(text)).set_board(board)
+        assert notation.from_board(board).split(' ')[0] == text.split(' ')[0]
+
+def test_cleared_caches_give_the_same_results():
+    texts = [text for text, _ in random_game_notations(0, 60)]
+    warm = [notation.to_compact(text) for text in texts]
+    notation.clear_caches()
+
+    assert [notation.to_compact(text) for text in texts] == warm
+
+def test_hands():
+    ranks = notation.START_NOTATION.split(' ')[0]
+    positions = notation.NotationPositions(f"{ranks} 2EPs 2 1")
+
+    assert [(player.value, kind.value, count) for player, kind, count in positions.hands] == [
+        ('one', 'eevee', 2), ('one', 'pikachu', 1), ('two', 'eevee_shiny', 1),
+    ]
+    assert notation.from_compact(notation.to_compact(f"{ranks} 2EPs 2 1")) == f"{ranks} 2EPs 2 1"
+
+@pytest.mark.parametrize('hands', [
+    'PE',      # out of KINDS order
+    'EE',      # repeated kind
+    '256E',    # count over 255
+    '0E',
+    '1E',      # counts of one are implicit
+    '2',       # count without a kind
+    'A',       # protected pieces are never captured
+])
+def test_invalid_hands(hands: str):
+    ranks = notation.START_NOTATION.split(' ')[0]
+
+    with pytest.raises(notation.NotationError):
+        notation.to_compact(f"{ranks} {hands} 1 3")
+
+@pytest.mark.parametrize('text', [
+    '',
+    'tp1oa1pt/ssssssss/8/8/8/8/EEEEEEEE - 1 3',
+    'tp1oa1pt/ssssssss/8/8/8/8/EEEEEEEE/TP1OA1P - 1 3',
+    'tp1oa1pt/ssssssss/8/8/8/8/EEEEEEEE/TP1OA1PX - 1 3',
+    'tp1oa1pt/ssssssss/8/8/8/8/EEEEEEEE/TP1OA1PT - 3 3',
+    'tp1oa1pt/ssssssss/8/8/8/8/EEEEEEEE/TP1OA1PT - 1 x',
+    'tp1oa1pt/ssssssss/8/8/8/8/EEEEEEEE/TP1OA1PT - 1',
+])
+def test_invalid_notation(text: str):
+    with pytest.raises(notation.NotationError):
+        notation.to_compact(text)
+
+def test_invalid_compact_size():
+    with pytest.raises(notation.NotationError):
+        notation.from_compact(b'\x00')
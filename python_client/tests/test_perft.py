@@ -0,0 +1,16 @@
+"""Perft counts (perft.py) from the starting position on every engine"""
+import pytest
+
+from model import GameModel, GameBoard
+from bitboard import BOARD_ENGINES
+from perft import EXPECTED_COUNTS, perft
+
+
+@pytest.mark.parametrize('engine', BOARD_ENGINES.values(), ids=BOARD_ENGINES.keys())
+@pytest.mark.parametrize('depth', [1, 2, 3, 4])
+def test_perft_counts(engine: type[GameBoard], depth: int):
+    model = GameModel.default(engine)
+    before = model.to_compact()
+
+    assert perft(model, depth) == EXPECTED_COUNTS[depth]
+    assert model.to_compact() == before
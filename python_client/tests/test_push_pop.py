@@ -0,0 +1,33 @@
+"""GameModel.push and pop: pop restores every position exactly"""
+import random
+
+import pytest
+
+from project_types import GameStatus
+from model import GameModel, GameBoard
+from bitboard import BOARD_ENGINES
+from random_games import state_signature, state_actions
+
+
+@pytest.mark.parametrize('engine', BOARD_ENGINES.values(), ids=BOARD_ENGINES.keys())
+@pytest.mark.parametrize('seed', range(10))
+def test_pop_restores_random_walks(engine: type[GameBoard], seed: int):
+    model = GameModel.default(engine)
+    rng = random.Random(seed)
+    positions = [(state_signature(model.state), model.zobrist_key, model.to_compact())]
+
+    for _ in range(40):
+        actions = state_actions(model.state)
+        if model.state.game_status != GameStatus.ONGOING or not actions:
+            break
+
+        model.push(rng.choice(actions))
+        positions.append((state_signature(model.state), model.zobrist_key, model.to_compact()))
+
+    while len(positions) > 1:
+        positions.pop()
+        model.pop()
+        assert (state_signature(model.state), model.zobrist_key, model.to_compact()) == positions[-1], \
+            f"pop did not restore the position {len(positions) - 1} actions in"
+
+    assert model.history == []
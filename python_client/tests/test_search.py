@@ -0,0 +1,51 @@
+"""Searches (ai.py, transposition.py, parallel_search.py, mcts.py) return legal actions and leave the model unchanged"""
+import pytest
+
+from model import GameModel
+from ai import AlphaBetaSearch
+from transposition import TranspositionTable
+from parallel_search import ParallelSearch
+from mcts import MCTSSearch, PLAYOUT_POLICIES
+from random_games import late_game_model
+
+POSITIONS = {
+    'opening': lambda: GameModel.default(),
+    'late game': lambda: late_game_model(15, seed=0),
+}
+
+
+@pytest.fixture(params=POSITIONS.values(), ids=POSITIONS.keys())
+def model(request: pytest.FixtureRequest) -> GameModel:
+    return request.param()
+
+
+def test_alpha_beta(model: GameModel):
+    before = model.to_compact()
+    result = AlphaBetaSearch().search(model, budget_ms=100)
+
+    assert result.action is not None and model.is_legal_action(result.action)
+    assert model.to_compact() == before
+
+def test_transposition_table_keeps_scores(model: GameModel):
+    baseline = AlphaBetaSearch(max_depth=2).search(model, budget_ms=10**9)
+    result = AlphaBetaSearch(max_depth=2, table=TranspositionTable(1)).search(model, budget_ms=10**9)
+
+    assert result.action is not None and model.is_legal_action(result.action)
+    assert result.score == baseline.score
+
+def test_parallel_search_keeps_scores(model: GameModel):
+    serial = AlphaBetaSearch(max_depth=2).search(model, budget_ms=10**9)
+    with ParallelSearch(2, max_depth=2, table_mb=1) as search:
+        result = search.search(model, budget_ms=10**9)
+
+    assert result.action is not None and model.is_legal_action(result.action)
+    assert result.score == serial.score
+
+@pytest.mark.parametrize('policy', PLAYOUT_POLICIES.values(), ids=PLAYOUT_POLICIES.keys())
+def test_mcts(model: GameModel, policy: type):
+    before = model.to_compact()
+    with MCTSSearch(policy=policy(), seed=0) as search:
+        result = search.search(model, budget_ms=100)
+
+    assert result.action is not None and model.is_legal_action(result.action)
+    assert model.to_compact() == before
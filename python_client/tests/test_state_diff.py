@@ -0,0 +1,48 @@
+"""Diffs between compact positions (state_diff.py)"""
+import random
+
+import pytest
+
+from project_types import GameStatus
+from model import GameModel
+from action_codes import decode_action
+import state_diff
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_diffs_rebuild_random_games(seed: int):
+    rng = random.Random(seed)
+    model = GameModel.default()
+    before = model.to_compact()
+    assert state_diff.compact_state(model.state) == before
+
+    while len(model.history) < 300 and model.game_status == GameStatus.ONGOING:
+        codes = list(model.legal_action_codes())
+        if not codes:
+            break
+
+        model.make_action(decode_action(rng.choice(codes)))
+        after = model.to_compact()
+        changes = state_diff.diff(before, after)
+
+        assert state_diff.compact_state(model.state) == after
+        assert state_diff.apply(before, changes) == after
+        assert state_diff.decode(state_diff.encode(changes)) == changes
+        assert state_diff.decode_text(state_diff.encode_text(changes)) == changes
+        before = after
+
+def test_diff_from_empty_position_is_a_full_snapshot():
+    position = GameModel.default().to_compact()
+    changes = state_diff.diff(state_diff.EMPTY_POSITION, position)
+
+    assert state_diff.apply(state_diff.EMPTY_POSITION, changes) == position
+
+def test_unchanged_position_has_an_empty_diff():
+    position = GameModel.default().to_compact()
+    assert state_diff.apply(position, state_diff.diff(position, position)) == position
+    assert len(state_diff.encode(state_diff.diff(position, position))) == 5
+
+@pytest.mark.parametrize('data', [b'', bytes(5), b'\x10\x01\x00\x00\x00', b'\x10\x01\x00\x00\x00\x40'])
+def test_malformed_diffs_raise_diff_error(data: bytes):
+    with pytest.raises(state_diff.DiffError):
+        state_diff.decode(data)
@@ -0,0 +1,42 @@
+"""Tiles drawn from view's cached background and target dot overlay (dummy display)"""
+import os
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+import pygame
+
+from project_types import BOARD_ROWS, BOARD_COLS, Location
+from view import SCREEN_WIDTH, SCREEN_HEIGHT, BOARD_WIDTH, BOARD_HEIGHT, SPRITES, RenderableBoard
+from random_games import late_game_model
+from benchmarks import drawn_tiles
+
+
+@pytest.fixture
+def display(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.chdir(Path(__file__).parents[1])  # sprites are loaded from ../img
+    pygame.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    SPRITES.preload()
+    yield
+    SPRITES.clear()
+    pygame.quit()
+
+
+@pytest.mark.parametrize('min_captures', [0, 10])
+def test_cached_tiles_match_drawn_tiles(display: None, min_captures: int):
+    model = late_game_model(min_captures, seed=0)
+    board = RenderableBoard(model.state.live_pieces)
+    piece = next(piece for piece in model.state.live_pieces if piece.owner == model.state.active_player and piece.moves)
+    board.mark_nearby_targetable(piece)
+    tiles = [board.get_tile(Location(row, col)) for row in range(BOARD_ROWS) for col in range(BOARD_COLS)]
+
+    cached = pygame.Surface((BOARD_WIDTH, BOARD_HEIGHT))
+    for tile in tiles:
+        tile.render_to_board(cached)
+    expected = drawn_tiles(tiles)
+
+    assert any(tile.is_targetable for tile in tiles)
+    mismatched = sum(expected.get_at((x, y)) != cached.get_at((x, y)) for x in range(BOARD_WIDTH) for y in range(BOARD_HEIGHT))
+    assert mismatched == 0, f"{mismatched} pixels differ from tiles drawn from scratch"
@@ -0,0 +1,97 @@
+"""Compact wire codec of the online client (wire_codec.py)"""
+import random
+
+import pytest
+
+from project_types import BOARD_ROWS, BOARD_COLS, PieceKind, ActionType, Location, PlayerNumber, PlayerAction
+import wire_codec
+
+TILES = [Location(tile // BOARD_COLS, tile % BOARD_COLS) for tile in range(BOARD_ROWS * BOARD_COLS)]
+ACTIONS = [
+    PlayerAction(action_type, player, source, target, kind)
+    for kind in PieceKind
+    for player in PlayerNumber
+    for action_type, sources in ((ActionType.MOVE, TILES), (ActionType.DROP, [None]))
+    for source in sources
+    for target in TILES
+]
+"""Every action the format can describe, legal or not"""
+
+
+def test_every_action_round_trips():
+    for action in ACTIONS:
+        assert wire_codec.decode(wire_codec.encode(action)) == [action]
+        assert wire_codec.decode_text(wire_codec.encode_text([action])) == [action]
+        assert wire_codec.decode_legacy(wire_codec.encode_legacy(action)) == action
+
+def test_batches_round_trip():
+    rng = random.Random(0)
+
+    for _ in range(1000):
+        batch = rng.sample(ACTIONS, rng.randint(0, wire_codec.MAX_TEXT_BATCH))
+        assert wire_codec.decode(wire_codec.encode_batch(batch)) == batch
+        assert wire_codec.decode_text(wire_codec.encode_text(batch)) == batch
+
+def test_text_batches_fit_the_server_limit():
+    batch = ACTIONS[:wire_codec.MAX_TEXT_BATCH]
+    assert len(wire_codec.encode_text(batch).encode()) <= wire_codec.TEXT_SIZE_LIMIT
+
+def test_corrupt_frames_raise_wire_error_or_re_encode():
+    """Corrupt and random frames either decode to actions that encode to the same bytes, or raise WireError"""
+    rng = random.Random(0)
+    frames = [wire_codec.encode(action) for action in rng.sample(ACTIONS, 100)] \
+        + [wire_codec.encode_batch(rng.sample(ACTIONS, rng.randint(0, 8))) for _ in range(100)]
+    rejected = 0
+
+    for index in range(20_000):
+        if index % 2 == 0:
+            data = bytearray(rng.choice(frames))
+            for _ in range(rng.randint(1, 3)):
+                match rng.randrange(3) if data else 2:
+                    case 0:
+                        data[rng.randrange(len(data))] ^= 1 << rng.randrange(8)
+                    case 1:
+                        del data[rng.randrange(len(data))]
+                    case _:
+                        data.insert(rng.randint(0, len(data)), rng.randrange(256))
+        else:
+            data = bytearray(rng.randbytes(rng.randint(0, 12)))
+
+        try:
+            result = wire_codec.decode(bytes(data))
+        except wire_codec.WireError:
+            rejected += 1
+            continue
+
+        encoded = wire_codec.encode(result[0]) if data[0] & 0x0F == wire_codec.FRAME_ACTION else wire_codec.encode_batch(result)
+        assert encoded == data, f"decode({bytes(data).hex()}) does not re-encode to the same bytes"
+
+    assert rejected > 0
+
+def test_corrupt_text_raises_wire_error():
+    rng = random.Random(0)
+
+    for _ in range(20_000):
+        text = wire_codec.TEXT_PREFIX + ''.join(rng.choice('AZaz09+/=~%-é ') for _ in range(rng.randint(0, 10)))
+        try:
+            wire_codec.decode_text(text)
+        except wire_codec.WireError:
+            pass
+
+@pytest.mark.parametrize('payload', [
+    'move%one%8-0%0-0%eevee',
+    'move%one%0-0%0-8%eevee',
+    'move%one%0-0%0--1%eevee',
+    'drop%two%%-1-0%pikachu',
+    'drop%two%%99-99%pikachu',
+])
+def test_legacy_rejects_off_board_locations(payload: str):
+    assert wire_codec.decode_legacy(payload) is None
+
+def test_legacy_accepts_leading_zeros():
+    action = wire_codec.decode_legacy('move%one%06-03%05-03%eevee')
+    assert action is not None and action.source_location == Location(6, 3) and action.target_location == Location(5, 3)
+
+@pytest.mark.parametrize('payload', ['', 'move%one%0-0%0-0', 'move%one%0-0%0-0%mew', 'move%one%a-b%0-0%eevee'])
+def test_legacy_rejects_malformed_payloads(payload: str):
+    assert wire_codec.decode_legacy(payload) is None
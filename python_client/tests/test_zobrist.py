@@ -0,0 +1,41 @@
+"""Incrementally maintained Zobrist keys (zobrist.py)"""
+import random
+
+import pytest
+
+from project_types import GameStatus
+from model import GameModel, GameBoard
+from bitboard import BOARD_ENGINES
+from zobrist import key_from_state
+from random_games import state_actions
+
+
+@pytest.mark.parametrize('engine', BOARD_ENGINES.values(), ids=BOARD_ENGINES.keys())
+@pytest.mark.parametrize('seed', range(5))
+def test_key_matches_state_along_random_games(engine: type[GameBoard], seed: int):
+    model = GameModel.default(engine)
+    rng = random.Random(seed)
+
+    for _ in range(200):
+        assert model.zobrist_key == key_from_state(model.state), f"key out of sync after {len(model.history)} actions"
+
+        actions = state_actions(model.state)
+        if model.state.game_status != GameStatus.ONGOING or not actions:
+            break
+
+        model.make_action(rng.choice(actions))
+
+def test_engines_share_keys():
+    keys = {GameModel.default(engine).zobrist_key for engine in BOARD_ENGINES.values()}
+    assert len(keys) == 1
+
+def test_different_positions_have_different_keys():
+    model = GameModel.default()
+    keys = {model.zobrist_key}
+
+    for action in state_actions(model.state):
+        model.push(action)
+        keys.add(model.zobrist_key)
+        model.pop()
+
+    assert len(keys) == 1 + len(state_actions(model.state))